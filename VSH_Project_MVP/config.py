@@ -11,6 +11,7 @@ DATA_DIR = RUNTIME_ROOT
 CHROMA_DB_DIR = DATA_DIR / "chroma"
 CHROMA_CACHE_DIR = DATA_DIR / "cache" / "chroma"
 CHROMA_COLLECTION = "vsh_kisa_guide"
+SEMGREP_CACHE_DIR = DATA_DIR / "cache" / "semgrep"
 
 # Optional sqlite path used by local components/tools
 SQLITE_DB_PATH = DATA_DIR / "vsh.db"
@@ -27,6 +28,7 @@ def ensure_runtime_paths() -> None:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
     CHROMA_DB_DIR.mkdir(parents=True, exist_ok=True)
     CHROMA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    SEMGREP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
     for file_path in (KNOWLEDGE_PATH, FIX_PATH, LOG_PATH):
         if not file_path.exists():
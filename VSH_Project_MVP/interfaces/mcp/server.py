@@ -1,4 +1,5 @@
 import json
+import os
 from typing import Any, Dict, List
 from dotenv import load_dotenv
 from fastmcp import FastMCP
@@ -15,6 +16,10 @@ from orchestration import PipelineFactory
 pipeline = PipelineFactory.create()
 log_repo = pipeline.log_repo
 
+# Chroma/embedding model은 첫 조회 시 lazy 로드된다. 장시간 실행 시 첫 응답 지연을 없애려면 opt-in으로 미리 로드한다.
+if os.getenv("VSH_CHROMA_WARMUP", "").lower() in {"1", "true", "yes"}:
+    pipeline.evidence_retriever.warm_up(background=True)
+
 # 3. FastMCP 인스턴스 생성
 mcp = FastMCP("VSH - Vibe Coding Secure Helper")
 runtime_engine = VshRuntimeEngine()
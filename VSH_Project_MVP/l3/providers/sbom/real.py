@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import List, Dict
 from l3.models.package_record import PackageRecord
 from l3.providers.base import AbstractSBOMProvider
+from layer2.verifier.providers.osv_mirror import OsvMirror, get_osv_mirror
+from shared.manifest_registry import MANIFEST_REGISTRY
 from shared.runtime_settings import detect_syft
 
 class RealSBOMProvider(AbstractSBOMProvider):
@@ -32,13 +34,24 @@ class RealSBOMProvider(AbstractSBOMProvider):
                 
         if not packages:
             return []
-            
-        vuln_map = self._query_osv_batch(packages)
+
+        # mirror에 ingest된 ecosystem만 offline으로 조회하고, 나머지는 기존 OSV API 경로로 보낸다.
+        mirror = get_osv_mirror()
+        offline = [pkg for pkg in packages if mirror.available(pkg.get("ecosystem") or "PyPI")]
+        online = [pkg for pkg in packages if not mirror.available(pkg.get("ecosystem") or "PyPI")]
+        results = [
+            self._build_record(pkg, vuln)
+            for pkg in offline
+            for vuln in self._query_osv_mirror(mirror, pkg)
+        ]
+        if not online:
+            return results
+
+        vuln_map = self._query_osv_batch(online)
         if not vuln_map:
-            return []
-            
-        results = []
-        for pkg in packages:
+            return results
+
+        for pkg in online:
             pkg_name = pkg["name"]
             if pkg_name in vuln_map:
                 vuln_ids = vuln_map[pkg_name]
@@ -116,6 +129,25 @@ class RealSBOMProvider(AbstractSBOMProvider):
         except Exception:
             return {}
 
+    def _query_osv_mirror(self, mirror: OsvMirror, pkg: dict) -> List[dict]:
+        """ingest된 offline OSV mirror에서 패키지 advisory를 조회합니다. (network 요청 없음)"""
+        results = []
+        seen_cves = set()
+        ecosystem = pkg.get("ecosystem") or "PyPI"
+        advisory_ids = mirror.advisory_ids(ecosystem, pkg["name"], pkg["version"])
+        for advisory in mirror.advisories(advisory_ids):
+            cve_id = next((a for a in advisory["aliases"] if a.startswith("CVE-")), None)
+            if cve_id:
+                if cve_id in seen_cves:
+                    continue
+                seen_cves.add(cve_id)
+            results.append({
+                "cve_id": cve_id,
+                "severity": advisory["severity"] or "LOW",
+                "cvss_score": None
+            })
+        return results
+
     def _get_vuln_details(self, pkg: dict, vuln_ids: List[str]) -> List[dict]:
         results = []
         seen_cves = set()
@@ -185,15 +217,15 @@ class RealSBOMProvider(AbstractSBOMProvider):
 
     def _detect_languages(self, project_path: str) -> list[str]:
         try:
-            p = Path(project_path)
+            present = MANIFEST_REGISTRY.present(project_path)
             langs = []
-            if (p / "requirements.txt").exists():
+            if "requirements.txt" in present:
                 langs.append("python")
-            if (p / "package.json").exists():
+            if "package.json" in present:
                 langs.append("js")
-            if (p / "pom.xml").exists():
+            if "pom.xml" in present:
                 langs.append("java")
-            if (p / "go.mod").exists():
+            if "go.mod" in present:
                 langs.append("go")
             return langs
         except Exception:
@@ -1,15 +1,27 @@
-from .code_annotator import annotate_files
+from .code_annotator import LazyAnnotations, annotate_files
+from .findings_cache import L1FindingsCache
 from .import_risk import detect_project_languages, detect_typosquatting_findings, guess_language
-from .pattern_scan import scan_file_with_patterns
+from .manifest_parsers import LOCKFILE_PARSERS, PARSED_MANIFESTS
+from .pattern_scan import scan_file_with_patterns, scan_pattern_findings
+from .project_reachability import ProjectReachabilityIndex
 from .reachability import annotate_reachability
+from .rule_index import KnowledgeRuleIndex, get_knowledge_rule_index
 from .schema_normalizer import normalize_scan_result
 
 __all__ = [
+    "KnowledgeRuleIndex",
+    "LOCKFILE_PARSERS",
+    "L1FindingsCache",
+    "LazyAnnotations",
+    "PARSED_MANIFESTS",
+    "ProjectReachabilityIndex",
     "annotate_reachability",
     "annotate_files",
     "detect_project_languages",
     "detect_typosquatting_findings",
+    "get_knowledge_rule_index",
     "guess_language",
     "normalize_scan_result",
     "scan_file_with_patterns",
+    "scan_pattern_findings",
 ]
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import os
+import shutil
+from collections.abc import Iterable, Iterator, Mapping
 from pathlib import Path
 
 from models.vulnerability import Vulnerability
+from shared.source_unit import load_source_unit, split_source_lines
 
 
 def _get_comment_marker(file_path: str) -> str:
@@ -23,30 +27,96 @@ def _build_annotation(vuln: Vulnerability, marker: str) -> str:
     return "\n".join(lines)
 
 
-def annotate_files(findings: list[Vulnerability]) -> dict[str, str]:
-    annotated: dict[str, str] = {}
+def _group_by_file(findings: Iterable[Vulnerability]) -> dict[str, list[Vulnerability]]:
     by_file: dict[str, list[Vulnerability]] = {}
     for f in findings:
         if f.file_path and not f.file_path.startswith("<"):
             by_file.setdefault(f.file_path, []).append(f)
+    return by_file
+
 
-    for file_path, group in by_file.items():
-        path = Path(file_path)
-        if not path.exists():
-            continue
-        content = path.read_text(encoding="utf-8")
-        lines = content.splitlines(keepends=True)
-        marker = _get_comment_marker(file_path)
-        seen = set()
-        for f in sorted(group, key=lambda x: (x.line_number, x.cwe_id, x.rule_id or ""), reverse=True):
+def iter_annotated_lines(file_path: str, findings: list[Vulnerability]) -> Iterator[str]:
+    """
+    파일 라인과 라인 순으로 정렬한 finding을 한 번에 병합하며 주석이 삽입된 라인을 내보냅니다.
+
+    같은 라인의 주석은 (CWE, rule) 순서로 붙고, 같은 (라인, CWE, rule)은 처음 것만 사용한다.
+    """
+    lines = split_source_lines(load_source_unit(file_path).text, keepends=True)
+    marker = _get_comment_marker(file_path)
+    pending = sorted(
+        (f for f in findings if 1 <= f.line_number <= len(lines)),
+        key=lambda x: (x.line_number, x.cwe_id, x.rule_id or ""),
+    )
+    cursor = 0
+    seen: set[tuple] = set()
+    for idx, line in enumerate(lines, start=1):
+        indent = None
+        while cursor < len(pending) and pending[cursor].line_number == idx:
+            f = pending[cursor]
+            cursor += 1
             key = (f.line_number, f.cwe_id, f.rule_id)
-            if key in seen or f.line_number < 1 or f.line_number > len(lines):
+            if key in seen:
                 continue
             seen.add(key)
-            annotation = _build_annotation(f, marker)
-            idx = f.line_number - 1
-            target_line = lines[idx]
-            indent = target_line[: len(target_line) - len(target_line.lstrip())]
-            lines.insert(idx, "\n".join(indent + l for l in annotation.split("\n")) + "\n")
-        annotated[file_path] = "".join(lines)
-    return annotated
+            if indent is None:
+                indent = line[: len(line) - len(line.lstrip())]
+            yield "\n".join(indent + l for l in _build_annotation(f, marker).split("\n")) + "\n"
+        yield line
+
+
+class LazyAnnotations(Mapping[str, str]):
+    """
+    finding이 있는 파일별 annotated 소스를 필요할 때만 만드는 mapping.
+
+    `preview(path)`/`[path]`는 요청된 파일 하나만 렌더링하고, `write()`는 파일별로 라인 stream을
+    출력 파일에 바로 써서 project 전체의 annotated 사본을 메모리에 올리지 않는다.
+    """
+
+    def __init__(self, findings: Iterable[Vulnerability]):
+        self._by_file = {path: group for path, group in _group_by_file(findings).items() if Path(path).exists()}
+
+    def __getitem__(self, file_path: str) -> str:
+        return self.preview(file_path)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_file)
+
+    def __len__(self) -> int:
+        return len(self._by_file)
+
+    def preview(self, file_path: str) -> str:
+        return "".join(iter_annotated_lines(file_path, self._by_file[file_path]))
+
+    def write(self, output_dir: str | Path | None = None, base_dir: str | Path | None = None) -> dict[str, str]:
+        """
+        annotated 파일을 stream으로 저장하고 {원본 경로: 출력 경로}를 반환합니다.
+
+        output_dir가 None이면 원본을 덮어쓴다(임시 파일에 쓴 뒤 교체). symlink는 가리키는 파일을 교체하고
+        원본의 권한 bit는 출력 파일에 그대로 복사한다. base_dir 기준 상대 경로를
+        output_dir 아래에 유지하며, base_dir 밖의 파일은 파일 이름만 사용한다.
+        """
+        outputs: dict[str, str] = {}
+        for file_path, group in self._by_file.items():
+            original = Path(file_path)
+            if output_dir is None:
+                # symlink 자체를 일반 파일로 바꾸지 않도록 실제 파일 위치에서 교체한다.
+                target = original.resolve()
+            else:
+                try:
+                    target = Path(output_dir) / original.relative_to(Path(base_dir)) if base_dir is not None else Path(output_dir) / original.name
+                except ValueError:
+                    target = Path(output_dir) / original.name
+                target.parent.mkdir(parents=True, exist_ok=True)
+            lines = iter_annotated_lines(file_path, group)
+            temp = target.with_name(target.name + ".vsh-tmp")
+            with open(temp, "w", encoding="utf-8", newline="") as handle:
+                handle.writelines(lines)
+            shutil.copymode(original, temp)
+            os.replace(temp, target)
+            outputs[file_path] = str(target)
+        return outputs
+
+
+def annotate_files(findings: list[Vulnerability]) -> dict[str, str]:
+    annotations = LazyAnnotations(findings)
+    return {file_path: annotations.preview(file_path) for file_path in annotations}
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable
+
+from models.scan_finding import ScanFinding
+from models.vulnerability import Vulnerability
+
+CACHE_FORMAT_VERSION = "2"
+DEFAULT_MAX_ENTRIES = 50000
+DEFAULT_MAX_SIZE_MB = 256
+
+
+def fingerprint(*parts: Any) -> str:
+    """scanner/rule-set 구성 요소를 순서대로 직렬화한 sha256 digest를 반환합니다."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class L1FindingsCache:
+    """
+    파일 내용 hash + scanner/rule-set fingerprint 기준으로 L1 파일 단위 finding을 저장하는 on-disk 캐시.
+
+    SQLite 한 파일에 저장하며, `ttl_hours`가 지난 항목은 miss로 처리하고
+    항목 수/전체 크기 상한을 넘으면 마지막 접근 시각이 오래된 순(LRU)으로 삭제한다.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        ttl_hours: float = 24,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_size_mb: float = DEFAULT_MAX_SIZE_MB,
+    ):
+        self.db_path = Path(cache_dir) / "l1_findings.sqlite3"
+        self.ttl_sec = float(ttl_hours) * 3600 if ttl_hours else 0.0
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(float(max_size_mb) * 1024 * 1024)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._disabled = False
+        self._last_tick = 0.0
+
+    def _tick(self) -> float:
+        # 타이머 해상도가 낮은 환경에서도 LRU 순서가 유지되도록 접근 시각을 단조 증가시킨다.
+        self._last_tick = max(time.time(), self._last_tick + 1e-6)
+        return self._last_tick
+
+    @classmethod
+    def from_config(cls, cache_config: dict[str, Any] | None) -> "L1FindingsCache | None":
+        """vsh_runtime config의 `cache` section으로 캐시를 만들고, 비활성화돼 있으면 None을 반환합니다."""
+        cache_config = cache_config or {}
+        if not cache_config.get("enabled", True):
+            return None
+        return cls(
+            cache_dir=cache_config.get("dir") or ".vsh/cache",
+            ttl_hours=cache_config.get("ttl_hours", 24),
+            max_entries=cache_config.get("max_entries", DEFAULT_MAX_ENTRIES),
+            max_size_mb=cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB),
+        )
+
+    @staticmethod
+    def make_key(content_hash: str, scanner_fingerprint: str, language: str) -> str:
+        return hashlib.sha256(
+            f"{CACHE_FORMAT_VERSION}:{scanner_fingerprint}:{language}:{content_hash}".encode("utf-8")
+        ).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if self._disabled:
+            return None
+        if self._conn is None:
+            try:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+                # watcher와 CLI가 같은 `.vsh/cache`에 동시에 쓸 수 있으므로 WAL로 연다.
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS l1_findings (
+                        key TEXT PRIMARY KEY,
+                        payload TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                    """
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_l1_findings_access ON l1_findings(last_access)")
+                self._conn = conn
+            except sqlite3.Error as exc:
+                print(f"[WARN] L1 findings cache disabled: {exc}")
+                self._disabled = True
+                return None
+        return self._conn
+
+    def get_many(
+        self, keys: Iterable[str], file_paths: dict[str, str]
+    ) -> dict[str, tuple[list[Vulnerability], dict | None]]:
+        """
+        여러 key를 한 번에 조회합니다.
+
+        Args:
+            keys: 조회할 cache key 목록
+            file_paths: key별 현재 파일 경로. 저장 시 비워 둔 finding.file_path를 이 값으로 복원한다.
+
+        Returns:
+            dict[str, tuple]: hit된 key별 (finding 목록, 파일 단위 call graph evidence 또는 None)
+        """
+        keys = list(dict.fromkeys(keys))
+        hits: dict[str, tuple[list[Vulnerability], dict | None]] = {}
+        if not keys:
+            return hits
+        with self._lock:
+            now = self._tick()
+            conn = self._connect()
+            if conn is None:
+                return hits
+            try:
+                rows: list[tuple[str, str, float]] = []
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" for _ in chunk)
+                    rows.extend(conn.execute(
+                        f"SELECT key, payload, created_at FROM l1_findings WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall())
+                expired = {key for key, _, created_at in rows if self.ttl_sec and now - created_at > self.ttl_sec}
+                fresh = [(key, payload) for key, payload, _ in rows if key not in expired]
+                if expired:
+                    conn.executemany("DELETE FROM l1_findings WHERE key = ?", [(key,) for key in expired])
+                if fresh:
+                    conn.executemany("UPDATE l1_findings SET last_access = ? WHERE key = ?", [(now, key) for key, _ in fresh])
+                conn.commit()
+            except sqlite3.Error as exc:
+                print(f"[WARN] L1 findings cache read failed: {exc}")
+                return hits
+
+        for key, payload in fresh:
+            try:
+                data = json.loads(payload)
+                findings = [Vulnerability.model_validate(item) for item in data["findings"]]
+            except (ValueError, TypeError, KeyError):
+                continue
+            for finding in findings:
+                if finding.file_path is None:
+                    finding.file_path = file_paths.get(key)
+            hits[key] = (findings, data.get("call_graph"))
+        return hits
+
+    def put_many(self, entries: dict[str, tuple[str, list[Vulnerability | ScanFinding], dict | None]]) -> None:
+        """
+        key별 (파일 경로, finding 목록, call graph evidence)를 저장하고 상한을 넘으면 LRU 순으로 정리합니다.
+
+        파일 경로와 같은 finding.file_path는 비워서 저장하므로 내용이 같은 다른 경로에서도 재사용할 수 있다.
+        """
+        if not entries:
+            return
+        with self._lock:
+            now = self._tick()
+        rows = []
+        for key, (file_path, findings, call_graph) in entries.items():
+            items = []
+            for finding in findings:
+                item = finding.to_dict() if isinstance(finding, ScanFinding) else finding.model_dump(mode="json")
+                if item.get("file_path") == file_path:
+                    item["file_path"] = None
+                items.append(item)
+            payload = json.dumps({"findings": items, "call_graph": call_graph}, ensure_ascii=False)
+            rows.append((key, payload, len(payload.encode("utf-8")), now, now))
+
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO l1_findings (key, payload, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._evict(conn)
+                conn.commit()
+            except sqlite3.Error as exc:
+                print(f"[WARN] L1 findings cache write failed: {exc}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM l1_findings").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        removed_keys: list[tuple[str]] = []
+        ordered = conn.execute("SELECT key, size FROM l1_findings ORDER BY last_access ASC, created_at ASC").fetchall()
+        for key, size in ordered:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            removed_keys.append((key,))
+            count -= 1
+            total -= size
+        conn.executemany("DELETE FROM l1_findings WHERE key = ?", removed_keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute("DELETE FROM l1_findings")
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -5,6 +5,8 @@ import sys
 from pathlib import Path
 
 from models.vulnerability import Vulnerability
+from shared.source_unit import load_source_unit
+from .top_packages import TopPackageIndex, get_top_package_index
 
 PY_IMPORT_RE = re.compile(r"^\s*(?:import|from)\s+([a-zA-Z0-9_\.]+)", re.MULTILINE)
 JS_IMPORT_RE = re.compile(r"(?:import\s+.*?from\s+|require\()\s*[\"']([@a-zA-Z0-9_\-/]+)[\"']")
@@ -21,6 +23,9 @@ TOP_NPM_PACKAGES = {
 PY_STDLIB = set(getattr(sys, "stdlib_module_names", ()))
 
 SUSPICIOUS_TOKENS = {"secure", "official", "core", "plus", "pro", "safe", "trusted"}
+HOMOGLYPH_CHARS = "@$µıοарес"
+TYPOSQUATTING_THRESHOLD = 0.72
+AFFIX_BONUS = 0.1
 
 
 def guess_language(file_path: str) -> str:
@@ -76,8 +81,10 @@ def _similarity_ratio(s1: str, s2: str) -> float:
 
 
 def _extract_import_lines(file_path: str, language: str) -> list[tuple[str, int, str]]:
-    text = Path(file_path).read_text(encoding="utf-8")
-    lines = text.splitlines()
+    return load_source_unit(file_path).memo(f"imports:{language}", lambda unit: extract_imports(unit.lines, language))
+
+
+def extract_imports(lines: list[str], language: str) -> list[tuple[str, int, str]]:
     imports: list[tuple[str, int, str]] = []
     if language == "python":
         for idx, line in enumerate(lines, start=1):
@@ -102,6 +109,16 @@ def _extract_import_lines(file_path: str, language: str) -> list[tuple[str, int,
     return imports
 
 
+def _candidate_bonus(candidate: str, c_norm: str) -> float:
+    """top 이름과 무관하게 후보 이름만으로 정해지는 점수 보너스."""
+    bonus = 0.0
+    if any(token in c_norm for token in SUSPICIOUS_TOKENS):
+        bonus += 0.05
+    if any(ch in candidate for ch in HOMOGLYPH_CHARS):
+        bonus += 0.08
+    return bonus
+
+
 def _score_typosquatting(candidate: str, top_pkg: str) -> tuple[float, list[str]]:
     evidence: list[str] = []
     c_norm, t_norm = _normalize_name(candidate), _normalize_name(top_pkg)
@@ -110,32 +127,41 @@ def _score_typosquatting(candidate: str, top_pkg: str) -> tuple[float, list[str]
     if c_norm == t_norm:
         return 0.0, []
     if c_norm.startswith(t_norm) or c_norm.endswith(t_norm) or t_norm.startswith(c_norm) or t_norm.endswith(c_norm):
-        score += 0.1
+        score += AFFIX_BONUS
         evidence.append("prefix/suffix confusion")
     if any(token in c_norm for token in SUSPICIOUS_TOKENS):
         score += 0.05
         evidence.append("suspicious token")
-    if any(ch in candidate for ch in "@$µıοарес"):
+    if any(ch in candidate for ch in HOMOGLYPH_CHARS):
         score += 0.08
         evidence.append("homoglyph/visual confusion")
     evidence.append(f"normalized_similarity={sim:.2f}")
     return min(score, 1.0), evidence
 
 
+def top_package_index(ecosystem: str) -> TopPackageIndex:
+    """내장 top-package 목록 + corpus 파일로 만든 ecosystem별 typosquatting index."""
+    return get_top_package_index(
+        ecosystem,
+        TOP_PYPI_PACKAGES if ecosystem == "PyPI" else TOP_NPM_PACKAGES,
+        normalize=_normalize_name,
+        score=_score_typosquatting,
+        candidate_bonus=_candidate_bonus,
+        threshold=TYPOSQUATTING_THRESHOLD,
+        pair_bonus=AFFIX_BONUS,
+    )
+
+
 def detect_typosquatting_findings(file_path: str) -> list[Vulnerability]:
     language = guess_language(file_path)
     ecosystem = "PyPI" if language == "python" else "npm"
-    top_packages = TOP_PYPI_PACKAGES if ecosystem == "PyPI" else TOP_NPM_PACKAGES
+    index = top_package_index(ecosystem)
     findings: list[Vulnerability] = []
 
     for package_name, line_number, code_snippet in _extract_import_lines(file_path, language):
-        best_match, best_score, best_ev = None, 0.0, []
-        for candidate in top_packages:
-            score, ev = _score_typosquatting(package_name, candidate)
-            if score > best_score:
-                best_match, best_score, best_ev = candidate, score, ev
-
-        if best_match and best_score >= 0.72:
+        verdict = index.best_match(package_name)
+        if verdict is not None:
+            best_match, best_score, best_ev = verdict[0], verdict[1], list(verdict[2])
             severity = "HIGH" if best_score >= 0.88 else "MEDIUM"
             findings.append(Vulnerability(
                 file_path=file_path,
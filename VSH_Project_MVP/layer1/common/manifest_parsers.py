@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+# (line_no, package, version, raw_line)
+PackageEntry = tuple[int, str, "str | None", str]
+
+# content hash별로 보관할 parse 결과 개수
+PARSED_MANIFEST_CACHE_SIZE = 64
+HASH_CHUNK_SIZE = 1 << 20
+
+JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]:,]|[^\s{}\[\]:,"]+')
+PNPM_PEER_SUFFIX_RE = re.compile(r"\(.*\)$")
+REQ_RE = re.compile(r"^([a-zA-Z0-9_\-.@/]+)(?:[=!<>~]+([0-9a-zA-Z\-.+]+))?")
+
+
+def _split_spec(spec: str) -> tuple[str, str]:
+    """`name@range` / `@scope/name@npm:range` 형태에서 (name, range)를 분리합니다."""
+    spec = spec.strip().strip("\"'")
+    at = spec.rfind("@")
+    if at <= 0:
+        return spec, ""
+    return spec[:at], spec[at + 1:]
+
+
+def _iter_json_events(path: Path) -> Iterator[tuple[int, list[str], object]]:
+    """
+    JSON 파일을 라인 단위로 읽으며 scalar 값마다 (line_no, object key 경로, 값)을 반환합니다.
+
+    전체 문서를 메모리에 올리지 않는 streaming tokenizer이다. JSON 문자열은 raw newline을 포함할 수 없으므로
+    token이 라인을 넘지 않는다. 배열 원소는 key 경로에 포함하지 않는다.
+    """
+    # frame: [컨테이너 종류, 이 컨테이너가 값인 key, 현재 key, key를 기다리는 중인지]
+    stack: list[list] = []
+    with path.open(encoding="utf-8", errors="ignore") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            for match in JSON_TOKEN_RE.finditer(line):
+                token = match.group(0)
+                top = stack[-1] if stack else None
+                if token in "{[":
+                    parent_key = top[2] if top is not None and top[0] == "{" else None
+                    stack.append([token, parent_key, None, token == "{"])
+                elif token in "}]":
+                    if stack:
+                        stack.pop()
+                elif token == ",":
+                    if top is not None and top[0] == "{":
+                        top[3] = True
+                elif token == ":":
+                    if top is not None:
+                        top[3] = False
+                else:
+                    try:
+                        value = json.loads(token)
+                    except ValueError:
+                        continue
+                    if top is not None and top[0] == "{" and top[3]:
+                        top[2] = value
+                        continue
+                    if top is None or top[0] != "{":
+                        continue
+                    keys = [frame[1] for frame in stack[1:] if frame[0] == "{"] + [top[2]]
+                    yield line_no, keys, value
+
+
+def parse_package_lock(path: Path) -> Iterable[PackageEntry]:
+    """
+    package-lock.json (lockfileVersion 1/2/3)의 설치 패키지를 streaming으로 읽습니다.
+
+    v2/v3의 `packages["node_modules/..."].version`과 v1의 중첩 `dependencies[name].version`을 모두 지원한다.
+    v2는 두 section을 함께 담으므로 `packages`가 있으면 legacy `dependencies` tree는 무시한다.
+    """
+    has_packages = False
+    # `dependencies`가 `packages`보다 먼저 나온 경우를 위해 legacy tree에서 이미 낸 (name, version)
+    legacy_seen: set[tuple[str, str]] = set()
+    for line_no, keys, value in _iter_json_events(path):
+        if len(keys) < 3 or keys[-1] != "version" or not isinstance(value, str):
+            continue
+        if keys[0] == "packages" and len(keys) == 3:
+            has_packages = True
+            key = keys[1] or ""
+            if "node_modules/" not in key:
+                # "" (root project) 또는 workspace 경로
+                continue
+            name = key.rsplit("node_modules/", 1)[1]
+            if (name, value) in legacy_seen:
+                continue
+        elif keys[0] == "dependencies" and len(keys) % 2 == 1 and all(k == "dependencies" for k in keys[0:-1:2]):
+            if has_packages:
+                continue
+            name = keys[-2]
+            legacy_seen.add((name, value))
+        else:
+            continue
+        if name:
+            yield line_no, name, value, f"{name}@{value}"
+
+
+def parse_yarn_lock(path: Path) -> Iterable[PackageEntry]:
+    """yarn.lock (v1 및 berry)의 `spec[, spec]:` 블록과 그 안의 version 라인을 읽습니다."""
+    name: str | None = None
+    with path.open(encoding="utf-8", errors="ignore") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            if not line[0].isspace():
+                header = line.rstrip().rstrip(":")
+                name = _split_spec(header.split(",", 1)[0])[0] if header != "__metadata" else None
+                continue
+            if name is None:
+                continue
+            stripped = line.strip()
+            if stripped.startswith("version ") or stripped.startswith("version:"):
+                version = stripped[len("version"):].lstrip(" :").strip("\"'")
+                if version:
+                    yield line_no, name, version, f"{name}@{version}"
+                name = None
+
+
+def _parse_pnpm_key(key: str) -> tuple[str, str] | None:
+    key = PNPM_PEER_SUFFIX_RE.sub("", key.strip().strip("\"'")).lstrip("/")
+    parts = key.split("/")
+    name_parts = 2 if key.startswith("@") else 1
+    if len(parts) > name_parts:
+        # lockfile v5: /name/version[_peer], /@scope/name/version[_peer]
+        name, version = "/".join(parts[:name_parts]), "/".join(parts[name_parts:]).split("_", 1)[0]
+    else:
+        name, version = _split_spec(key)
+    if not name or not version:
+        return None
+    return name, version
+
+
+def parse_pnpm_lock(path: Path) -> Iterable[PackageEntry]:
+    """pnpm-lock.yaml의 top-level `packages:` section key(`/name@ver`, `/name/ver`, `name@ver`)를 읽습니다."""
+    in_packages = False
+    key_indent: int | None = None
+    with path.open(encoding="utf-8", errors="ignore") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            indent = len(line) - len(line.lstrip())
+            if indent == 0:
+                in_packages = stripped == "packages:"
+                key_indent = None
+                continue
+            if not in_packages or not stripped.endswith(":"):
+                continue
+            if key_indent is None:
+                key_indent = indent
+            if indent != key_indent:
+                continue
+            parsed = _parse_pnpm_key(stripped[:-1])
+            if parsed:
+                yield line_no, parsed[0], parsed[1], f"{parsed[0]}@{parsed[1]}"
+
+
+def parse_requirement_manifest(manifest: Path) -> Iterable[PackageEntry]:
+    """package.json 의존성 section, 그 외 manifest는 라인별 `name[op version]` 형식으로 읽습니다."""
+    text = manifest.read_text(encoding="utf-8", errors="ignore")
+    if manifest.name == "package.json":
+        try:
+            data = json.loads(text)
+            for section in ["dependencies", "devDependencies", "peerDependencies", "optionalDependencies"]:
+                deps = data.get(section, {}) or {}
+                for pkg, ver in deps.items():
+                    yielding_line = f"{pkg}@{ver} ({section})"
+                    yield 0, pkg, str(ver), yielding_line
+            return
+        except Exception:
+            pass
+
+    for idx, line in enumerate(text.splitlines(), start=1):
+        stripped = line.strip().strip(',')
+        if not stripped or stripped.startswith("#"):
+            continue
+        m = REQ_RE.match(stripped.strip('"'))
+        if not m:
+            continue
+        yield idx, m.group(1), m.group(2), stripped
+
+
+LOCKFILE_PARSERS: dict[str, Callable[[Path], Iterable[PackageEntry]]] = {
+    "package-lock.json": parse_package_lock,
+    "yarn.lock": parse_yarn_lock,
+    "pnpm-lock.yaml": parse_pnpm_lock,
+}
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParsedManifestCache:
+    """
+    manifest parse 결과를 (파일 이름, content hash)별로 보관하는 LRU cache.
+
+    파일별 (mtime_ns, size)가 같으면 hash도 다시 계산하지 않는다. 내용이 같은 manifest는 경로가 달라도 결과를 공유한다.
+    """
+
+    def __init__(self, max_entries: int = PARSED_MANIFEST_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple[str, str], tuple[PackageEntry, ...]]" = OrderedDict()
+        self._digests: dict[str, tuple[tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+        self.parses = 0
+
+    def digest(self, path: Path) -> str:
+        stat = path.stat()
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        key = str(path)
+        with self._lock:
+            cached = self._digests.get(key)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[key] = (stat_key, digest)
+        return digest
+
+    def packages(self, path: Path, parser: Callable[[Path], Iterable[PackageEntry]]) -> tuple[PackageEntry, ...]:
+        key = (path.name, self.digest(path))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+        entries = tuple(parser(path))
+        with self._lock:
+            self.parses += 1
+            self._entries[key] = entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entries
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests.clear()
+
+
+PARSED_MANIFESTS = ParsedManifestCache()
+
+
+def manifest_packages(manifest: Path) -> tuple[PackageEntry, ...]:
+    """manifest의 (line_no, package, version, raw_line) 목록. 같은 내용의 manifest는 다시 parse하지 않는다."""
+    return PARSED_MANIFESTS.packages(manifest, LOCKFILE_PARSERS.get(manifest.name, parse_requirement_manifest))
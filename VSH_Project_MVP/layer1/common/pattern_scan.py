@@ -1,9 +1,12 @@
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
-from pathlib import Path
+from types import MappingProxyType
 
+from models.scan_finding import ScanFinding
 from models.vulnerability import Vulnerability
 from .import_risk import guess_language
+from shared.source_unit import load_source_unit
 
 
 @dataclass(frozen=True)
@@ -14,53 +17,112 @@ class PatternRule:
     cwe_id: str
     pattern: str
     references: list[str]
+    # rule이 매치되려면 반드시 라인에 포함되어야 하는 literal. 비어 있으면 모든 라인을 검사한다.
+    anchor: str = ""
 
 
 PYTHON_RULES = [
-    PatternRule("VSH-PY-SQLI-001", "SQL Injection 가능성", "CRITICAL", "CWE-89", r"cursor\.execute\(\s*f[\"'].*\{.*\}", ["KISA 입력데이터 검증 및 표현 1항"]),
-    PatternRule("VSH-PY-XXE-001", "XXE 가능성", "CRITICAL", "CWE-611", r"\bfromstring\s*\(", ["OWASP XXE Prevention Cheat Sheet"]),
-    PatternRule("VSH-PY-EVAL-001", "eval() 사용", "CRITICAL", "CWE-95", r"\beval\s*\(", ["OWASP Code Injection Prevention"]),
-    PatternRule("VSH-PY-SUBPROCESS-001", "subprocess shell=True 사용", "HIGH", "CWE-78", r"subprocess\.(run|Popen)\(.*shell\s*=\s*True", ["OWASP Command Injection Prevention"]),
-    PatternRule("VSH-PY-DESERIALIZE-001", "pickle.loads 사용", "CRITICAL", "CWE-502", r"pickle\.loads\s*\(", ["OWASP Deserialization Cheat Sheet"]),
-    PatternRule("VSH-PY-OS-SYSTEM-001", "os.system() 사용", "HIGH", "CWE-78", r"os\.system\s*\(", ["OWASP Command Injection Prevention"]),
+    PatternRule("VSH-PY-SQLI-001", "SQL Injection 가능성", "CRITICAL", "CWE-89", r"cursor\.execute\(\s*f[\"'].*\{.*\}", ["KISA 입력데이터 검증 및 표현 1항"], "cursor.execute("),
+    PatternRule("VSH-PY-XXE-001", "XXE 가능성", "CRITICAL", "CWE-611", r"\bfromstring\s*\(", ["OWASP XXE Prevention Cheat Sheet"], "fromstring"),
+    PatternRule("VSH-PY-EVAL-001", "eval() 사용", "CRITICAL", "CWE-95", r"\beval\s*\(", ["OWASP Code Injection Prevention"], "eval"),
+    PatternRule("VSH-PY-SUBPROCESS-001", "subprocess shell=True 사용", "HIGH", "CWE-78", r"subprocess\.(run|Popen)\(.*shell\s*=\s*True", ["OWASP Command Injection Prevention"], "subprocess."),
+    PatternRule("VSH-PY-DESERIALIZE-001", "pickle.loads 사용", "CRITICAL", "CWE-502", r"pickle\.loads\s*\(", ["OWASP Deserialization Cheat Sheet"], "pickle.loads"),
+    PatternRule("VSH-PY-OS-SYSTEM-001", "os.system() 사용", "HIGH", "CWE-78", r"os\.system\s*\(", ["OWASP Command Injection Prevention"], "os.system"),
 ]
 
 JAVASCRIPT_RULES = [
-    PatternRule("VSH-JS-XSS-001", "innerHTML 기반 XSS 가능성", "HIGH", "CWE-79", r"\.innerHTML\s*=", ["KISA 입력데이터 검증 및 표현 3항"]),
-    PatternRule("VSH-JS-EVAL-001", "eval() 사용", "CRITICAL", "CWE-95", r"\beval\s*\(", ["OWASP Code Injection Prevention"]),
-    PatternRule("VSH-JS-DOCUMENT-WRITE-001", "document.write() 사용", "HIGH", "CWE-79", r"document\.write\s*\(", ["OWASP XSS Prevention Cheat Sheet"]),
+    PatternRule("VSH-JS-XSS-001", "innerHTML 기반 XSS 가능성", "HIGH", "CWE-79", r"\.innerHTML\s*=", ["KISA 입력데이터 검증 및 표현 3항"], ".innerHTML"),
+    PatternRule("VSH-JS-EVAL-001", "eval() 사용", "CRITICAL", "CWE-95", r"\beval\s*\(", ["OWASP Code Injection Prevention"], "eval"),
+    PatternRule("VSH-JS-DOCUMENT-WRITE-001", "document.write() 사용", "HIGH", "CWE-79", r"document\.write\s*\(", ["OWASP XSS Prevention Cheat Sheet"], "document.write"),
 ]
 
 
-def scan_file_with_patterns(file_path: str) -> list[Vulnerability]:
+class CompiledPatternRules:
+    """
+    언어별 PatternRule 묶음을 한 번만 컴파일해 두는 rule automaton.
+
+    모든 anchor literal을 하나의 alternation regex로 묶어 파일 전체를 한 번만 훑고,
+    anchor가 등장한 라인에 대해서만 해당 rule의 precompiled pattern을 실행한다.
+    """
+
+    def __init__(self, rules: list[PatternRule]):
+        self.rules = list(rules)
+        self._compiled = [re.compile(rule.pattern) for rule in self.rules]
+        self._unanchored = [idx for idx, rule in enumerate(self.rules) if not rule.anchor]
+        anchors = sorted({rule.anchor for rule in self.rules if rule.anchor}, key=len, reverse=True)
+        self._anchor_re = re.compile("|".join(re.escape(anchor) for anchor in anchors)) if anchors else None
+        # rule별 references/metadata는 finding마다 복사하지 않고 공유한다.
+        self.shared = {
+            rule.rule_id: (tuple(rule.references), MappingProxyType({"engine": "vsh_pattern", "title": rule.title}))
+            for rule in self.rules
+        }
+
+    def _candidate_lines(self, lines: list[str], text: str | None = None, starts: list[int] | None = None) -> list[int]:
+        if self._unanchored or self._anchor_re is None:
+            return list(range(len(lines)))
+        # SourceUnit.lines에는 줄바꿈이 없으므로 "\n" join 기준 offset으로 라인 번호를 복원할 수 있다.
+        if text is None or starts is None:
+            text = "\n".join(lines)
+            starts = [0]
+            position = text.find("\n")
+            while position != -1:
+                starts.append(position + 1)
+                position = text.find("\n", position + 1)
+        candidates: list[int] = []
+        for match in self._anchor_re.finditer(text):
+            idx = bisect_right(starts, match.start()) - 1
+            if not candidates or candidates[-1] != idx:
+                candidates.append(idx)
+        return candidates
+
+    def match_lines(
+        self, lines: list[str], text: str | None = None, starts: list[int] | None = None
+    ) -> list[tuple[int, PatternRule]]:
+        """
+        (0-based line index, rule) 쌍을 라인 순서, rule 정의 순서대로 반환합니다.
+
+        text/starts에 SourceUnit의 joined_text/line_offsets를 넘기면 join/offset 계산을 생략한다.
+        """
+        matches: list[tuple[int, PatternRule]] = []
+        for idx in self._candidate_lines(lines, text, starts):
+            line = lines[idx]
+            for rule, compiled in zip(self.rules, self._compiled):
+                if rule.anchor and rule.anchor not in line:
+                    continue
+                if compiled.search(line):
+                    matches.append((idx, rule))
+        return matches
+
+
+PYTHON_RULESET = CompiledPatternRules(PYTHON_RULES)
+JAVASCRIPT_RULESET = CompiledPatternRules(JAVASCRIPT_RULES)
+
+
+def scan_pattern_findings(file_path: str) -> list[ScanFinding]:
+    """scan_file_with_patterns와 같은 결과를 내부용 ScanFinding으로 반환합니다."""
     language = guess_language(file_path)
-    rules = JAVASCRIPT_RULES if language in {"javascript", "typescript"} else PYTHON_RULES
-    content = Path(file_path).read_text(encoding="utf-8")
-    findings: list[Vulnerability] = []
-    seen: set[tuple[str, int, str]] = set()
-
-    for line_number, line in enumerate(content.splitlines(), start=1):
-        for rule in rules:
-            if not re.search(rule.pattern, line):
-                continue
-            key = (rule.rule_id, line_number, line.strip())
-            if key in seen:
-                continue
-            seen.add(key)
-            findings.append(
-                Vulnerability(
-                    file_path=file_path,
-                    rule_id=rule.rule_id,
-                    cwe_id=rule.cwe_id,
-                    severity=rule.severity,
-                    line_number=line_number,
-                    code_snippet=line.strip(),
-                    references=list(rule.references),
-                    metadata={
-                        "engine": "vsh_pattern",
-                        "title": rule.title,
-                    },
-                )
+    ruleset = JAVASCRIPT_RULESET if language in {"javascript", "typescript"} else PYTHON_RULESET
+    unit = load_source_unit(file_path)
+    lines = unit.lines
+    findings: list[ScanFinding] = []
+
+    for idx, rule in ruleset.match_lines(lines, unit.joined_text, unit.line_offsets):
+        references, metadata = ruleset.shared[rule.rule_id]
+        findings.append(
+            ScanFinding(
+                file_path=file_path,
+                rule_id=rule.rule_id,
+                cwe_id=rule.cwe_id,
+                severity=rule.severity,
+                line_number=idx + 1,
+                code_snippet=lines[idx].strip(),
+                references=references,
+                metadata=metadata,
             )
+        )
 
     return findings
+
+
+def scan_file_with_patterns(file_path: str) -> list[Vulnerability]:
+    return [finding.to_vulnerability() for finding in scan_pattern_findings(file_path)]
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+from models.scan_finding import ScanFinding
+from models.vulnerability import Vulnerability
+from .import_risk import guess_language
+from shared.source_unit import load_source_unit
+from .reachability import (
+    FUNC_CALL_RE,
+    PY_SINK_RE,
+    PY_SOURCE_RE,
+    _build_function_boundaries,
+    _build_line_index,
+)
+
+GLOBAL_SCOPE = "<global>"
+
+PY_FROM_IMPORT_RE = re.compile(r"^\s*from\s+(\.*[a-zA-Z0-9_\.]*)\s+import\s+\(?([^#]+)")
+PY_PLAIN_IMPORT_RE = re.compile(r"^\s*import\s+([^#]+)")
+ATTR_CALL_RE = re.compile(r"\b(\w+)\.(\w+)\s*\(")
+
+
+@dataclass
+class ModuleSummary:
+    """project call graph 구성을 위해 파일 하나에서 한 번만 추출해 두는 정보."""
+
+    path: str
+    module: str
+    is_package: bool
+    content_hash: str
+    line_owner: list[str | None]
+    functions: set[str]
+    # scope(함수 이름 또는 GLOBAL_SCOPE) -> 호출한 이름 / (alias, attribute) 호출
+    calls: dict[str, set[str]] = field(default_factory=dict)
+    attr_calls: dict[str, set[tuple[str, str]]] = field(default_factory=dict)
+    # local alias -> (절대 module 이름, import한 symbol 또는 None)
+    imports: dict[str, tuple[str, str | None]] = field(default_factory=dict)
+    source_scopes: set[str] = field(default_factory=set)
+    sink_functions: set[str] = field(default_factory=set)
+
+
+def _module_name(root: Path, path: Path) -> tuple[str, bool]:
+    try:
+        parts = list(path.relative_to(root).with_suffix("").parts)
+    except ValueError:
+        parts = [path.stem]
+    is_package = bool(parts) and parts[-1] == "__init__"
+    if is_package:
+        parts = parts[:-1]
+    return ".".join(parts), is_package
+
+
+def _resolve_relative(module: str, current: str, is_package: bool) -> str:
+    level = len(module) - len(module.lstrip("."))
+    if not level:
+        return module
+    package = current.split(".") if current else []
+    if not is_package:
+        package = package[:-1]
+    package = package[:max(0, len(package) - (level - 1))]
+    rest = module[level:]
+    return ".".join([*package, rest] if rest else package)
+
+
+def _parse_imports(lines: list[str], current: str, is_package: bool) -> dict[str, tuple[str, str | None]]:
+    """`_extract_import_lines`와 같이 라인 단위 정규식으로 import를 읽고 alias별 대상 module/symbol을 기록합니다."""
+    imports: dict[str, tuple[str, str | None]] = {}
+    for line in lines:
+        if "import" not in line:
+            continue
+        m = PY_FROM_IMPORT_RE.match(line)
+        if m:
+            module = _resolve_relative(m.group(1), current, is_package)
+            for item in m.group(2).replace(")", "").split(","):
+                name, _, alias = item.strip().partition(" as ")
+                name, alias = name.strip(), alias.strip()
+                if name and name != "*":
+                    imports[alias or name] = (module, name)
+            continue
+        m = PY_PLAIN_IMPORT_RE.match(line)
+        if m:
+            for item in m.group(1).split(","):
+                name, _, alias = item.strip().partition(" as ")
+                name, alias = name.strip(), alias.strip()
+                if name:
+                    # alias 없는 `import a.b`는 `a`만 바인딩한다.
+                    imports[alias or name.split(".")[0]] = (name if alias else name.split(".")[0], None)
+    return imports
+
+
+def summarize_module(root: Path, path: Path) -> ModuleSummary:
+    unit = load_source_unit(path)
+    lines = unit.lines
+    module, is_package = _module_name(root, path)
+    boundaries = _build_function_boundaries(lines)
+    line_owner = _build_line_index(len(lines), boundaries)
+    summary = ModuleSummary(
+        path=str(path),
+        module=module,
+        is_package=is_package,
+        content_hash=unit.content_hash,
+        line_owner=line_owner,
+        functions=set(boundaries),
+        imports=_parse_imports(lines, module, is_package),
+    )
+    for idx, line in enumerate(lines, start=1):
+        scope = line_owner[idx] or GLOBAL_SCOPE
+        if PY_SOURCE_RE.search(line):
+            summary.source_scopes.add(scope)
+        if scope != GLOBAL_SCOPE and PY_SINK_RE.search(line):
+            summary.sink_functions.add(scope)
+        if "(" not in line:
+            continue
+        names = {call for call in FUNC_CALL_RE.findall(line) if call != scope}
+        if names:
+            summary.calls.setdefault(scope, set()).update(names)
+        if "." in line:
+            attrs = set(ATTR_CALL_RE.findall(line))
+            if attrs:
+                summary.attr_calls.setdefault(scope, set()).update(attrs)
+    return summary
+
+
+class ProjectReachabilityIndex:
+    """
+    project 전체 Python 파일의 함수/호출/import 정보를 모아 module 경계를 넘는 reachability를 계산하는 index.
+
+    파일별 요약은 SourceUnit 내용 hash가 바뀐 파일만 다시 만들고, 전역 call graph와 source 도달 집합은
+    요약이 바뀐 경우에만 한 번 재구성한다. finding 분류는 계산된 도달 집합 조회만 수행한다.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self._summaries: dict[str, ModuleSummary] = {}
+        self._by_module: dict[str, str] = {}
+        # node(path, scope) -> BFS 부모 node. source node는 None을 가진다.
+        self._parents: dict[tuple[str, str], tuple[str, str] | None] = {}
+        self._dirty = True
+
+    def refresh(self, files: Iterable[Path]) -> int:
+        """현재 project 파일 목록과 동기화하고 다시 요약한 파일 수를 반환합니다."""
+        seen: set[str] = set()
+        updated = 0
+        for path in files:
+            if guess_language(str(path)) != "python":
+                continue
+            key = str(path)
+            seen.add(key)
+            # scan 중에는 탐지기가 이미 읽은 SourceUnit을 재사용하므로 hash 비교에 추가 read가 없다.
+            try:
+                content_hash = load_source_unit(path).content_hash
+            except OSError:
+                continue
+            current = self._summaries.get(key)
+            if current is not None and current.content_hash == content_hash:
+                continue
+            try:
+                self._summaries[key] = summarize_module(self.root, path)
+            except OSError:
+                continue
+            updated += 1
+        removed = [key for key in self._summaries if key not in seen]
+        for key in removed:
+            del self._summaries[key]
+        if updated or removed:
+            self._dirty = True
+        return updated
+
+    def _resolve_module(self, name: str) -> ModuleSummary | None:
+        path = self._by_module.get(name)
+        return self._summaries.get(path) if path else None
+
+    def _edges(self, summary: ModuleSummary, scope: str) -> Iterable[tuple[str, str]]:
+        for name in summary.calls.get(scope, ()):
+            if name in summary.functions:
+                yield summary.path, name
+                continue
+            target = summary.imports.get(name)
+            if target is None or target[1] is None:
+                continue
+            module = self._resolve_module(target[0])
+            if module is not None and target[1] in module.functions:
+                yield module.path, target[1]
+        for alias, attr in summary.attr_calls.get(scope, ()):
+            target = summary.imports.get(alias)
+            if target is None:
+                continue
+            # `import pkg.db as db` / `from pkg import db` 모두 db.f() 형태로 호출된다.
+            module_name = target[0] if target[1] is None else ".".join(filter(None, target))
+            module = self._resolve_module(module_name)
+            if module is not None and attr in module.functions:
+                yield module.path, attr
+
+    def _rebuild(self) -> None:
+        self._by_module = {}
+        suffix_candidates: dict[str, set[str]] = {}
+        for path, summary in self._summaries.items():
+            self._by_module[summary.module] = path
+            parts = summary.module.split(".")
+            for start in range(1, len(parts)):
+                suffix_candidates.setdefault(".".join(parts[start:]), set()).add(path)
+        # root가 sys.path 기준이 아닐 때(`src/` 하위 등)를 위해 유일한 dotted suffix로도 찾을 수 있게 한다.
+        for name, paths in suffix_candidates.items():
+            if name not in self._by_module and len(paths) == 1:
+                self._by_module[name] = next(iter(paths))
+
+        parents: dict[tuple[str, str], tuple[str, str] | None] = {}
+        queue: deque[tuple[str, str]] = deque()
+        for path, summary in self._summaries.items():
+            for scope in summary.source_scopes:
+                node = (path, scope)
+                if node not in parents:
+                    parents[node] = None
+                    queue.append(node)
+        while queue:
+            node = queue.popleft()
+            for callee in self._edges(self._summaries[node[0]], node[1]):
+                if callee not in parents:
+                    parents[callee] = node
+                    queue.append(callee)
+        self._parents = parents
+        self._dirty = False
+
+    def reachable_path(self, file_path: str, line_number: int) -> list[str] | None:
+        """sink 함수 안의 라인이 project 어딘가의 source에서 호출 경로로 도달되면 그 경로("module:function")를 반환합니다."""
+        if self._dirty:
+            self._rebuild()
+        summary = self._summaries.get(str(file_path))
+        if summary is None or not 0 < line_number < len(summary.line_owner):
+            return None
+        fn = summary.line_owner[line_number]
+        if fn is None or fn not in summary.sink_functions:
+            return None
+        node: tuple[str, str] | None = (summary.path, fn)
+        if node not in self._parents:
+            return None
+        chain: list[str] = []
+        while node is not None:
+            module = self._summaries[node[0]].module or Path(node[0]).stem
+            chain.append(f"{module}:{node[1]}")
+            node = self._parents[node]
+        return chain[::-1]
+
+    def annotate(self, findings: list[Vulnerability | ScanFinding]) -> list[Vulnerability | ScanFinding]:
+        """파일 단위 분석에서 reachable이 아니었던 finding 중 module 경계를 넘어 도달되는 것을 reachable로 올립니다."""
+        for finding in findings:
+            if finding.cwe_id == "CWE-829" or finding.reachability_status == "reachable" or not finding.file_path:
+                continue
+            chain = self.reachable_path(finding.file_path, finding.line_number)
+            if not chain:
+                continue
+            metadata = finding.metadata or {}
+            evidence = dict(metadata.get("reachability_evidence") or {})
+            evidence["cross_file_path"] = chain
+            # 증분 재분석에서 호출 경로가 사라지면 파일 단위 결과로 되돌릴 수 있게 남겨 둔다.
+            evidence["file_reachability"] = {
+                "status": finding.reachability_status or "unknown",
+                "confidence": metadata.get("reachability_confidence", "low"),
+            }
+            finding.reachability_status = "reachable"
+            finding.metadata = {
+                **metadata,
+                "reachability_mode": "project_call_graph",
+                "reachability_confidence": "high",
+                "reachability_evidence": evidence,
+            }
+        return findings
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import re
 from pathlib import Path
 
+from models.scan_finding import ScanFinding
 from models.vulnerability import Vulnerability
 from .import_risk import guess_language
+from shared.source_unit import load_source_unit
 
 PY_SOURCE_PATTERNS = [r"\binput\(", r"flask\.request", r"request\.(args|form|json)", r"sys\.argv", r"os\.environ"]
 PY_SINK_PATTERNS = [r"cursor\.execute\(", r"\.execute\(", r"\beval\(", r"subprocess\.", r"os\.system\("]
@@ -15,9 +19,18 @@ FUNC_DEF_RE = re.compile(r"^\s*def\s+(\w+)\s*\(")
 FUNC_CALL_RE = re.compile(r"\b(\w+)\s*\(")
 
 
-def _matching_lines(lines: list[str], patterns: list[str]) -> list[int]:
-    compiled = [re.compile(pattern) for pattern in patterns]
-    return [idx for idx, line in enumerate(lines, start=1) if any(pattern.search(line) for pattern in compiled)]
+def _compile_any(patterns: list[str]) -> re.Pattern:
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+PY_SOURCE_RE = _compile_any(PY_SOURCE_PATTERNS)
+PY_SINK_RE = _compile_any(PY_SINK_PATTERNS)
+JS_SOURCE_RE = _compile_any(JS_SOURCE_PATTERNS)
+JS_SINK_RE = _compile_any(JS_SINK_PATTERNS)
+
+
+def _matching_lines(lines: list[str], pattern: re.Pattern) -> list[int]:
+    return [idx for idx, line in enumerate(lines, start=1) if pattern.search(line)]
 
 
 def _build_function_boundaries(lines: list[str]) -> dict[str, tuple[int, int]]:
@@ -25,6 +38,8 @@ def _build_function_boundaries(lines: list[str]) -> dict[str, tuple[int, int]]:
     current_fn = None
     start_line = 1
     for idx, line in enumerate(lines, start=1):
+        if "def" not in line:
+            continue
         m = FUNC_DEF_RE.match(line)
         if m:
             if current_fn is not None:
@@ -36,73 +51,112 @@ def _build_function_boundaries(lines: list[str]) -> dict[str, tuple[int, int]]:
     return boundaries
 
 
-def _find_function_for_line(line_number: int, boundaries: dict[str, tuple[int, int]]) -> str | None:
+def _build_line_index(line_count: int, boundaries: dict[str, tuple[int, int]]) -> list[str | None]:
+    """
+    1-based 라인 번호 -> 소속 함수 이름 배열을 만듭니다. (index 0은 사용하지 않음)
+
+    boundary 구간은 서로 겹치지 않으므로 구간마다 한 번씩 채우면 O(라인 수)로 끝난다.
+    """
+    owner: list[str | None] = [None] * (line_count + 1)
     for fn, (start, end) in boundaries.items():
-        if start <= line_number <= end:
-            return fn
-    return None
+        owner[start:end + 1] = [fn] * (end - start + 1)
+    return owner
 
 
-def _build_call_graph(lines: list[str], boundaries: dict[str, tuple[int, int]]) -> dict[str, set[str]]:
+def _build_call_graph(lines: list[str], line_owner: list[str | None], boundaries: dict[str, tuple[int, int]]) -> dict[str, set[str]]:
+    """라인을 한 번만 훑으면서 함수별/전역 호출 edge를 모읍니다."""
     calls: dict[str, set[str]] = {fn: set() for fn in boundaries}
     global_calls: set[str] = set()
-    for fn, (start, end) in boundaries.items():
-        for line in lines[start - 1:end]:
-            for call in FUNC_CALL_RE.findall(line):
-                if call != fn and call in boundaries:
-                    calls[fn].add(call)
+    if not boundaries:
+        return calls
     for idx, line in enumerate(lines, start=1):
-        if not any(start <= idx <= end for start, end in boundaries.values()):
-            for call in FUNC_CALL_RE.findall(line):
-                if call in boundaries:
-                    global_calls.add(call)
+        if "(" not in line:
+            continue
+        fn = line_owner[idx]
+        targets = calls[fn] if fn is not None else global_calls
+        for call in FUNC_CALL_RE.findall(line):
+            if call != fn and call in boundaries:
+                targets.add(call)
     if global_calls:
         calls["<global>"] = global_calls
     return calls
 
 
 def _compute_reachable_functions(start_points: set[str], call_graph: dict[str, set[str]]) -> set[str]:
-    reached = set()
-
-    def dfs(fn: str):
+    reached: set[str] = set()
+    stack = list(start_points)
+    while stack:
+        fn = stack.pop()
         if fn in reached:
-            return
+            continue
         reached.add(fn)
-        for callee in call_graph.get(fn, set()):
-            if callee not in reached:
-                dfs(callee)
-
-    for sp in start_points:
-        dfs(sp)
+        stack.extend(callee for callee in call_graph.get(fn, ()) if callee not in reached)
     return reached
 
 
-def annotate_reachability(file_path: str, findings: list[Vulnerability]) -> list[Vulnerability]:
+def _call_graph_id(evidence: dict) -> str:
+    """파일 단위 call graph evidence의 내용 기반 ID. (worker process, findings cache hit에서도 같은 ID)"""
+    return hashlib.sha256(json.dumps(evidence, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _analyze_lines(lines: list[str], is_js: bool) -> dict:
+    source_hits = _matching_lines(lines, JS_SOURCE_RE if is_js else PY_SOURCE_RE)
+    sink_hits = _matching_lines(lines, JS_SINK_RE if is_js else PY_SINK_RE)
+    boundaries = _build_function_boundaries(lines)
+    line_owner = _build_line_index(len(lines), boundaries)
+    call_graph = _build_call_graph(lines, line_owner, boundaries)
+    source_functions = {line_owner[i] for i in source_hits} - {None}
+    sink_functions = {line_owner[i] for i in sink_hits} - {None}
+    return {
+        "source_hits": source_hits,
+        "sink_hits": sink_hits,
+        "boundaries": boundaries,
+        "line_owner": line_owner,
+        "source_functions": source_functions,
+        "sink_functions": sink_functions,
+        "reachable": _compute_reachable_functions(source_functions, call_graph) if source_functions else set(),
+        "evidence": {
+            "source_functions": sorted(source_functions),
+            "sink_functions": sorted(sink_functions),
+            "call_graph": {k: sorted(v) for k, v in sorted(call_graph.items())},
+        },
+    }
+
+
+def annotate_reachability(
+    file_path: str,
+    findings: list[Vulnerability | ScanFinding],
+    call_graphs: dict[str, dict] | None = None,
+) -> list[Vulnerability | ScanFinding]:
+    """
+    파일 단위 call graph로 finding의 reachability를 채웁니다.
+
+    함수 목록과 call graph는 finding마다 복사하지 않고 `call_graph_id`만 남긴다. call_graphs를 주면
+    `{file_path: {"call_graph_id", "source_functions", "sink_functions", "call_graph"}}`로 파일당 한 번 담는다.
+    """
     language = guess_language(file_path)
-    source_patterns = JS_SOURCE_PATTERNS if language in {"javascript", "typescript"} else PY_SOURCE_PATTERNS
-    sink_patterns = JS_SINK_PATTERNS if language in {"javascript", "typescript"} else PY_SINK_PATTERNS
+    is_js = language in {"javascript", "typescript"}
     path = Path(file_path)
     if not path.exists():
         return findings
-    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    lines = load_source_unit(path).lines
     if not lines:
         return findings
 
-    source_hits = _matching_lines(lines, source_patterns)
-    sink_hits = _matching_lines(lines, sink_patterns)
-    boundaries = _build_function_boundaries(lines)
-    call_graph = _build_call_graph(lines, boundaries)
-
-    source_functions = set(filter(None, (_find_function_for_line(i, boundaries) for i in source_hits)))
-    sink_functions = set(filter(None, (_find_function_for_line(i, boundaries) for i in sink_hits)))
-
-    reachable_from_source = _compute_reachable_functions(source_functions, call_graph) if source_functions else set()
+    analysis = _analyze_lines(lines, is_js)
+    source_hits, sink_hits = analysis["source_hits"], analysis["sink_hits"]
+    boundaries, line_owner = analysis["boundaries"], analysis["line_owner"]
+    source_functions, sink_functions = analysis["source_functions"], analysis["sink_functions"]
+    reachable_from_source = analysis["reachable"]
+    graph_id = _call_graph_id(analysis["evidence"])
+    annotated = False
 
     for finding in findings:
         if finding.cwe_id == "CWE-829":
             continue
 
-        fn = _find_function_for_line(finding.line_number, boundaries)
+        line_number = finding.line_number
+        fn = line_owner[line_number] if 0 < line_number <= len(lines) else None
 
         if not source_hits or not sink_hits:
             status = "unreachable"
@@ -122,17 +176,20 @@ def annotate_reachability(file_path: str, findings: list[Vulnerability]) -> list
             confidence = "medium"
 
         finding.reachability_status = status
-        finding.metadata.update({
+        # ScanFinding의 metadata는 rule 단위로 공유되므로 제자리에서 고치지 않고 새 dict로 바꾼다.
+        finding.metadata = {
+            **(finding.metadata or {}),
             "reachability_mode": "call_graph",
             "reachability_confidence": confidence,
             "reachability_evidence": {
                 "source_hits": len(source_hits),
                 "sink_hits": len(sink_hits),
-                "source_functions": list(source_functions),
-                "sink_functions": list(sink_functions),
                 "current_function": fn,
-                "call_graph": {k: list(v) for k, v in call_graph.items()},
+                "call_graph_id": graph_id,
             },
-        })
+        }
+        annotated = True
 
+    if annotated and call_graphs is not None:
+        call_graphs[file_path] = {"call_graph_id": graph_id, **analysis["evidence"]}
     return findings
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import weakref
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from repository.base_repository import BaseReadRepository
+
+# 이 길이보다 짧은 literal은 prefilter 효과가 작아 anchor로 쓰지 않는다.
+MIN_ANCHOR_LENGTH = 3
+
+
+def required_literal(pattern: str) -> str | None:
+    """
+    regex가 매치되려면 반드시 포함해야 하는 가장 긴 top-level literal을 반환합니다.
+
+    top-level alternation, 대소문자 무시 flag, parse 실패 등 보장할 수 없는 경우 None을 반환한다.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, OverflowError, RecursionError):
+        return None
+    if parsed.state.flags & re.IGNORECASE:
+        return None
+    best, run = "", []
+    for op, arg in list(parsed) + [(None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+        if len(run) > len(best):
+            best = "".join(run)
+        run = []
+    return best if len(best) >= MIN_ANCHOR_LENGTH else None
+
+
+def knowledge_digest(knowledge_list: list[dict]) -> str:
+    return hashlib.sha256(
+        json.dumps(knowledge_list, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledKnowledgeRule:
+    order: int
+    knowledge: dict
+    pattern: str
+    regex: re.Pattern
+    literal: str | None
+
+
+class KnowledgeRuleIndex:
+    """
+    knowledge 목록을 한 번 컴파일해 둔 rule index.
+
+    rule별 precompiled regex와 필수 literal(anchor)을 보관하고, 모든 anchor를 하나의 alternation으로 묶어
+    파일 전체를 한 번만 훑어 후보 라인을 고른다. anchor가 없는 라인은 regex를 실행하지 않는다.
+    """
+
+    def __init__(self, knowledge_list: list[dict], stamp: Any = None, digest: str | None = None):
+        self.knowledge_list = knowledge_list
+        self.stamp = stamp
+        self.digest = digest or knowledge_digest(knowledge_list)
+        rules: list[CompiledKnowledgeRule] = []
+        for order, knowledge in enumerate(knowledge_list):
+            pattern = knowledge.get("pattern")
+            if not pattern:
+                continue
+            try:
+                regex = re.compile(pattern)
+            except re.error:
+                print(f"[WARN] Invalid knowledge pattern skipped: {pattern}")
+                continue
+            rules.append(CompiledKnowledgeRule(order, knowledge, pattern, regex, required_literal(pattern)))
+        self.rules = rules
+        self._unanchored = [rule for rule in rules if rule.literal is None]
+        anchors = sorted({rule.literal for rule in rules if rule.literal}, key=len, reverse=True)
+        self._anchor_re = re.compile("|".join(re.escape(anchor) for anchor in anchors)) if anchors else None
+
+    def may_match(self, text: str) -> bool:
+        """text 어딘가에서 rule이 매치될 가능성이 있는지 반환합니다. False면 어떤 rule도 매치되지 않는다."""
+        if self._unanchored:
+            return True
+        return self._anchor_re is not None and self._anchor_re.search(text) is not None
+
+    def candidate_lines(self, lines: list[str], text: str | None = None, offsets: list[int] | None = None) -> Iterable[int]:
+        """
+        rule이 매치될 수 있는 0-based 라인 index를 오름차순으로 반환합니다.
+
+        text/offsets는 `"\\n".join(lines)`와 그 라인 시작 offset (SourceUnit.joined_text/line_offsets)이다.
+        """
+        if self._unanchored:
+            return range(len(lines))
+        if self._anchor_re is None:
+            return []
+        if text is None or offsets is None:
+            text = "\n".join(lines)
+            offsets = [0]
+            position = text.find("\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = text.find("\n", position + 1)
+        candidates: list[int] = []
+        for match in self._anchor_re.finditer(text):
+            idx = bisect_right(offsets, match.start()) - 1
+            if not candidates or candidates[-1] != idx:
+                candidates.append(idx)
+        return candidates
+
+    def match(self, text: str) -> list[CompiledKnowledgeRule]:
+        """text(라인 또는 snippet)에 매치되는 rule을 knowledge 정의 순서대로 반환합니다."""
+        return [
+            rule for rule in self.rules
+            if (rule.literal is None or rule.literal in text) and rule.regex.search(text)
+        ]
+
+
+_INDEXES: "weakref.WeakKeyDictionary[BaseReadRepository, KnowledgeRuleIndex]" = weakref.WeakKeyDictionary()
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_knowledge_rule_index(knowledge_repo: BaseReadRepository) -> KnowledgeRuleIndex:
+    """
+    knowledge repo의 compiled rule index를 반환합니다.
+
+    repo가 `source_stamp()`를 제공하면 stamp(mtime/size)가 같을 때 find_all()을 다시 읽지 않는다.
+    제공하지 않으면 find_all() 결과의 content hash가 같을 때 기존 index를 재사용한다.
+    """
+    stamp_fn = getattr(knowledge_repo, "source_stamp", None)
+    stamp = stamp_fn() if callable(stamp_fn) else None
+    with _INDEXES_LOCK:
+        try:
+            current = _INDEXES.get(knowledge_repo)
+        except TypeError:
+            current = None
+    if current is not None and stamp is not None and current.stamp == stamp:
+        return current
+
+    knowledge_list = knowledge_repo.find_all()
+    digest = knowledge_digest(knowledge_list)
+    if current is not None and current.digest == digest:
+        current.stamp = stamp
+        return current
+    index = KnowledgeRuleIndex(knowledge_list, stamp, digest)
+    with _INDEXES_LOCK:
+        try:
+            _INDEXES[knowledge_repo] = index
+        except TypeError:
+            pass
+    return index
@@ -133,8 +133,15 @@ def _normalize_package_records(findings: list[Vulnerability]) -> list[PackageRec
     return records
 
 
-def normalize_scan_result(result: ScanResult) -> ScanResult:
-    result.vuln_records = [_normalize_vuln_record(finding, i + 1) for i, finding in enumerate(result.findings)]
+def normalize_scan_result(result: ScanResult, id_offset: int = 0) -> ScanResult:
+    """
+    finding을 VulnRecord/PackageRecord로 정규화합니다.
+
+    Args:
+        result: L1 스캔 결과
+        id_offset: vuln_id 번호 시작 오프셋. 기존 report에 record를 덧붙일 때 번호 충돌을 피하기 위해 사용한다.
+    """
+    result.vuln_records = [_normalize_vuln_record(finding, id_offset + i + 1) for i, finding in enumerate(result.findings)]
     result.package_records = _normalize_package_records(result.findings)
     result.notes = [f"layer=L1", f"language={result.language}", f"findings={len(result.findings)}", f"package_records={len(result.package_records)}"]
     return result
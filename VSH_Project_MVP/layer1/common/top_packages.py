@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable
+
+try:
+    from config import DATA_DIR
+    TOP_PACKAGES_DIR = Path(DATA_DIR) / "top_packages"
+except ImportError:
+    TOP_PACKAGES_DIR = Path.home() / ".vsh" / "runtime_data" / "top_packages"
+
+# ecosystem별 top-package corpus 파일 이름 (한 줄에 하나, 또는 JSON 문자열 배열)
+CORPUS_FILES = {"PyPI": "pypi.txt", "npm": "npm.txt"}
+VERDICT_CACHE_SIZE = 4096
+
+
+def corpus_path(ecosystem: str) -> Path:
+    """`VSH_TOP_PACKAGES_DIR` 환경변수가 있으면 그 디렉터리를, 없으면 runtime data 디렉터리를 사용합니다."""
+    base = os.getenv("VSH_TOP_PACKAGES_DIR")
+    return (Path(base) if base else TOP_PACKAGES_DIR) / CORPUS_FILES.get(ecosystem, f"{ecosystem.lower()}.txt")
+
+
+def load_corpus_file(path: Path) -> list[str]:
+    text = path.read_text(encoding="utf-8", errors="ignore")
+    if text.lstrip().startswith("["):
+        try:
+            return [str(name).strip() for name in json.loads(text) if str(name).strip()]
+        except ValueError:
+            pass
+    names = []
+    for line in text.splitlines():
+        # "name" 또는 "name,downloads" 형식 모두 허용한다.
+        name = line.split("#", 1)[0].split(",", 1)[0].strip()
+        if name:
+            names.append(name)
+    return names
+
+
+def _bigrams(text: str) -> dict[str, int]:
+    counts: dict[str, int] = defaultdict(int)
+    for idx in range(len(text) - 1):
+        counts[text[idx:idx + 2]] += 1
+    return counts
+
+
+def bounded_levenshtein(s1: str, s2: str, bound: int) -> int:
+    """편집 거리가 bound 이하이면 그 값을, 넘으면 bound + 1을 반환합니다. (row 최소값이 bound를 넘으면 조기 종료)"""
+    if abs(len(s1) - len(s2)) > bound:
+        return bound + 1
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1):
+        current = [i + 1]
+        for j, c2 in enumerate(s2):
+            current.append(min(previous[j + 1] + 1, current[j] + 1, previous[j] + (c1 != c2)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return previous[-1] if previous[-1] <= bound else bound + 1
+
+
+class TopPackageIndex:
+    """
+    top-package 이름을 정규화해 두고 typosquatting 후보만 빠르게 골라내는 index.
+
+    정규화 이름의 길이 bucket, bigram inverted index(q-gram count filter), prefix/suffix 정렬 목록을 유지한다.
+    threshold를 넘을 수 있는 이름만 후보로 남긴 뒤 `score`로 정확한 점수를 계산하므로 전수 비교와 같은 best match를 찾는다.
+    module 이름별 판정 결과는 LRU로 캐시한다.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str],
+        normalize: Callable[[str], str],
+        score: Callable[[str, str], tuple[float, list[str]]],
+        candidate_bonus: Callable[[str, str], float],
+        threshold: float,
+        pair_bonus: float,
+    ):
+        self.names = sorted(set(names))
+        self.normalize = normalize
+        self.score = score
+        self.candidate_bonus = candidate_bonus
+        self.threshold = threshold
+        self.pair_bonus = pair_bonus
+        self.digest = hashlib.sha256("\n".join(self.names).encode("utf-8")).hexdigest()
+
+        self._by_norm: dict[str, list[str]] = defaultdict(list)
+        for name in self.names:
+            self._by_norm[normalize(name)].append(name)
+        self._norms = sorted(self._by_norm)
+        self._reversed = sorted(norm[::-1] for norm in self._norms)
+        self._by_length: dict[int, list[int]] = defaultdict(list)
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for norm_id, norm in enumerate(self._norms):
+            self._by_length[len(norm)].append(norm_id)
+            for gram, count in _bigrams(norm).items():
+                self._postings[gram].append((norm_id, count))
+        self.best_match = lru_cache(maxsize=VERDICT_CACHE_SIZE)(self._best_match)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _range_with_prefix(self, ordered: list[str], prefix: str) -> Iterable[str]:
+        idx = bisect_left(ordered, prefix)
+        while idx < len(ordered) and ordered[idx].startswith(prefix):
+            yield ordered[idx]
+            idx += 1
+
+    def _affix_candidates(self, norm: str, min_sim: float) -> set[str]:
+        """prefix/suffix 관계(점수 보너스 대상)이면서 최소 유사도를 넘을 수 있는 정규화 이름들."""
+        found: set[str] = set()
+        length = len(norm)
+        # 후보가 top 이름을 prefix/suffix로 포함: sim = len(top) / len(candidate)
+        for k in range(max(1, int(min_sim * length)), length):
+            if norm[:k] in self._by_norm:
+                found.add(norm[:k])
+            if norm[-k:] in self._by_norm:
+                found.add(norm[-k:])
+        # top 이름이 후보를 prefix/suffix로 포함: sim = len(candidate) / len(top)
+        max_length = length / min_sim if min_sim > 0 else float("inf")
+        for other in self._range_with_prefix(self._norms, norm):
+            if len(other) <= max_length:
+                found.add(other)
+        for other in self._range_with_prefix(self._reversed, norm[::-1]):
+            if len(other) <= max_length:
+                found.add(other[::-1])
+        return found
+
+    def _edit_candidates(self, norm: str, min_sim: float) -> set[str]:
+        """유사도 min_sim 이상(편집 거리 bound 이하)이 될 수 있는 정규화 이름들. 길이 window + bigram count filter."""
+        length = len(norm)
+        min_sim = max(min_sim, 1e-6)
+        low, high = int(length * min_sim), int(length / min_sim) + 1
+        counts: dict[int, int] = defaultdict(int)
+        for gram, query_count in _bigrams(norm).items():
+            for norm_id, count in self._postings.get(gram, ()):
+                counts[norm_id] += min(query_count, count)
+
+        # 길이별 편집 거리 bound와 q-gram lemma 하한: 편집 거리 d이면 공통 bigram이 max(len) - 1 - 2d 개 이상이다.
+        limits: dict[int, tuple[int, int]] = {}
+        for other_length in range(max(1, low), high + 1):
+            longest = max(length, other_length)
+            bound = int((1.0 - min_sim) * longest + 1e-9)
+            limits[other_length] = (bound, longest - 1 - 2 * bound)
+
+        found: set[str] = set()
+        for norm_id, shared in counts.items():
+            other = self._norms[norm_id]
+            limit = limits.get(len(other))
+            if limit is None or limit[1] <= 0 or shared < limit[1]:
+                continue
+            if bounded_levenshtein(norm, other, limit[0]) <= limit[0]:
+                found.add(other)
+        # 하한이 0 이하인 (짧은) 길이는 공통 bigram이 없어도 후보가 될 수 있으므로 bucket 전체를 확인한다.
+        for other_length, (bound, required) in limits.items():
+            if required > 0:
+                continue
+            for norm_id in self._by_length.get(other_length, ()):
+                other = self._norms[norm_id]
+                if bounded_levenshtein(norm, other, bound) <= bound:
+                    found.add(other)
+        return found
+
+    def _best_match(self, candidate: str) -> tuple[str, float, tuple[str, ...]] | None:
+        """threshold 이상인 best match (top 이름, 점수, evidence)를 반환합니다. 없으면 None."""
+        norm = self.normalize(candidate)
+        if not norm or norm in self._by_norm:
+            # 정규화 이름이 top 목록에 그대로 있으면 정식 패키지다.
+            return None
+        bonus = self.candidate_bonus(candidate, norm)
+        min_sim = self.threshold - bonus
+        pool = self._edit_candidates(norm, min_sim) | self._affix_candidates(norm, min_sim - self.pair_bonus)
+
+        best: tuple[str, float, tuple[str, ...]] | None = None
+        for other in sorted(pool):
+            for name in self._by_norm[other]:
+                score, evidence = self.score(candidate, name)
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (name, score, tuple(evidence))
+        return best
+
+
+_INDEXES: dict[tuple, tuple[tuple, TopPackageIndex]] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_top_package_index(ecosystem: str, builtin: Iterable[str], **index_kwargs) -> TopPackageIndex:
+    """
+    ecosystem의 top-package index를 반환합니다. 내장 목록에 corpus 파일(있으면)을 합쳐 만들며,
+    corpus 파일의 (mtime_ns, size)가 바뀌었을 때만 다시 만든다.
+    """
+    path = corpus_path(ecosystem)
+    try:
+        stat = path.stat()
+        stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = (str(path), None, None)
+    builtin = tuple(sorted(builtin))
+    key = (ecosystem, builtin)
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+    names = list(builtin)
+    if stamp[1] is not None:
+        try:
+            names.extend(load_corpus_file(path))
+        except OSError as exc:
+            print(f"[WARN] top package corpus not loaded ({path}): {exc}")
+    index = TopPackageIndex(names, **index_kwargs)
+    with _INDEXES_LOCK:
+        _INDEXES[key] = (stamp, index)
+    return index
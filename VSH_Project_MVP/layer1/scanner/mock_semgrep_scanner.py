@@ -1,14 +1,17 @@
 import os
-import re
 from typing import List
 from shared.contracts import BaseScanner
 from models.scan_result import ScanResult
 from models.vulnerability import Vulnerability
+from layer1.common.rule_index import get_knowledge_rule_index
 from repository.base_repository import BaseReadRepository
+from shared.source_unit import load_source_unit
 
 class MockSemgrepScanner(BaseScanner):
     """
     Semgrep을 대신하여 knowledge.json 패턴 기반 문자열 매칭을 수행하는 Mock Scanner.
+
+    knowledge pattern은 TreeSitterScanner와 공유하는 compiled rule index(get_knowledge_rule_index)로 평가한다.
     """
     def __init__(self, knowledge_repo: BaseReadRepository):
         self.knowledge_repo = knowledge_repo
@@ -18,25 +21,25 @@ class MockSemgrepScanner(BaseScanner):
         if not os.path.exists(file_path):
             return ScanResult(file_path=file_path, language="python", findings=[])
 
-        knowledge_list = self.knowledge_repo.find_all()
+        rule_index = get_knowledge_rule_index(self.knowledge_repo)
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                
-            for line_idx, line in enumerate(lines):
-                line_number = line_idx + 1
-                for knowledge in knowledge_list:
-                    pattern = knowledge.get("pattern")
-                    if pattern and re.search(pattern, line):
-                        v = Vulnerability(
-                            file_path=file_path,
-                            cwe_id=knowledge.get("id", "UNKNOWN"),
-                            severity=knowledge.get("severity", "MEDIUM"),
-                            line_number=line_number,
-                            code_snippet=line.strip()
-                        )
-                        findings.append(v)
+            unit = load_source_unit(file_path)
+            lines = unit.lines
+
+            # anchor literal이 없는 라인은 regex를 실행하지 않는다.
+            for line_idx in rule_index.candidate_lines(lines, unit.joined_text, unit.line_offsets):
+                line = lines[line_idx]
+                for rule in rule_index.match(line):
+                    knowledge = rule.knowledge
+                    v = Vulnerability(
+                        file_path=file_path,
+                        cwe_id=knowledge.get("id", "UNKNOWN"),
+                        severity=knowledge.get("severity", "MEDIUM"),
+                        line_number=line_idx + 1,
+                        code_snippet=line.strip()
+                    )
+                    findings.append(v)
         except Exception as e:
             print(f"[ERROR] MockSemgrepScanner file read error: {e}")
             
@@ -1,15 +1,16 @@
 from __future__ import annotations
 
-import re
 from pathlib import Path
 from typing import Iterable, List
 
-from packaging.version import parse as parse_version
+from packaging.version import InvalidVersion, parse as parse_version
 
+from layer1.common.manifest_parsers import manifest_packages
 from models.scan_result import ScanResult
 from models.vulnerability import Vulnerability
 from shared.contracts import BaseScanner
 from shared.logging_utils import get_logger
+from shared.manifest_registry import MANIFEST_FILES, MANIFEST_REGISTRY
 
 try:
     from config import VULNERABLE_PACKAGES
@@ -17,17 +18,6 @@ except ImportError:
     VULNERABLE_PACKAGES = {}
 
 LOGGER = get_logger(__name__)
-MANIFEST_FILES = [
-    "requirements.txt",
-    "pyproject.toml",
-    "Pipfile",
-    "poetry.lock",
-    "package.json",
-    "package-lock.json",
-    "yarn.lock",
-    "pnpm-lock.yaml",
-]
-REQ_RE = re.compile(r"^([a-zA-Z0-9_\-.@/]+)(?:[=!<>~]+([0-9a-zA-Z\-.+]+))?")
 
 
 class SBOMScanner(BaseScanner):
@@ -44,7 +34,11 @@ class SBOMScanner(BaseScanner):
                 if not vuln_info:
                     continue
                 vulnerable_below = vuln_info.get("vulnerable_below")
-                is_vulnerable = not package_version or (vulnerable_below and parse_version(package_version) < parse_version(vulnerable_below))
+                try:
+                    is_vulnerable = not package_version or (vulnerable_below and parse_version(package_version) < parse_version(vulnerable_below))
+                except InvalidVersion:
+                    # lockfile의 git/file/tarball 버전 등은 비교할 수 없다.
+                    continue
                 if not is_vulnerable:
                     continue
                 findings.append(Vulnerability(
@@ -68,58 +62,14 @@ class SBOMScanner(BaseScanner):
         return ["python", "javascript", "typescript", "multi"]
 
     def _guess_project_root(self, target: Path) -> Path:
-        path = target if target.is_dir() else target.parent
-        for current in [path, *path.parents]:
-            if any((current / manifest).exists() for manifest in MANIFEST_FILES):
-                return current
-        return path
+        return MANIFEST_REGISTRY.project_root(target)
 
     def _collect_manifests(self, root: Path) -> Iterable[Path]:
-        for file_name in MANIFEST_FILES:
-            manifest = root / file_name
-            if manifest.exists() and manifest.is_file():
-                yield manifest
+        return MANIFEST_REGISTRY.manifests(root)
 
     def _extract_packages(self, manifest: Path) -> Iterable[tuple[int, str, str | None, str]]:
-        text = manifest.read_text(encoding="utf-8", errors="ignore")
-        if manifest.name == "package.json":
-            try:
-                import json
-                data = json.loads(text)
-                for section in ["dependencies", "devDependencies", "peerDependencies", "optionalDependencies"]:
-                    deps = data.get(section, {}) or {}
-                    for pkg, ver in deps.items():
-                        yielding_line = f"{pkg}@{ver} ({section})"
-                        yield 0, pkg, str(ver), yielding_line
-                return
-            except Exception:
-                pass
-
-        if manifest.name in {"package-lock.json", "yarn.lock", "pnpm-lock.yaml"}:
-            for idx, line in enumerate(text.splitlines(), start=1):
-                # simple lock file parsing fallback
-                if "@" in line and line.strip().startswith("\""):
-                    parts = line.strip().strip('"').split("@", 1)
-                    if len(parts) == 2:
-                        pkg = parts[0]
-                        version = parts[1].split(":")[0].strip()
-                        if pkg and version:
-                            yield idx, pkg, version, line.strip()
-                if "version" in line and ":" in line and "\"" in line:
-                    m = re.search(r"[\"']([0-9a-zA-Z_\-.]+)[\"']", line)
-                    if m:
-                        version = m.group(1)
-                        # package name may be implied by prior key, ignore for now
-            # continue with requirement-file fallback
-
-        for idx, line in enumerate(text.splitlines(), start=1):
-            stripped = line.strip().strip(',')
-            if not stripped or stripped.startswith("#"):
-                continue
-            m = REQ_RE.match(stripped.strip('"'))
-            if not m:
-                continue
-            yield idx, m.group(1), m.group(2), stripped
+        """manifest의 (line_no, package, version, raw_line) 목록. 같은 내용의 manifest는 다시 parse하지 않는다."""
+        return manifest_packages(manifest)
 
     @staticmethod
     def _infer_ecosystem(manifest_name: str) -> str:
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import subprocess
-import tempfile
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Iterable, List
 
 from models.scan_result import ScanResult
 from models.vulnerability import Vulnerability
@@ -12,6 +13,15 @@ from repository.base_repository import BaseReadRepository
 from shared.contracts import BaseScanner
 from shared.runtime_settings import detect_semgrep
 
+try:
+    from config import SEMGREP_CACHE_DIR
+except ImportError:
+    SEMGREP_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / ".cache" / "semgrep"
+
+SEMGREP_TIMEOUT_SEC = 90
+# Windows 명령행 길이(32767자) 안쪽에서 한 번의 semgrep 실행에 넘길 target 경로 길이 합
+BATCH_TARGET_CHARS = 24000
+
 
 def _language_for_semgrep(file_path: str) -> str:
     suffix = Path(file_path).suffix.lower()
@@ -113,6 +123,36 @@ def _base_rule_configs() -> list[dict[str, Any]]:
     ]
 
 
+def _cached_rule_config(rules: list[dict[str, Any]]) -> Path:
+    """rule 내용 hash를 파일명으로 쓰는 semgrep config를 재사용하고, 없을 때만 새로 기록합니다."""
+    payload = json.dumps({"rules": rules}, ensure_ascii=False, sort_keys=True, indent=2)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+    cache_dir = Path(SEMGREP_CACHE_DIR)
+    config_path = cache_dir / f"rules-{digest}.json"
+    if config_path.exists():
+        return config_path
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_dir / f"{config_path.name}.{os.getpid()}.tmp"
+    tmp_path.write_text(payload, encoding="utf-8")
+    tmp_path.replace(config_path)
+    return config_path
+
+
+def _chunk_targets(targets: list[str], max_chars: int = BATCH_TARGET_CHARS) -> list[list[str]]:
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for target in targets:
+        if current and size + len(target) + 1 > max_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(target)
+        size += len(target) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 class SemgrepCLIScanner(BaseScanner):
     def __init__(self, knowledge_repo: BaseReadRepository | None = None, config: dict[str, Any] | None = None):
         self.knowledge_repo = knowledge_repo
@@ -145,18 +185,63 @@ class SemgrepCLIScanner(BaseScanner):
             result.notes.append(note)
         return result
 
+    def scan_many(self, file_paths: Iterable[str]) -> tuple[dict[str, list[Vulnerability]], set[str]]:
+        """
+        여러 파일을 semgrep 실행 한 번(경로가 많으면 몇 번)으로 스캔하고 결과를 파일별로 나눠 반환합니다.
+
+        Returns:
+            tuple: (입력 경로별 finding 목록, 실행이 실패/timeout된 batch의 경로 집합).
+            semgrep을 쓸 수 없으면 모두 빈 목록이고 실패 집합도 비어 있다.
+        """
+        targets = [str(Path(p)) for p in file_paths if Path(p).is_file()]
+        by_file: dict[str, list[Vulnerability]] = {target: [] for target in targets}
+        failed: set[str] = set()
+        if not targets:
+            return by_file, failed
+
+        semgrep_path = detect_semgrep(self.config).get("path")
+        if not semgrep_path:
+            return by_file, failed
+
+        lookup: dict[str, str] = {}
+        # knowledge rule의 pattern-regex는 언어를 가리지 않으므로 언어별로 config를 나눠 실행한다.
+        # config 내용이 batch의 언어 구성과 무관해져 rule config 파일도 언어마다 하나로 재사용된다.
+        groups: dict[str, list[str]] = {}
+        for target in targets:
+            lookup[target] = target
+            lookup[str(Path(target).resolve())] = target
+            groups.setdefault(_language_for_semgrep(target), []).append(target)
+
+        for language, group in sorted(groups.items()):
+            rules = self._build_rules_for_language(language)
+            for chunk in _chunk_targets(group):
+                findings, note = self._run_semgrep(semgrep_path, chunk, rules, timeout=SEMGREP_TIMEOUT_SEC + len(chunk))
+                if note != "engine=semgrep_cli":
+                    print(f"[WARN] SemgrepCLIScanner batch run failed: {note}")
+                    failed.update(chunk)
+                for finding in findings:
+                    raw_path = finding.file_path or ""
+                    owner = lookup.get(raw_path) or lookup.get(str(Path(raw_path).resolve()))
+                    if owner is None:
+                        continue
+                    finding.file_path = owner
+                    by_file[owner].append(finding)
+        return by_file, failed
+
     def _build_rules(self, target_path: str) -> list[dict[str, Any]]:
+        return self._build_rules_for_language(_language_for_semgrep(target_path))
+
+    def _build_rules_for_language(self, language: str) -> list[dict[str, Any]]:
         rules = list(_base_rule_configs())
-        language = _language_for_semgrep(target_path)
 
         if self.knowledge_repo is None:
             return rules
 
+        rule_languages = ["python" if language == "generic" else language]
         for item in self.knowledge_repo.find_all():
             pattern = str(item.get("pattern") or "").strip()
             if not pattern:
                 continue
-            rule_language = "python" if language == "generic" else language
             metadata = {
                 "cwe_id": item.get("id", "UNKNOWN"),
                 "severity": item.get("severity", "MEDIUM"),
@@ -170,35 +255,42 @@ class SemgrepCLIScanner(BaseScanner):
                     "id": f"vsh.knowledge.{item.get('id', 'unknown').lower()}",
                     "message": item.get("description") or item.get("name") or item.get("id") or "Knowledge rule match",
                     "severity": "WARNING",
-                    "languages": [rule_language],
+                    "languages": rule_languages,
                     "metadata": metadata,
                     "pattern-regex": pattern,
                 }
             )
         return rules
 
-    def _run_semgrep(self, semgrep_path: str, target_path: str, rules: list[dict[str, Any]]) -> tuple[list[Vulnerability], str]:
-        config_payload = {"rules": rules}
-        with tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8", delete=False) as handle:
-            config_path = handle.name
-            json.dump(config_payload, handle, ensure_ascii=False, indent=2)
+    def _run_semgrep(
+        self,
+        semgrep_path: str,
+        target_path: str | list[str],
+        rules: list[dict[str, Any]],
+        timeout: int = SEMGREP_TIMEOUT_SEC,
+    ) -> tuple[list[Vulnerability], str]:
+        targets = [target_path] if isinstance(target_path, str) else list(target_path)
+        try:
+            config_path = _cached_rule_config(rules)
+        except OSError as exc:
+            return [], f"semgrep_cli_error={exc}"
 
         cmd = [
             semgrep_path,
             "scan",
             "--config",
-            config_path,
+            str(config_path),
             "--json",
             "--quiet",
             "--disable-version-check",
-            target_path,
+            *targets,
         ]
         try:
             proc = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=90,
+                timeout=timeout,
                 check=False,
             )
             if proc.returncode not in {0, 1}:
@@ -208,8 +300,6 @@ class SemgrepCLIScanner(BaseScanner):
             return self._parse_results(payload), "engine=semgrep_cli"
         except Exception as exc:
             return [], f"semgrep_cli_error={exc}"
-        finally:
-            Path(config_path).unlink(missing_ok=True)
 
     def _parse_results(self, payload: dict[str, Any]) -> list[Vulnerability]:
         findings: list[Vulnerability] = []
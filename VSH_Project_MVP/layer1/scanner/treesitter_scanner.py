@@ -1,68 +1,167 @@
 import os
-import re
+import threading
+from collections import OrderedDict
 from typing import List
 import tree_sitter_python
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Parser, Point
 from shared.contracts import BaseScanner
 from models.scan_result import ScanResult
 from models.vulnerability import Vulnerability
+from layer1.common.rule_index import CompiledKnowledgeRule, KnowledgeRuleIndex, get_knowledge_rule_index
 from repository.base_repository import BaseReadRepository
+from shared.source_unit import load_source_unit
+
+# watcher 재스캔 시 incremental reparse에 사용할 파일별 이전 tree 보관 개수
+PREVIOUS_TREE_CACHE_SIZE = 128
+
+
+def _query_string(pattern: str) -> str:
+    return pattern.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _point_at(code: bytes, offset: int) -> Point:
+    row = code.count(b"\n", 0, offset)
+    return Point(row, offset - (code.rfind(b"\n", 0, offset) + 1))
+
+
+def _single_edit(old: bytes, new: bytes) -> tuple[int, int, int] | None:
+    """이전/현재 내용의 공통 prefix/suffix를 제외한 단일 edit (start, old_end, new_end)를 계산합니다."""
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = 0
+    # 큰 블록 단위로 먼저 비교한 뒤 남은 구간만 byte 단위로 좁힌다.
+    step = 4096
+    while start + step <= limit and old[start:start + step] == new[start:start + step]:
+        start += step
+    while start < limit and old[start] == new[start]:
+        start += 1
+    suffix = 0
+    max_suffix = limit - start
+    while suffix + step <= max_suffix and old[len(old) - suffix - step:len(old) - suffix] == new[len(new) - suffix - step:len(new) - suffix]:
+        suffix += step
+    while suffix < max_suffix and old[len(old) - suffix - 1] == new[len(new) - suffix - 1]:
+        suffix += 1
+    return start, len(old) - suffix, len(new) - suffix
+
 
 class TreeSitterScanner(BaseScanner):
     """
     Tree-sitter를 이용하여 Python 코드의 AST를 파싱하고 Call Node를 추출하여 탐지하는 Scanner.
+
+    knowledge pattern은 rule별 `(call) @rule_N (#match? ...)` query로 컴파일해 tree-sitter가 직접 평가하고,
+    capture 이름으로 rule을 찾는다. 파일별 이전 tree를 보관해 다시 스캔할 때는 edit() 후 incremental reparse 한다.
     """
     def __init__(self, knowledge_repo: BaseReadRepository):
         self.knowledge_repo = knowledge_repo
         self.language = Language(tree_sitter_python.language())
         self.parser = Parser(self.language)
+        self._call_query = self.language.query("(call) @call")
+        self._compiled_key: str | None = None
+        self._compiled: tuple = (None, [], [])
+        self._previous: "OrderedDict[str, tuple[bytes, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _compile_rules(self, rule_index: KnowledgeRuleIndex) -> tuple:
+        """
+        compiled rule index를 (query, query rule 목록, Python regex fallback rule 목록)으로 변환합니다.
+
+        tree-sitter query로 컴파일되지 않는 pattern은 fallback 목록으로 보내 call capture 텍스트에 re.search 한다.
+        """
+        if rule_index.digest == self._compiled_key:
+            return self._compiled
+        query_rules: List[CompiledKnowledgeRule] = []
+        fallback_rules: List[CompiledKnowledgeRule] = []
+        sources: List[str] = []
+        for rule in rule_index.rules:
+            source = f'((call) @rule_{len(query_rules)} (#match? @rule_{len(query_rules)} "{_query_string(rule.pattern)}"))'
+            try:
+                self.language.query(source)
+            except Exception:
+                fallback_rules.append(rule)
+                continue
+            sources.append(source)
+            query_rules.append(rule)
+        query = self.language.query("\n".join(sources)) if sources else None
+        self._compiled_key = rule_index.digest
+        self._compiled = (query, query_rules, fallback_rules)
+        return self._compiled
+
+    def _parse(self, file_path: str, code_bytes: bytes):
+        """이전 tree가 있으면 변경 구간을 edit()으로 알려 준 뒤 incremental reparse 합니다."""
+        with self._lock:
+            previous = self._previous.get(file_path)
+        tree = None
+        if previous is not None:
+            old_bytes, old_tree = previous
+            edit = _single_edit(old_bytes, code_bytes)
+            if edit is None:
+                tree = old_tree
+            else:
+                start, old_end, new_end = edit
+                old_tree.edit(
+                    start_byte=start,
+                    old_end_byte=old_end,
+                    new_end_byte=new_end,
+                    start_point=_point_at(old_bytes, start),
+                    old_end_point=_point_at(old_bytes, old_end),
+                    new_end_point=_point_at(code_bytes, new_end),
+                )
+                tree = self.parser.parse(code_bytes, old_tree)
+        if tree is None:
+            tree = self.parser.parse(code_bytes)
+        with self._lock:
+            self._previous[file_path] = (code_bytes, tree)
+            self._previous.move_to_end(file_path)
+            while len(self._previous) > PREVIOUS_TREE_CACHE_SIZE:
+                self._previous.popitem(last=False)
+        return tree
 
     def scan(self, file_path: str) -> ScanResult:
         if not file_path.endswith(".py"):
             raise ValueError(f"Unsupported language for file: {file_path}. Supported: {self.supported_languages()}")
-            
+
         if not os.path.exists(file_path):
             return ScanResult(file_path=file_path, language="python", findings=[])
 
         findings: List[Vulnerability] = []
-        knowledge_list = self.knowledge_repo.find_all()
+        rule_index = get_knowledge_rule_index(self.knowledge_repo)
+        query, query_rules, fallback_rules = self._compile_rules(rule_index)
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                code_bytes = f.read().encode("utf-8")
-                
-            tree = self.parser.parse(code_bytes)
-            
-            # Simple recursive AST traversal to find call nodes
-            def find_call_nodes(node):
-                call_nodes = []
-                if node.type == 'call':
-                    call_nodes.append(node)
-                for child in node.children:
-                    call_nodes.extend(find_call_nodes(child))
-                return call_nodes
-                
-            call_nodes = find_call_nodes(tree.root_node)
-            
-            for node in call_nodes:
-                snippet = code_bytes[node.start_byte:node.end_byte].decode("utf-8")
-                line_number = node.start_point.row + 1
-                
-                for knowledge in knowledge_list:
-                    pattern = knowledge.get("pattern")
-                    if pattern and re.search(pattern, snippet):
-                        v = Vulnerability(
-                            file_path=file_path,
-                            cwe_id=knowledge.get("id", "UNKNOWN"),
-                            severity=knowledge.get("severity", "MEDIUM"),
-                            line_number=line_number,
-                            code_snippet=snippet
-                        )
-                        findings.append(v)
+            unit = load_source_unit(file_path)
+            # 어떤 rule의 anchor literal도 없는 파일은 query를 실행할 필요가 없다.
+            if not rule_index.may_match(unit.text):
+                return ScanResult(file_path=file_path, language="python", findings=[])
+            code_bytes = unit.code_bytes
+            tree = unit.tree(self.parser, lambda code: self._parse(file_path, code))
+
+            # (node, rule) 쌍을 모은 뒤 전위 순회 순서(시작 위치, 바깥 node 우선) -> knowledge 정의 순서로 정렬한다.
+            hits: list[tuple[int, int, int, object, dict]] = []
+            if query is not None:
+                for node, capture in query.captures(tree.root_node):
+                    rule = query_rules[int(capture.rsplit("_", 1)[1])]
+                    hits.append((node.start_byte, -node.end_byte, rule.order, node, rule.knowledge))
+            if fallback_rules:
+                for node, _ in self._call_query.captures(tree.root_node):
+                    snippet = code_bytes[node.start_byte:node.end_byte].decode("utf-8")
+                    for rule in fallback_rules:
+                        if (rule.literal is None or rule.literal in snippet) and rule.regex.search(snippet):
+                            hits.append((node.start_byte, -node.end_byte, rule.order, node, rule.knowledge))
+            hits.sort(key=lambda hit: hit[:3])
+
+            for _, _, _, node, knowledge in hits:
+                findings.append(Vulnerability(
+                    file_path=file_path,
+                    cwe_id=knowledge.get("id", "UNKNOWN"),
+                    severity=knowledge.get("severity", "MEDIUM"),
+                    line_number=node.start_point.row + 1,
+                    code_snippet=code_bytes[node.start_byte:node.end_byte].decode("utf-8"),
+                ))
 
         except Exception as e:
             print(f"[ERROR] TreeSitterScanner parse error: {e}")
-            
+
         return ScanResult(file_path=file_path, language="python", findings=findings)
 
     def supported_languages(self) -> List[str]:
@@ -1,31 +1,95 @@
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List
 
 from layer1.common import (
+    L1FindingsCache,
+    LazyAnnotations,
+    ProjectReachabilityIndex,
     annotate_files,
     annotate_reachability,
     detect_project_languages,
     detect_typosquatting_findings,
+    get_knowledge_rule_index,
     guess_language,
     normalize_scan_result,
-    scan_file_with_patterns,
+    scan_pattern_findings,
 )
+from layer1.common.findings_cache import fingerprint
+from layer1.common.import_risk import top_package_index
+from layer1.common.pattern_scan import JAVASCRIPT_RULES, PYTHON_RULES
 from models.scan_result import ScanResult
 from models.vulnerability import Vulnerability
 from repository.knowledge_repo import MockKnowledgeRepo
 from repository.base_repository import BaseReadRepository
 from shared.contracts import BaseScanner
-from shared.finding_dedup import deduplicate_findings
+from shared.finding_dedup import Finding, FindingDeduplicator, deduplicate_findings
+from shared.runtime_settings import detect_semgrep
+from shared.source_unit import load_source_unit, source_unit_scope
 from .mock_semgrep_scanner import MockSemgrepScanner
-from .semgrep_cli_scanner import SemgrepCLIScanner
+from .semgrep_cli_scanner import SemgrepCLIScanner, _base_rule_configs
 from .sbom_scanner import SBOMScanner
 
+PROJECT_SOURCE_SUFFIXES = {".py", ".js", ".jsx", ".ts", ".tsx", ".mjs"}
+# 파일 단위 finding 생성 로직이 바뀌면 올려서 기존 findings cache를 무효화한다.
+L1_ENGINE_VERSION = "2"
+
+# 파일 하나의 scan 결과: (dedup된 내부 finding 목록, 파일 단위 call graph evidence 또는 None)
+FileScan = tuple[List[Finding], "dict | None"]
+
+_WORKER_SCANNER: "VSHL1Scanner | None" = None
+
+
+def _init_worker(knowledge_repo: BaseReadRepository) -> None:
+    global _WORKER_SCANNER
+    _WORKER_SCANNER = VSHL1Scanner(knowledge_repo=knowledge_repo, workers=1)
+
+
+def _scan_job(scanner: "VSHL1Scanner", job: tuple[str, List[Vulnerability]]) -> FileScan:
+    path, semgrep_findings = job
+    return scanner._scan_project_file(Path(path), semgrep_findings)
+
+
+@source_unit_scope()
+def _scan_file_in_worker(job: tuple[str, List[Vulnerability]]) -> FileScan:
+    return _scan_job(_WORKER_SCANNER, job)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
 
 class VSHL1Scanner(BaseScanner):
-    def __init__(self, knowledge_repo: BaseReadRepository | None = None):
+    """
+    L1 통합 스캐너.
+
+    Args:
+        knowledge_repo: knowledge rule 저장소
+        workers: project 스캔 시 사용할 프로세스 수 (1 = 단일 프로세스, 0 이하 = CPU 수).
+            None이면 환경변수 `L1_SCAN_WORKERS`를 따른다.
+        max_workers: workers 상한. None이면 환경변수 `L1_SCAN_MAX_WORKERS`를 따르며 0 이하는 상한 없음.
+        findings_cache: 파일 내용 hash 기준 파일 단위 finding 캐시. None이면 매번 전체를 스캔한다.
+    """
+
+    def __init__(
+        self,
+        knowledge_repo: BaseReadRepository | None = None,
+        workers: int | None = None,
+        max_workers: int | None = None,
+        findings_cache: L1FindingsCache | None = None,
+    ):
         self.knowledge_repo = knowledge_repo or MockKnowledgeRepo()
+        self.workers = workers if workers is not None else _env_int("L1_SCAN_WORKERS", 1)
+        self.max_workers = max_workers if max_workers is not None else _env_int("L1_SCAN_MAX_WORKERS", 0)
+        self.findings_cache = findings_cache
+        # project root별 cross-file reachability index (파일 단위 finding cache와 별도로 유지)
+        self._reachability_indexes: dict[str, ProjectReachabilityIndex] = {}
         self.semgrep_scanner = SemgrepCLIScanner(knowledge_repo=self.knowledge_repo)
         self.pattern_scanner = MockSemgrepScanner(knowledge_repo=self.knowledge_repo)
         self.sbom_scanner = SBOMScanner()
@@ -35,48 +99,195 @@ class VSHL1Scanner(BaseScanner):
         except ModuleNotFoundError:
             self.tree_sitter_scanner = None
 
+    @source_unit_scope()
     def scan(self, file_path: str) -> ScanResult:
         target = Path(file_path)
         if not target.exists():
             return ScanResult(file_path=file_path, language=guess_language(file_path), findings=[])
         return self._scan_project(target) if target.is_dir() else self._scan_file(target)
 
+    @source_unit_scope()
+    def scan_files(
+        self,
+        file_paths: List[str],
+        project_root: str | None = None,
+        call_graphs: dict[str, dict] | None = None,
+    ) -> List[Vulnerability]:
+        """
+        지정한 소스 파일들만 스캔해 파일 단위 finding(SBOM 제외)을 반환합니다. 증분 재분석에서 사용한다.
+
+        project_root를 주면 해당 project의 reachability index를 갱신해 cross-file reachability도 반영한다.
+        call_graphs를 주면 스캔한 파일의 call graph evidence를 `ScanResult.call_graphs`와 같은 모양으로 채운다.
+        """
+        files = [Path(p) for p in file_paths if Path(p).is_file()]
+        per_file, file_call_graphs, _ = self._scan_source_files(files)
+        findings: List[Finding] = [finding for file_findings in per_file for finding in file_findings]
+        if project_root is not None:
+            self.reachability_index(project_root).annotate(findings)
+        if call_graphs is not None:
+            call_graphs.update(file_call_graphs)
+        return deduplicate_findings(findings)
+
+    def reachability_index(self, root: str | Path, files: List[Path] | None = None) -> ProjectReachabilityIndex:
+        """project root의 reachability index를 현재 파일 목록과 동기화해 반환합니다. 바뀐 파일만 다시 읽는다."""
+        root = Path(root)
+        index = self._reachability_indexes.setdefault(str(root.resolve()), ProjectReachabilityIndex(root))
+        index.refresh(files if files is not None else self._collect_project_files(root))
+        return index
+
     def _scan_file(self, path: Path) -> ScanResult:
         language = guess_language(str(path))
-        findings = self._scan_single_file_findings(path, language)
-        findings = annotate_reachability(str(path), deduplicate_findings(findings))
-        findings.extend(self.sbom_scanner.scan(str(path)).findings)
-        result = ScanResult(file_path=str(path), language=language, findings=deduplicate_findings(findings))
+        per_file, call_graphs, _ = self._scan_source_files([path])
+        findings = FindingDeduplicator(per_file[0]).extend(self.sbom_scanner.scan(str(path)).findings)
+        result = ScanResult(file_path=str(path), language=language, findings=findings.results(), call_graphs=call_graphs)
         return normalize_scan_result(result)
 
     def _scan_project(self, root: Path) -> ScanResult:
-        findings: List[Vulnerability] = []
-        for src in root.rglob("*"):
-            if not src.is_file() or src.suffix.lower() not in {".py", ".js", ".jsx", ".ts", ".tsx", ".mjs"}:
-                continue
-            language = guess_language(str(src))
-            file_findings = annotate_reachability(str(src), self._scan_single_file_findings(src, language))
-            findings.extend(file_findings)
-        findings.extend(self.sbom_scanner.scan(str(root)).findings)
-        result = ScanResult(file_path=str(root), language="multi", findings=deduplicate_findings(findings))
+        files = self._collect_project_files(root)
+        per_file, call_graphs, stats = self._scan_source_files(files)
+        findings: List[Finding] = [finding for file_findings in per_file for finding in file_findings]
+        # cache된 파일 단위 결과 위에 project call graph 기준 cross-file reachability를 덧씌운다.
+        self.reachability_index(root, files).annotate(findings)
+        # ScanFinding은 여기서 한 번만 Vulnerability로 변환된다.
+        unique = FindingDeduplicator(findings).extend(self.sbom_scanner.scan(str(root)).findings)
+        result = normalize_scan_result(
+            ScanResult(file_path=str(root), language="multi", findings=unique.results(), call_graphs=call_graphs)
+        )
         result.notes.append(f"project_languages={','.join(sorted(detect_project_languages(str(root))))}")
-        return normalize_scan_result(result)
+        result.notes.append(f"l1_workers={stats['workers']}")
+        result.notes.append(f"l1_cache_hits={stats['cache_hits']}")
+        return result
+
+    def _scan_source_files(
+        self, files: List[Path]
+    ) -> tuple[List[List[Finding]], dict[str, dict], dict[str, int]]:
+        """
+        파일별 L1 finding을 입력 순서대로 반환합니다. cache hit 파일은 건너뛰고 miss 파일만 스캔/저장합니다.
+
+        Returns:
+            tuple: (파일별 finding 목록, {파일 경로: call graph evidence},
+                {"workers": 사용한 프로세스 수, "cache_hits": hit 수})
+        """
+        keys: dict[str, str] = {}
+        cached: dict[str, FileScan] = {}
+        if self.findings_cache is not None and files:
+            scanner_fingerprint = self._scanner_fingerprint()
+            for src in files:
+                try:
+                    content_hash = load_source_unit(src).content_hash
+                    keys[str(src)] = L1FindingsCache.make_key(content_hash, scanner_fingerprint, guess_language(str(src)))
+                except OSError:
+                    continue
+            hits = self.findings_cache.get_many(keys.values(), {key: path for path, key in keys.items()})
+            cached = {path: hits[key] for path, key in keys.items() if key in hits}
+
+        misses = [src for src in files if str(src) not in cached]
+        workers = self._resolve_workers(len(misses))
+        # semgrep은 miss 파일 전체를 한 번에 실행하고, 파일별 결과를 각 파일 스캔에 넘긴다.
+        semgrep_by_file, semgrep_failed = self.semgrep_scanner.scan_many(
+            str(src) for src in misses if guess_language(str(src)) in {"python", "javascript", "typescript"}
+        )
+        scanned = dict(zip((str(src) for src in misses), self._scan_project_files(misses, workers, semgrep_by_file)))
+
+        # semgrep batch가 실패한 파일은 semgrep 결과가 빠진 상태이므로 cache에 저장하지 않는다.
+        if self.findings_cache is not None and scanned:
+            self.findings_cache.put_many({
+                keys[path]: (path, file_findings, call_graph)
+                for path, (file_findings, call_graph) in scanned.items()
+                if path in keys and path not in semgrep_failed
+            })
+
+        per_file: List[List[Finding]] = []
+        call_graphs: dict[str, dict] = {}
+        for src in files:
+            file_findings, call_graph = cached[str(src)] if str(src) in cached else scanned[str(src)]
+            per_file.append(file_findings)
+            if call_graph is not None:
+                call_graphs[str(src)] = call_graph
+        return per_file, call_graphs, {"workers": workers, "cache_hits": len(cached)}
 
-    def _scan_single_file_findings(self, path: Path, language: str) -> List[Vulnerability]:
-        findings: List[Vulnerability] = []
-        if language in {"python", "javascript", "typescript"}:
+    def _scanner_fingerprint(self) -> str:
+        """rule-set, 보조 엔진 구성, knowledge repo 내용이 바뀌면 달라지는 findings cache fingerprint."""
+        return fingerprint(
+            L1_ENGINE_VERSION,
+            [rule.__dict__ for rule in [*PYTHON_RULES, *JAVASCRIPT_RULES]],
+            _base_rule_configs(),
+            detect_semgrep(self.semgrep_scanner.config).get("path"),
+            self.tree_sitter_scanner is not None,
+            top_package_index("PyPI").digest,
+            top_package_index("npm").digest,
+            get_knowledge_rule_index(self.knowledge_repo).digest,
+        )
+
+    @staticmethod
+    def _collect_project_files(root: Path) -> List[Path]:
+        # 병렬/단일 모드가 같은 순서로 병합되도록 경로 순으로 정렬한다.
+        return sorted(
+            src for src in root.rglob("*")
+            if src.is_file() and src.suffix.lower() in PROJECT_SOURCE_SUFFIXES
+        )
+
+    def _resolve_workers(self, file_count: int) -> int:
+        workers = self.workers if self.workers > 0 else (os.cpu_count() or 1)
+        if self.max_workers > 0:
+            workers = min(workers, self.max_workers)
+        return max(1, min(workers, file_count))
+
+    def _scan_project_files(
+        self,
+        files: List[Path],
+        workers: int,
+        semgrep_by_file: dict[str, List[Vulnerability]],
+    ) -> List[FileScan]:
+        jobs = [(str(src), semgrep_by_file.get(str(src), [])) for src in files]
+        if workers <= 1:
+            return [_scan_job(self, job) for job in jobs]
+        # executor.map은 입력 순서대로 결과를 돌려주므로 병합 결과가 단일 모드와 동일하다.
+        chunksize = max(1, len(files) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.knowledge_repo,),
+            ) as executor:
+                return list(executor.map(_scan_file_in_worker, jobs, chunksize=chunksize))
+        except (OSError, RuntimeError) as exc:
+            print(f"[WARN] VSHL1Scanner worker pool unavailable, scanning serially: {exc}")
+            return [_scan_job(self, job) for job in jobs]
+
+    def _scan_project_file(self, src: Path, semgrep_findings: List[Vulnerability] | None = None) -> FileScan:
+        language = guess_language(str(src))
+        call_graphs: dict[str, dict] = {}
+        findings = annotate_reachability(str(src), self._scan_single_file_findings(src, language, semgrep_findings), call_graphs)
+        return findings, call_graphs.get(str(src))
+
+    def _scan_single_file_findings(
+        self,
+        path: Path,
+        language: str,
+        semgrep_findings: List[Vulnerability] | None = None,
+    ) -> List[Finding]:
+        # 탐지기별 결과를 나오는 대로 dedup 구조에 넣는다. ScanFinding은 ScanResult를 만들 때까지 그대로 둔다.
+        findings = FindingDeduplicator()
+        if semgrep_findings is not None:
+            findings.extend(semgrep_findings)
+        elif language in {"python", "javascript", "typescript"}:
             findings.extend(self.semgrep_scanner.scan(str(path)).findings)
         if language == "python":
             findings.extend(self.pattern_scanner.scan(str(path)).findings)
         if self.tree_sitter_scanner is not None and language == "python":
             findings.extend(self.tree_sitter_scanner.scan(str(path)).findings)
-        findings.extend(scan_file_with_patterns(str(path)))
+        findings.extend(scan_pattern_findings(str(path)))
         findings.extend(detect_typosquatting_findings(str(path)))
-        return deduplicate_findings(findings)
+        return findings.findings()
 
     def supported_languages(self) -> List[str]:
         return ["python", "javascript", "typescript", "multi"]
 
+    def annotations(self, result: ScanResult) -> LazyAnnotations:
+        """파일별 annotated 소스를 요청될 때만 렌더링하는 mapping을 반환합니다."""
+        return LazyAnnotations(result.findings)
+
     def annotate(self, result: ScanResult) -> ScanResult:
         result.annotated_files = annotate_files(result.findings)
         return result
@@ -38,7 +38,7 @@ def compute_confidence_score(cwe_id: str | None, context: Dict) -> int:
     retrieval_backend = context.get("retrieval_backend")
     if retrieval_backend == "hybrid":
         score += 12
-    elif retrieval_backend == "chroma_only":
+    elif retrieval_backend in {"chroma_only", "local_only"}:
         score += 10
     elif retrieval_backend == "static_only":
         score += 4
@@ -69,7 +69,7 @@ def build_confidence_reason(cwe_id: str | None, context: Dict, confidence_score:
     retrieval_backend = context.get("retrieval_backend")
     if retrieval_backend == "hybrid":
         reasons.append("정적 근거와 RAG 근거가 함께 확인되었습니다")
-    elif retrieval_backend == "chroma_only":
+    elif retrieval_backend in {"chroma_only", "local_only"}:
         reasons.append("RAG 근거가 직접 연결되었습니다")
     elif retrieval_backend == "static_only":
         reasons.append("정적 지식 기반 근거가 확인되었습니다")
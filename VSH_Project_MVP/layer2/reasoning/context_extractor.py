@@ -3,6 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 
 from models.common_schema import VulnRecord
+from shared.source_unit import load_source_unit
 
 
 def extract_finding_context(vuln: VulnRecord, around: int = 6, max_chars: int = 4000) -> dict:
@@ -10,7 +11,7 @@ def extract_finding_context(vuln: VulnRecord, around: int = 6, max_chars: int =
     if not path.exists() or not path.is_file():
         return {"target_line": vuln.line_number, "snippet": vuln.evidence, "imports": [], "context": vuln.evidence}
 
-    lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+    lines = load_source_unit(path).lines
     ln = max(1, min(vuln.line_number, len(lines)))
     start, end = max(1, ln - around), min(len(lines), ln + around)
     window = lines[start - 1 : end]
@@ -1,3 +1,4 @@
 from .evidence_retriever import EvidenceRetriever
+from .vector_retriever import LocalVectorRetriever
 
-__all__ = ["EvidenceRetriever"]
+__all__ = ["EvidenceRetriever", "LocalVectorRetriever"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -12,6 +13,10 @@ try:
 except ImportError:
     _CHROMA_OK = False
 
+from .embedding_cache import EmbeddingCache
+from .retrieval_cache import RetrievalCache, normalize_snippet
+from .static_index import StaticMatchIndex
+
 try:
     from config import CHROMA_COLLECTION, CHROMA_DB_DIR, CHROMA_CACHE_DIR
 except ImportError:
@@ -19,6 +24,12 @@ except ImportError:
     CHROMA_CACHE_DIR = str(Path(__file__).parent.parent.parent / ".cache" / "chroma")
     CHROMA_COLLECTION = "vsh_kisa_guide"
 
+STATIC_INDEX_PAGE_SIZE = 5000
+_STATIC_INDEX_LOCK = threading.Lock()
+_INIT_LOCK = threading.Lock()
+_SHARED: dict[tuple[str, str], "ChromaRetriever"] = {}
+_SHARED_LOCK = threading.Lock()
+
 
 class ChromaRetriever:
     """
@@ -26,25 +37,38 @@ class ChromaRetriever:
     chromadb 패키지나 DB가 없으면 비활성 상태로 동작한다.
     """
 
-    def __init__(self, db_dir: Optional[Path] = None, collection_name: str = CHROMA_COLLECTION):
+    # evidence map/run summary에 표시하는 vector backend 이름
+    BACKEND = "chroma"
+
+    def __init__(
+        self,
+        db_dir: Optional[Path] = None,
+        collection_name: str = CHROMA_COLLECTION,
+        lazy: bool = True,
+    ):
         self._db_dir = Path(db_dir or CHROMA_DB_DIR)
         self._cache_dir = Path(CHROMA_CACHE_DIR)
         self._collection_name = collection_name
         self._client = None
         self._collection = None
+        self._embedding_function = None
         self._last_error: str | None = None
         self._ready = _CHROMA_OK and self._db_dir.exists()
 
-        if self._ready:
-            self._init()
+        # lazy이면 PersistentClient/embedding model은 첫 조회(ready 확인) 시점에 연다.
+        if self._ready and not lazy:
+            self._ensure_init()
 
     @property
     def ready(self) -> bool:
+        if self._ready and self._collection is None:
+            self._ensure_init()
         return bool(self._ready and self._collection is not None)
 
     @property
     def status(self) -> str:
-        if self.ready:
+        # status 확인만으로는 초기화하지 않는다.
+        if self._ready and self._collection is not None:
             return "READY"
         if not _CHROMA_OK:
             return "MISSING_DEPENDENCY"
@@ -52,53 +76,113 @@ class ChromaRetriever:
             return "DB_NOT_FOUND"
         if self._last_error:
             return "INIT_FAILED"
+        if self._ready:
+            return "STANDBY"
         return "DISABLED"
 
     @property
     def status_summary(self) -> str:
-        if self.ready:
+        status = self.status
+        if status == "READY":
             return f"Chroma collection `{self._collection_name}` 연결이 활성화되었습니다."
-        if not _CHROMA_OK:
+        if status == "MISSING_DEPENDENCY":
             return "chromadb 패키지가 설치되지 않아 Chroma RAG가 비활성화되었습니다."
-        if not self._db_dir.exists():
+        if status == "DB_NOT_FOUND":
             return f"Chroma DB 경로를 찾지 못했습니다: {self._db_dir}"
-        if self._last_error:
+        if status == "INIT_FAILED":
             return f"Chroma 초기화에 실패했습니다: {self._last_error}"
+        if status == "STANDBY":
+            return f"Chroma collection `{self._collection_name}`은 첫 조회 시 연결됩니다."
         return "Chroma RAG가 비활성 상태입니다."
 
+    def warm_up(self, background: bool = True) -> threading.Thread | None:
+        """
+        collection 연결과 embedding model 로드를 미리 수행합니다. 장시간 실행되는 server 시작 시 사용한다.
+
+        background이면 daemon thread에서 실행하고 그 thread를 반환한다.
+        """
+        if not self._ready:
+            return None
+        if background:
+            thread = threading.Thread(target=self._warm_up, name="vsh-chroma-warmup", daemon=True)
+            thread.start()
+            return thread
+        self._warm_up()
+        return None
+
+    def _warm_up(self) -> None:
+        if not self.ready:
+            return
+        try:
+            if self._embedding_function is not None:
+                self._embedding_function(["warm up"])
+        except Exception as exc:
+            print(f"[WARN] Chroma embedding warm-up failed: {exc}")
+
     def query(self, cwe_id: str, code_snippet: str = "", n_results: int = 5) -> list[dict]:
         return self.query_related(cwe_id, code_snippet, n_results=n_results)
 
     def query_related(self, cwe_id: str, code_snippet: str = "", n_results: int = 5) -> list[dict]:
         if not self.ready:
             return []
+        return self.query_related_many([(cwe_id, code_snippet)], n_results=n_results)[0]
 
-        query_text = self._build_query_text(cwe_id, code_snippet)
-        # hyeonexcel 수정: query embedding이 준비되지 않은 로컬 환경에서도
-        # exact metadata 매칭은 collection.get()으로 먼저 처리해 Chroma RAG를 바로 활용할 수 있게 한다.
-        exact_docs = self._get_collection(
-            where={"cwe": {"$eq": cwe_id}} if cwe_id else None,
-            limit=max(n_results * 2, n_results),
-            default_cwe=cwe_id,
-        )
-        exact_docs = self._rank_static_results(exact_docs, query_text, cwe_id)
-        if len(exact_docs) >= n_results:
-            return exact_docs[:n_results]
-
-        broad_docs = self._query_collection(
-            query_text=query_text,
-            n_results=max(n_results * 3, n_results + 2),
-            where=None,
-            default_cwe=cwe_id,
-        )
-        if not broad_docs:
-            broad_docs = self._get_collection(
-                where=None,
-                limit=self._collection.count(),
-                default_cwe=cwe_id,
-            )
-            broad_docs = self._rank_static_results(broad_docs, query_text, cwe_id)
-        return self._merge_ranked_results(exact_docs, broad_docs, cwe_id, n_results)
+    def query_related_many(self, queries: list[tuple[str, str]], n_results: int = 5) -> list[list[dict]]:
+        """
+        (cwe_id, code_snippet) 목록을 한 번에 조회해 입력 순서대로 결과를 반환합니다.
+
+        (cwe_id, 정규화 snippet)이 같은 query는 한 번만 처리하고 결과를 cache한다. cache miss 중
+        exact metadata 매칭만으로 부족한 query는 `collection.query(query_texts=[...])` 한 번으로 묶어 보낸다.
+        """
+        if not self.ready:
+            return [[] for _ in queries]
+
+        keys = [("related", cwe_id or "", normalize_snippet(code_snippet), n_results) for cwe_id, code_snippet in queries]
+        cache = self._result_cache
+        resolved: dict[tuple, list[dict]] = {}
+        pending: list[tuple] = []
+        for key in dict.fromkeys(keys):
+            cached = cache.get(key)
+            if cached is None:
+                pending.append(key)
+            else:
+                resolved[key] = cached
+
+        if pending:
+            exact_by_cwe: dict[str, list[dict]] = {}
+            partial: dict[tuple, tuple[str, list[dict]]] = {}
+            for key in pending:
+                _, cwe_id, snippet, _ = key
+                query_text = self._build_query_text(cwe_id, snippet)
+                # hyeonexcel 수정: query embedding이 준비되지 않은 로컬 환경에서도
+                # exact metadata 매칭은 collection.get()으로 먼저 처리해 Chroma RAG를 바로 활용할 수 있게 한다.
+                if cwe_id not in exact_by_cwe:
+                    exact_by_cwe[cwe_id] = self._get_collection(
+                        where={"cwe": {"$eq": cwe_id}} if cwe_id else None,
+                        limit=max(n_results * 2, n_results),
+                        default_cwe=cwe_id,
+                    )
+                exact_docs = self._rank_static_results(exact_by_cwe[cwe_id], query_text, cwe_id)
+                if len(exact_docs) >= n_results:
+                    resolved[key] = exact_docs[:n_results]
+                else:
+                    partial[key] = (query_text, exact_docs)
+
+            if partial:
+                texts = list(dict.fromkeys(query_text for query_text, _ in partial.values()))
+                rows = self._query_collection_many(texts, n_results=max(n_results * 3, n_results + 2), where=None)
+                for key, (query_text, exact_docs) in partial.items():
+                    cwe_id = key[1]
+                    docs, metas = rows.get(query_text, ([], []))
+                    broad_docs = self._parse_raw(docs, metas, cwe_id)
+                    if not broad_docs:
+                        broad_docs = self._static_candidates(query_text, cwe_id, exact_docs, n_results)
+                    resolved[key] = self._merge_ranked_results(exact_docs, broad_docs, cwe_id, n_results)
+
+            for key in pending:
+                cache.put(key, resolved[key])
+
+        return [[dict(doc) for doc in resolved[key]] for key in keys]
 
     def query_by_source(
         self,
@@ -115,13 +199,28 @@ class ChromaRetriever:
             filters.insert(0, {"cwe": {"$eq": cwe_id}})
 
         where = filters[0] if len(filters) == 1 else {"$and": filters}
-        query_text = self._build_query_text(cwe_id, code_snippet)
-        return self._query_collection(
-            query_text=query_text,
+        snippet = normalize_snippet(code_snippet)
+        key = ("source", cwe_id or "", snippet, source, n_results)
+        cached = self._result_cache.get(key)
+        if cached is not None:
+            return cached
+        docs = self._query_collection(
+            query_text=self._build_query_text(cwe_id, snippet),
             n_results=n_results,
             where=where,
             default_cwe=cwe_id,
         )
+        self._result_cache.put(key, docs)
+        return docs
+
+    def clear_cache(self) -> None:
+        self._result_cache.clear()
+
+    def refresh_static_index(self) -> StaticMatchIndex | None:
+        """collection 문서를 다시 읽어 static match index를 새로 만듭니다."""
+        with _STATIC_INDEX_LOCK:
+            self.__dict__["_static"] = None
+        return self._static_index()
 
     def get_context_string(self, cwe_id: str, code_snippet: str = "") -> str:
         docs = self.query(cwe_id, code_snippet, n_results=4)
@@ -144,10 +243,86 @@ class ChromaRetriever:
 
         return "\n".join(parts)
 
+    @property
+    def _result_cache(self) -> RetrievalCache:
+        cache = self.__dict__.get("_results")
+        if cache is None:
+            cache = self.__dict__["_results"] = RetrievalCache()
+        return cache
+
+    @property
+    def _embedding_cache(self) -> EmbeddingCache:
+        cache = self.__dict__.get("_embeddings")
+        if cache is None:
+            ef = self.__dict__.get("_embedding_function")
+            model_id = getattr(ef, "MODEL_NAME", None) or type(ef).__name__
+            cache = self.__dict__["_embeddings"] = EmbeddingCache(model_id, cache_dir=self._cache_dir / "embeddings")
+        return cache
+
+    def _static_index(self) -> StaticMatchIndex | None:
+        """
+        collection 전체에 대한 static match index. 처음 필요할 때 만들고, 문서 수가 바뀌면 다시 만든다.
+        """
+        try:
+            stamp = self._collection.count()
+        except Exception:
+            return None
+        with _STATIC_INDEX_LOCK:
+            index = self.__dict__.get("_static")
+            if index is not None and index.stamp == stamp:
+                return index
+            docs: list[dict] = []
+            try:
+                for offset in range(0, stamp, STATIC_INDEX_PAGE_SIZE):
+                    raw = self._collection.get(
+                        limit=STATIC_INDEX_PAGE_SIZE,
+                        offset=offset,
+                        include=["documents", "metadatas"],
+                    )
+                    # cwe metadata가 없는 문서는 None으로 두고 query별 cwe로 채운다.
+                    docs.extend(self._parse_raw(raw.get("documents", []), raw.get("metadatas", []), None))
+            except Exception as exc:
+                print(f"[WARN] Chroma static index not built: {exc}")
+                return None
+            index = self.__dict__["_static"] = StaticMatchIndex(docs, stamp=stamp)
+            return index
+
+    def _static_candidates(
+        self,
+        query_text: str,
+        cwe_id: str,
+        exact_docs: list[dict],
+        n_results: int,
+    ) -> list[dict]:
+        """
+        vector 검색 결과가 없을 때 collection 전체를 static 순위로 정렬한 결과 중 merge 상위 n개에 들 수 있는 문서만 꺼냅니다.
+        """
+        index = self._static_index()
+        if index is None:
+            return []
+        source_priority = self._source_priority(cwe_id)
+        seen = {self._merge_key(doc) for doc in exact_docs}
+        picked: list[dict] = []
+        for doc in index.ranked(query_text, cwe_id, lambda doc: self._doc_rank(doc, cwe_id, source_priority)):
+            key = self._merge_key(doc)
+            if key in seen:
+                continue
+            seen.add(key)
+            picked.append(doc)
+            if len(picked) >= n_results:
+                break
+        return picked
+
+    def _ensure_init(self) -> None:
+        with _INIT_LOCK:
+            if self._ready and self._collection is None:
+                self._init()
+
     def _init(self) -> None:
         try:
             self._configure_embedding_cache()
             ef = embedding_functions.DefaultEmbeddingFunction()
+            self._embedding_function = ef
             self._client = chromadb.PersistentClient(path=str(self._db_dir))
             self._collection = self._client.get_collection(
                 name=self._collection_name,
@@ -172,7 +347,7 @@ class ChromaRetriever:
         self,
         where: dict | None,
         limit: int,
-        default_cwe: str,
+        default_cwe: str | None,
     ) -> list[dict]:
         try:
             raw = self._collection.get(
@@ -194,19 +369,65 @@ class ChromaRetriever:
         where: dict | None,
         default_cwe: str,
     ) -> list[dict]:
+        docs, metas = self._query_collection_many([query_text], n_results, where).get(query_text, ([], []))
+        return self._parse_raw(docs, metas, default_cwe)
+
+    def _query_collection_many(
+        self,
+        query_texts: list[str],
+        n_results: int,
+        where: dict | None,
+    ) -> dict[str, tuple[list[str], list[dict]]]:
+        """
+        query text 목록을 한 번의 collection.query로 조회해 text별 (documents, metadatas)를 반환합니다.
+
+        embedding cache를 쓸 수 있으면 미리 계산한 `query_embeddings`를 넘겨 Chroma가 다시 embedding하지 않게 한다.
+        """
+        if not query_texts:
+            return {}
+        embeddings = self._embed_queries(query_texts)
+        query_input = {"query_embeddings": embeddings} if embeddings is not None else {"query_texts": query_texts}
         try:
             raw = self._collection.query(
-                query_texts=[query_text],
+                **query_input,
                 n_results=min(n_results, max(1, self._collection.count())),
                 where=where,
                 include=["documents", "metadatas"],
             )
-            docs = raw.get("documents", [[]])[0]
-            metas = raw.get("metadatas", [[]])[0]
+            docs = raw.get("documents") or []
+            metas = raw.get("metadatas") or []
         except Exception:
-            return []
+            return {}
 
-        return self._parse_raw(docs, metas, default_cwe)
+        return {
+            query_text: (docs[idx] if idx < len(docs) else [], metas[idx] if idx < len(metas) else [])
+            for idx, query_text in enumerate(query_texts)
+        }
+
+    def _embed_queries(self, query_texts: list[str]) -> list[list[float]] | None:
+        """
+        query text embedding을 디스크 cache에서 찾고, 없는 것만 embedding function으로 계산해 cache에 추가합니다.
+        embedding function이나 cache를 쓸 수 없으면 None (Chroma가 query_texts를 직접 embedding한다).
+        """
+        ef = self.__dict__.get("_embedding_function")
+        if ef is None:
+            return None
+        cache = self._embedding_cache
+        if not cache.enabled:
+            return None
+        try:
+            vectors = cache.get_many(query_texts)
+            missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+            if missing:
+                texts = [query_texts[idx] for idx in missing]
+                computed = ef(texts)
+                cache.put_many(texts, computed)
+                for idx, vector in zip(missing, computed):
+                    vectors[idx] = vector
+            return [vector.tolist() if hasattr(vector, "tolist") else list(vector) for vector in vectors]
+        except Exception as exc:
+            print(f"[WARN] query embedding cache bypassed: {exc}")
+            return None
 
     @classmethod
     def _rank_static_results(
@@ -255,11 +476,7 @@ class ChromaRetriever:
         seen: set[tuple[str, str, str]] = set()
 
         for doc in exact_docs + broad_docs:
-            key = (
-                doc.get("source", ""),
-                doc.get("source_id", "") or doc.get("kisa_article", "") or doc.get("title", "") or doc.get("cve_id", ""),
-                doc.get("text", "")[:120],
-            )
+            key = cls._merge_key(doc)
             if key in seen:
                 continue
             seen.add(key)
@@ -268,6 +485,14 @@ class ChromaRetriever:
         merged.sort(key=lambda doc: cls._doc_rank(doc, cwe_id, source_priority))
         return merged[:n_results]
 
+    @staticmethod
+    def _merge_key(doc: dict) -> tuple[str, str, str]:
+        return (
+            doc.get("source", ""),
+            doc.get("source_id", "") or doc.get("kisa_article", "") or doc.get("title", "") or doc.get("cve_id", ""),
+            doc.get("text", "")[:120],
+        )
+
     @staticmethod
     def _source_priority(cwe_id: str) -> dict[str, int]:
         if cwe_id == "CWE-829":
@@ -327,7 +552,7 @@ class ChromaRetriever:
         )
 
     @staticmethod
-    def _parse_raw(docs: list[str], metas: list[dict], default_cwe: str) -> list[dict]:
+    def _parse_raw(docs: list[str], metas: list[dict], default_cwe: str | None) -> list[dict]:
         output: list[dict] = []
         for doc_text, meta in zip(docs, metas):
             entry = {
@@ -345,3 +570,21 @@ class ChromaRetriever:
             }
             output.append(entry)
         return output
+
+
+def chroma_available(db_dir: Optional[Path] = None) -> bool:
+    """chromadb가 설치돼 있고 Chroma DB 경로가 있는지 (collection 연결 없이) 확인합니다."""
+    return _CHROMA_OK and Path(db_dir or CHROMA_DB_DIR).exists()
+
+
+def get_shared_chroma_retriever(
+    db_dir: Optional[Path] = None,
+    collection_name: str = CHROMA_COLLECTION,
+) -> ChromaRetriever:
+    """(DB 경로, collection)별 process 공유 ChromaRetriever. 결과 cache와 static index도 함께 공유된다."""
+    key = (str(Path(db_dir or CHROMA_DB_DIR).resolve()), collection_name)
+    with _SHARED_LOCK:
+        retriever = _SHARED.get(key)
+        if retriever is None:
+            retriever = _SHARED[key] = ChromaRetriever(db_dir=db_dir, collection_name=collection_name)
+        return retriever
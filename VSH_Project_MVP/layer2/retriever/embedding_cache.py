@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Sequence
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import numpy as np
+
+    _NUMPY_OK = True
+except ImportError:
+    _NUMPY_OK = False
+
+try:
+    from config import CHROMA_CACHE_DIR
+    EMBEDDING_CACHE_DIR = Path(CHROMA_CACHE_DIR) / "embeddings"
+except ImportError:
+    EMBEDDING_CACHE_DIR = Path(__file__).parent.parent.parent / ".cache" / "chroma" / "embeddings"
+
+# 이 행 수를 넘으면 새 embedding은 디스크에 추가하지 않는다. (384차원 기준 약 300MB)
+EMBEDDING_CACHE_MAX_ROWS = 200_000
+KEY_BYTES = 16
+# index record: (model id, text) hash 16 bytes + 행렬 행 번호(uint64 little-endian)
+RECORD_BYTES = KEY_BYTES + 8
+MODEL_SLUG_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def embedding_key(model_id: str, text: str) -> bytes:
+    return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).digest()[:KEY_BYTES]
+
+
+class EmbeddingCache:
+    """
+    text embedding을 model별 디스크 파일에 보관하는 append-only cache.
+
+    `<model>.f32`는 row-major float32 행렬이고 memory-map으로 읽는다. `<model>.idx`는
+    (hash, 행 번호) record를 append한다. 행렬을 O_APPEND로 먼저 쓰고 실제 기록된 위치를 index에 남기므로
+    여러 process가 동시에 추가해도 행 번호가 어긋나지 않고, 중간에 끊기면 행렬 꼬리만 버려진다.
+    초기화(meta 생성)와 추가는 `<model>.lock` file lock 안에서 하며, meta가 이미 있으면 기존 파일을 지우지 않는다.
+    다른 process가 추가한 record는 index 크기가 바뀌었을 때 다시 읽는다.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        cache_dir: str | Path | None = None,
+        max_rows: int = EMBEDDING_CACHE_MAX_ROWS,
+    ):
+        self.model_id = model_id
+        self.cache_dir = Path(cache_dir) if cache_dir else EMBEDDING_CACHE_DIR
+        self.max_rows = max_rows
+        slug = MODEL_SLUG_RE.sub("_", model_id) or "model"
+        self._matrix_path = self.cache_dir / f"{slug}.f32"
+        self._index_path = self.cache_dir / f"{slug}.idx"
+        self._meta_path = self.cache_dir / f"{slug}.json"
+        self._lock_path = self.cache_dir / f"{slug}.lock"
+        self._lock = threading.Lock()
+        self._rows: dict[bytes, int] = {}
+        self._index_size = -1
+        self._matrix = None
+        self.dim: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self._disabled = not _NUMPY_OK
+
+    @property
+    def enabled(self) -> bool:
+        return not self._disabled
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._rows)
+
+    def _refresh(self) -> None:
+        """index 파일이 바뀌었으면 hash -> 행 번호와 memory-map을 다시 읽습니다. (lock 안에서 호출)"""
+        try:
+            index_size = self._index_path.stat().st_size
+        except OSError:
+            index_size = 0
+        if index_size == self._index_size:
+            return
+        self._index_size = index_size
+        self._rows = {}
+        self._matrix = None
+        if not index_size:
+            return
+        try:
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            if meta.get("model_id") != self.model_id:
+                raise ValueError(f"model id mismatch: {meta.get('model_id')}")
+            self.dim = int(meta["dim"])
+            records = self._index_path.read_bytes()
+            matrix_rows = self._matrix_path.stat().st_size // (4 * self.dim)
+            for start in range(0, len(records) - RECORD_BYTES + 1, RECORD_BYTES):
+                row = int.from_bytes(records[start + KEY_BYTES:start + RECORD_BYTES], "little")
+                if row < matrix_rows:
+                    self._rows.setdefault(records[start:start + KEY_BYTES], row)
+            if matrix_rows:
+                self._matrix = np.memmap(self._matrix_path, dtype=np.float32, mode="r", shape=(matrix_rows, self.dim))
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"[WARN] embedding cache disabled ({self._meta_path}): {exc}")
+            self._disabled = True
+            self._rows = {}
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """process 간 초기화/추가를 직렬화하는 exclusive file lock. (fcntl이 없으면 process 내 lock만 사용)"""
+        if fcntl is None:
+            yield
+            return
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def get_many(self, texts: Sequence[str]) -> list:
+        """text별 cache된 embedding(float32 vector) 또는 None."""
+        if self._disabled:
+            return [None] * len(texts)
+        keys = [embedding_key(self.model_id, text) for text in texts]
+        with self._lock:
+            self._refresh()
+            rows = [self._rows.get(key) for key in keys]
+            matrix = self._matrix
+        found = [matrix[row] if row is not None and matrix is not None else None for row in rows]
+        hits = sum(1 for vector in found if vector is not None)
+        self.hits += hits
+        self.misses += len(found) - hits
+        return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence) -> None:
+        if self._disabled or not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            return
+        with self._lock:
+            self._refresh()
+            if self._disabled:
+                return
+            if self.dim is not None and matrix.shape[1] != self.dim:
+                return
+            fresh: dict[bytes, int] = {}
+            for idx, text in enumerate(texts):
+                key = embedding_key(self.model_id, text)
+                if key not in self._rows and key not in fresh:
+                    fresh[key] = idx
+            capacity = self.max_rows - len(self._rows)
+            if not fresh or capacity <= 0:
+                return
+            selected = list(fresh.items())[:capacity]
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with self._file_lock():
+                    if self._meta_path.exists():
+                        meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+                        if meta.get("model_id") != self.model_id:
+                            raise ValueError(f"model id mismatch: {meta.get('model_id')}")
+                        self.dim = int(meta["dim"])
+                    else:
+                        # meta가 없으면 이전 실행의 찌꺼기 없이 새 차원으로 시작한다. (lock 안이라 다른 writer와 겹치지 않는다)
+                        self.dim = int(matrix.shape[1])
+                        self._matrix_path.unlink(missing_ok=True)
+                        self._index_path.unlink(missing_ok=True)
+                        self._meta_path.write_text(json.dumps({"model_id": self.model_id, "dim": self.dim}), encoding="utf-8")
+                    if matrix.shape[1] != self.dim:
+                        return
+                    row_bytes = 4 * self.dim
+                    payload = np.ascontiguousarray(matrix[[idx for _, idx in selected]]).tobytes()
+                    # 이전 쓰기가 행 중간에서 끊겼으면 0으로 채워 행 경계를 맞춘다.
+                    size = self._matrix_path.stat().st_size if self._matrix_path.exists() else 0
+                    padding = b"\0" * (-size % row_bytes)
+                    fd = os.open(self._matrix_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+                    try:
+                        os.write(fd, padding + payload)
+                        end = os.lseek(fd, 0, os.SEEK_CUR)
+                    finally:
+                        os.close(fd)
+                    start = end - len(payload)
+                    if start % row_bytes:
+                        return
+                    first_row = start // row_bytes
+                    records = b"".join(
+                        key + (first_row + offset).to_bytes(8, "little") for offset, (key, _) in enumerate(selected)
+                    )
+                    with self._index_path.open("ab") as handle:
+                        handle.write(records)
+            except (OSError, ValueError, KeyError) as exc:
+                print(f"[WARN] embedding cache not written ({self._matrix_path}): {exc}")
+                self._disabled = True
+                return
+            # 다음 조회에서 index/memory-map을 다시 읽는다. (다른 process가 추가한 record도 함께 반영된다)
+            self._index_size = -1
@@ -1,7 +1,8 @@
+import os
 from pathlib import Path
 from typing import Dict, List, Optional
 
-from .chroma_retriever import ChromaRetriever
+from .chroma_retriever import ChromaRetriever, chroma_available, get_shared_chroma_retriever
 from layer2.common.requirement_parser import parse_requirement_line
 from models.scan_result import ScanResult
 
@@ -11,13 +12,53 @@ except ImportError:
     VULNERABLE_PACKAGES = {}
 
 
+def retriever_backend() -> str:
+    return os.getenv("VSH_RETRIEVER_BACKEND", "auto").lower()
+
+
+def local_retriever():
+    from .vector_retriever import get_shared_local_retriever
+
+    return get_shared_local_retriever()
+
+
+def default_retriever():
+    """
+    `VSH_RETRIEVER_BACKEND`(auto | chroma | local)에 따라 process 공유 retriever를 고릅니다.
+
+    auto는 Chroma DB를 쓸 수 있으면 Chroma를, 아니면 seed corpus 기반 local vector backend를 사용한다.
+    Chroma 초기화 자체가 실패하는 경우(collection 미구축 등)는 EvidenceRetriever가 첫 조회 때 local로 바꾼다.
+    """
+    backend = retriever_backend()
+    if backend == "local" or (backend == "auto" and not chroma_available()):
+        return local_retriever()
+    return get_shared_chroma_retriever()
+
+
 class EvidenceRetriever:
     """
     finding별로 관련 근거와 수정 맥락을 정리하는 L2 retrieval 컴포넌트.
     """
 
     def __init__(self, chroma_retriever: Optional[ChromaRetriever] = None):
-        self.chroma_retriever = chroma_retriever or ChromaRetriever()
+        # 직접 주입한 retriever는 그대로 쓰고, auto로 고른 Chroma만 초기화 실패 시 local backend로 바꾼다.
+        self._auto_fallback = chroma_retriever is None and retriever_backend() == "auto"
+        self.chroma_retriever = chroma_retriever or default_retriever()
+        # local backend로 바꾼 뒤에도 evidence map에 Chroma가 실패한 상태를 남긴다.
+        self._fallback_chroma_status: str | None = None
+
+    def _retriever_ready(self) -> bool:
+        """retriever를 (필요하면 초기화해) 쓸 수 있는지 확인합니다. auto 모드에서 Chroma가 실패하면 local로 바꾼다."""
+        if self.chroma_retriever.ready:
+            return True
+        if not self._auto_fallback:
+            return False
+        self._auto_fallback = False
+        status = getattr(self.chroma_retriever, "status", "DISABLED")
+        print(f"[WARN] Chroma retriever unavailable ({status}); using local vector backend")
+        self._fallback_chroma_status = status
+        self.chroma_retriever = local_retriever()
+        return self.chroma_retriever.ready
 
     def runtime_status(self) -> Dict[str, str]:
         status = getattr(self.chroma_retriever, "status", None)
@@ -29,10 +70,22 @@ class EvidenceRetriever:
             summary = "Chroma RAG 활성화 상태를 확인하지 못했습니다."
 
         return {
+            "backend": getattr(self.chroma_retriever, "BACKEND", "chroma"),
             "status": status,
             "summary": summary,
         }
 
+    def _chroma_status(self, runtime: Dict[str, str]) -> str:
+        """evidence map의 chroma_status. local backend가 답한 경우 Chroma 자체의 상태(실패 사유 또는 NOT_USED)를 쓴다."""
+        if runtime["backend"] == "chroma":
+            return runtime["status"]
+        return self._fallback_chroma_status or "NOT_USED"
+
+    def warm_up(self, background: bool = True):
+        """retriever가 warm-up을 지원하면 collection/embedding model을 미리 로드합니다."""
+        warm_up = getattr(self.chroma_retriever, "warm_up", None)
+        return warm_up(background=background) if warm_up else None
+
     def retrieve(
         self,
         scan_result: ScanResult,
@@ -42,18 +95,23 @@ class EvidenceRetriever:
         knowledge_map = {item.get("id"): item for item in knowledge}
         fix_map = {item.get("id"): item for item in fix_hints}
         evidence_map: Dict[str, Dict] = {}
+        chroma_results = self._query_chroma_many(
+            [(finding.cwe_id, finding.code_snippet) for finding in scan_result.findings]
+        )
+        # lazy 초기화 결과가 반영되도록 조회 이후에 상태를 읽는다.
         chroma_runtime = self.runtime_status()
+        chroma_status = self._chroma_status(chroma_runtime)
 
-        for finding in scan_result.findings:
+        for finding, chroma_docs in zip(scan_result.findings, chroma_results):
             file_path = finding.file_path or scan_result.file_path
             issue_id = self._build_issue_id(file_path, finding.cwe_id, finding.line_number)
             knowledge_entry = knowledge_map.get(finding.cwe_id, {})
             fix_entry = fix_map.get(finding.cwe_id, {})
-            chroma_docs = self._query_chroma(finding.cwe_id, finding.code_snippet)
             retrieval_backend = self._build_retrieval_backend(
                 chroma_docs=chroma_docs,
                 knowledge_entry=knowledge_entry,
                 fix_entry=fix_entry,
+                vector_backend=chroma_runtime["backend"],
             )
 
             evidence_map[issue_id] = {
@@ -62,7 +120,8 @@ class EvidenceRetriever:
                 "cwe_id": finding.cwe_id,
                 "line_number": finding.line_number,
                 "retrieval_backend": retrieval_backend,
-                "chroma_status": chroma_runtime["status"],
+                "vector_backend": chroma_runtime["backend"],
+                "chroma_status": chroma_status,
                 "chroma_summary": chroma_runtime["summary"],
                 "chroma_hits": len(chroma_docs),
                 "knowledge_description": self._build_knowledge_description(
@@ -104,12 +163,27 @@ class EvidenceRetriever:
         return evidence_map
 
     def _query_chroma(self, cwe_id: str, code_snippet: str) -> List[Dict]:
-        if not self.chroma_retriever.ready:
+        if not self._retriever_ready():
             return []
         if hasattr(self.chroma_retriever, "query_related"):
             return self.chroma_retriever.query_related(cwe_id, code_snippet, n_results=4)
         return self.chroma_retriever.query(cwe_id, code_snippet, n_results=4)
 
+    def _query_chroma_many(self, queries: List[tuple[str, str]]) -> List[List[Dict]]:
+        """
+        finding 전체의 (cwe_id, code_snippet)을 한 번에 조회합니다.
+
+        retriever가 batch 조회(query_related_many)를 지원하면 한 번에 넘기고, 아니면 같은 query를 한 번씩만 조회한다.
+        """
+        if not queries or not self._retriever_ready():
+            return [[] for _ in queries]
+        if hasattr(self.chroma_retriever, "query_related_many"):
+            return self.chroma_retriever.query_related_many(queries, n_results=4)
+        resolved: Dict[tuple[str, str], List[Dict]] = {}
+        for query in dict.fromkeys(queries):
+            resolved[query] = self._query_chroma(*query)
+        return [resolved[query] for query in queries]
+
     @staticmethod
     def _build_knowledge_description(knowledge_entry: Dict, chroma_docs: List[Dict]) -> str | None:
         if knowledge_entry.get("description"):
@@ -231,6 +305,7 @@ class EvidenceRetriever:
         chroma_docs: List[Dict],
         knowledge_entry: Dict,
         fix_entry: Dict,
+        vector_backend: str = "chroma",
     ) -> str:
         has_static_context = bool(knowledge_entry or fix_entry)
         has_chroma_context = bool(chroma_docs)
@@ -238,7 +313,8 @@ class EvidenceRetriever:
         if has_static_context and has_chroma_context:
             return "hybrid"
         if has_chroma_context:
-            return "chroma_only"
+            # vector 근거만 있는 경우 실제로 답한 backend 이름을 쓴다. (chroma_only / local_only)
+            return f"{vector_backend}_only"
         if has_static_context:
             return "static_only"
         return "empty"
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+# query text에 들어가는 code snippet 최대 길이 (ChromaRetriever._build_query_text와 같은 값)
+SNIPPET_KEY_LENGTH = 300
+RETRIEVAL_CACHE_SIZE = 2048
+RETRIEVAL_CACHE_TTL_SECONDS = 900.0
+
+
+def normalize_snippet(code_snippet: str | None) -> str:
+    """공백 차이만 있는 snippet이 같은 cache key를 갖도록 연속 공백을 하나로 줄이고 query 길이로 자릅니다."""
+    return " ".join((code_snippet or "").split())[:SNIPPET_KEY_LENGTH]
+
+
+class RetrievalCache:
+    """
+    retrieval 결과(문서 dict 목록)를 key별로 보관하는 LRU + TTL cache.
+
+    저장/반환 시 문서 dict를 얕은 copy로 나눠 주므로 호출자가 결과를 수정해도 cache가 오염되지 않는다.
+    """
+
+    def __init__(self, max_entries: int = RETRIEVAL_CACHE_SIZE, ttl_seconds: float = RETRIEVAL_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, tuple[dict, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> list[dict] | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            docs = entry[1]
+        return [dict(doc) for doc in docs]
+
+    def put(self, key: Hashable, docs: list[dict]) -> None:
+        frozen = tuple(dict(doc) for doc in docs)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), frozen)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import uuid
+from pathlib import Path
+
+try:
+    from config import SEED_DB_DIR
+except ImportError:
+    SEED_DB_DIR = Path(__file__).parent.parent.parent / "mock_db"
+
+
+def _load_seed_json(seed_dir: Path, name: str) -> list[dict]:
+    with open(seed_dir / name, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def build_seed_corpus(seed_dir: str | Path | None = None) -> tuple[list[str], list[str], list[dict]]:
+    """
+    KISA knowledge/fix seed 파일로 retrieval corpus (ids, documents, metadatas)를 만듭니다.
+
+    Chroma collection bootstrap과 local vector backend가 같은 문서/metadata를 쓰도록 한 곳에서 만든다.
+    """
+    seed_dir = Path(seed_dir) if seed_dir else Path(SEED_DB_DIR)
+    ids: list[str] = []
+    docs: list[str] = []
+    metadatas: list[dict] = []
+
+    for item in _load_seed_json(seed_dir, "knowledge.json"):
+        docs.append(item.get("description", ""))
+        metadatas.append(
+            {
+                "cwe": item.get("id", ""),
+                "source": "KISA",
+                "source_id": item.get("reference", ""),
+                "title": item.get("name", ""),
+                "kisa_article": item.get("reference", ""),
+                "text": item.get("description", ""),
+            }
+        )
+        ids.append(f"knowledge-{item.get('id', uuid.uuid4().hex)}")
+
+    for item in _load_seed_json(seed_dir, "kisa_fix.json"):
+        docs.append(item.get("description", ""))
+        metadatas.append(
+            {
+                "cwe": item.get("id", ""),
+                "source": "KISA_FIX",
+                "source_id": item.get("id", ""),
+                "title": f"Fix guide for {item.get('id', '')}",
+                "kisa_article": item.get("id", ""),
+                "text": item.get("description", ""),
+            }
+        )
+        ids.append(f"fix-{item.get('id', uuid.uuid4().hex)}")
+
+    return ids, docs, metadatas
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import heapq
+from collections import defaultdict
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator
+
+# static match에서 비교하는 문서 필드 (ChromaRetriever._static_match_rank와 같은 순서)
+HAYSTACK_FIELDS = ["title", "text", "source_id", "kisa_article", "owasp_id", "cve_id"]
+IDENTIFIER_FIELDS = ["kisa_article", "source_id", "owasp_id", "cve_id", "title"]
+GRAM = 3
+TOKEN_CACHE_SIZE = 4096
+
+# doc의 cwe metadata 상태: 없음(None, query cwe로 채움) / 빈 문자열 / 값 있음
+CWE_MISSING, CWE_EMPTY, CWE_SET = "missing", "empty", "set"
+
+
+def _grams(token: str) -> set[str]:
+    return {token[idx:idx + GRAM] for idx in range(len(token) - GRAM + 1)}
+
+
+def _query_tokens(query_text: str, cwe_id: str) -> set[str]:
+    return {token for token in query_text.lower().split() if len(token) > 2 and token != cwe_id.lower()}
+
+
+class StaticMatchIndex:
+    """
+    collection 전체 문서의 static match 순위를 전수 비교 없이 계산하기 위한 in-memory index.
+
+    query token은 공백을 포함하지 않으므로 `token in haystack`은 haystack의 어떤 단어가 token을 포함하는지와 같다.
+    그래서 단어 -> doc id postings와 trigram -> 단어 index로 token이 걸리는 문서만 찾는다.
+    `_doc_rank`를 결정하는 (source, cwe 상태, identifier 유무) 그룹과 cwe -> doc id index를 함께 두어
+    token이 하나도 걸리지 않은 문서는 그룹별 id 목록을 순서대로 merge해서만 꺼낸다.
+    """
+
+    def __init__(self, docs: list[dict], stamp: object = None):
+        self.docs = docs
+        self.stamp = stamp
+        self._word_docs: dict[str, list[int]] = defaultdict(list)
+        self._gram_words: dict[str, set[str]] = defaultdict(set)
+        self._groups: dict[tuple[str, str, bool], list[int]] = defaultdict(list)
+        self._by_cwe: dict[tuple[str, str, bool], list[int]] = defaultdict(list)
+        self._group_of: list[tuple[str, str, bool]] = []
+
+        for doc_id, doc in enumerate(docs):
+            haystack = " ".join(str(doc.get(key, "")).lower() for key in HAYSTACK_FIELDS)
+            for word in set(haystack.split()):
+                postings = self._word_docs[word]
+                if not postings:
+                    for gram in _grams(word):
+                        self._gram_words[gram].add(word)
+                postings.append(doc_id)
+            cwe = doc.get("cwe")
+            kind = CWE_MISSING if cwe is None else (CWE_SET if cwe else CWE_EMPTY)
+            has_identifier = any(doc.get(key) for key in IDENTIFIER_FIELDS)
+            group = (doc.get("source") or "", kind, has_identifier)
+            self._groups[group].append(doc_id)
+            self._group_of.append(group)
+            if kind == CWE_SET:
+                self._by_cwe[(cwe, group[0], has_identifier)].append(doc_id)
+        self.docs_with = lru_cache(maxsize=TOKEN_CACHE_SIZE)(self._docs_with)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _docs_with(self, token: str) -> frozenset[int]:
+        """haystack에 token이 (부분 문자열로) 들어 있는 doc id 집합."""
+        if len(token) < GRAM:
+            words: Iterable[str] = self._word_docs
+        else:
+            pools = sorted((self._gram_words.get(gram, set()) for gram in _grams(token)), key=len)
+            words = set.intersection(*pools) if pools else set()
+        found: set[int] = set()
+        for word in words:
+            if token in word:
+                found.update(self._word_docs[word])
+        return frozenset(found)
+
+    def ranked(
+        self,
+        query_text: str,
+        cwe_id: str,
+        doc_rank: Callable[[dict], tuple],
+    ) -> Iterator[dict]:
+        """
+        `_rank_static_results` 후 `doc_rank`로 stable sort한 것과 같은 순서로 문서를 하나씩 반환합니다.
+
+        cwe metadata가 없는 문서는 query cwe로 채운 copy를 반환한다. (전수 조회 시 default_cwe와 같은 동작)
+        """
+        hits: dict[int, int] = defaultdict(int)
+        for token in _query_tokens(query_text, cwe_id):
+            for doc_id in self.docs_with(token):
+                hits[doc_id] += 1
+
+        # (source, cwe 상태, identifier) 그룹을 query 기준 doc_rank bucket으로 묶는다.
+        buckets: dict[tuple, list[list[int] | Iterator[int]]] = defaultdict(list)
+        sample: dict[tuple, tuple] = {}
+        for group, doc_ids in self._groups.items():
+            source, kind, has_identifier = group
+            if kind == CWE_SET and cwe_id:
+                exact = self._by_cwe.get((cwe_id, source, has_identifier), [])
+                if exact:
+                    rank = self._rank(doc_rank, self.docs[exact[0]], cwe_id)
+                    sample[group + (True,)] = rank
+                    buckets[rank].append(exact)
+                others = [doc_id for doc_id in doc_ids if self.docs[doc_id]["cwe"] != cwe_id] if exact else doc_ids
+                if others:
+                    rank = self._rank(doc_rank, self.docs[others[0]], cwe_id)
+                    sample[group + (False,)] = rank
+                    buckets[rank].append(others)
+            else:
+                rank = self._rank(doc_rank, self.docs[doc_ids[0]], cwe_id)
+                sample[group + (kind == CWE_MISSING and bool(cwe_id),)] = rank
+                buckets[rank].append(doc_ids)
+
+        matched: dict[tuple, list[tuple[int, int]]] = defaultdict(list)
+        for doc_id, count in hits.items():
+            source, kind, has_identifier = group = self._group_of[doc_id]
+            exact = (kind == CWE_MISSING and bool(cwe_id)) or (kind == CWE_SET and self.docs[doc_id]["cwe"] == cwe_id)
+            matched[sample[group + (exact,)]].append((-count, doc_id))
+
+        for rank in sorted(buckets):
+            for _, doc_id in sorted(matched.get(rank, ())):
+                yield self._filled(doc_id, cwe_id)
+            for doc_id in heapq.merge(*buckets[rank]):
+                if doc_id not in hits:
+                    yield self._filled(doc_id, cwe_id)
+
+    def _rank(self, doc_rank: Callable[[dict], tuple], doc: dict, cwe_id: str) -> tuple:
+        return doc_rank(doc if doc.get("cwe") is not None else {**doc, "cwe": cwe_id})
+
+    def _filled(self, doc_id: int, cwe_id: str) -> dict:
+        doc = self.docs[doc_id]
+        return dict(doc) if doc.get("cwe") is not None else {**doc, "cwe": cwe_id}
@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+try:
+    import numpy as np
+
+    _NUMPY_OK = True
+except ImportError:
+    _NUMPY_OK = False
+
+try:
+    import hnswlib
+
+    _HNSW_OK = True
+except ImportError:
+    _HNSW_OK = False
+
+from .chroma_retriever import ChromaRetriever, _CHROMA_OK
+from .seed_corpus import SEED_DB_DIR, build_seed_corpus
+
+try:
+    from config import CHROMA_CACHE_DIR
+except ImportError:
+    CHROMA_CACHE_DIR = str(Path(__file__).parent.parent.parent / ".cache" / "chroma")
+
+# 이 문서 수 이상이면 (hnswlib이 있을 때) filter 없는 query에 HNSW index를 쓴다.
+HNSW_MIN_DOCS = 10_000
+HNSW_EF = 64
+HNSW_M = 16
+HASHING_DIM = 384
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddingFunction:
+    """
+    model 없이 동작하는 token/char-trigram feature hashing embedding.
+
+    chromadb(ONNX MiniLM)를 쓸 수 없는 환경에서 local vector backend가 lexical 유사도로라도 동작하게 한다.
+    """
+
+    MODEL_NAME = f"vsh-hashing-{HASHING_DIM}"
+
+    def __init__(self, dim: int = HASHING_DIM):
+        self.dim = dim
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _slot(feature: str, dim: int) -> tuple[int, float]:
+        value = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        return value % dim, -1.0 if value >> 63 else 1.0
+
+    def __call__(self, texts: Sequence[str]) -> list:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_RE.findall(text.lower()):
+                features = [token] + [token[idx:idx + 3] for idx in range(len(token) - 2)]
+                for feature in features:
+                    slot, sign = self._slot(feature, self.dim)
+                    vectors[row, slot] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)
+        return list(vectors)
+
+
+def onnx_model_cached() -> bool:
+    """chromadb ONNX MiniLM 파일이 이미 내려받아져 있는지 확인합니다. (다운로드는 하지 않음)"""
+    if not _CHROMA_OK:
+        return False
+    try:
+        from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+    except Exception:
+        return False
+    model_dir = Path(ONNXMiniLM_L6_V2.DOWNLOAD_PATH) / ONNXMiniLM_L6_V2.EXTRACTED_FOLDER_NAME
+    return all((model_dir / name).exists() for name in ("model.onnx", "tokenizer.json", "config.json"))
+
+
+def default_embedding_function(allow_download: bool = True) -> Callable:
+    """
+    Chroma와 같은 ONNX MiniLM을 우선 쓰고, chromadb가 없으면 hashing embedding을 쓴다.
+
+    allow_download가 False면 model 파일이 이미 cache에 있을 때만 ONNX를 쓴다.
+    """
+    if _CHROMA_OK and (allow_download or onnx_model_cached()):
+        from chromadb.utils import embedding_functions
+
+        return embedding_functions.DefaultEmbeddingFunction()
+    return HashingEmbeddingFunction()
+
+
+def _normalize_rows(matrix):
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class NumpyVectorCollection:
+    """
+    Chroma collection의 `count/get/query` 부분 집합을 NumPy 행렬로 구현한 in-memory collection.
+
+    문서 embedding은 정규화한 하나의 연속 float32 행렬에 두고, query 여러 개를 행렬곱 한 번으로 채점한다(cosine).
+    metadata filter(`$eq`, `$and`, `$or`)는 boolean mask로 처리한다. 문서가 많고 hnswlib이 있으면
+    filter 없는 query는 HNSW index로 근사 검색한다.
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        documents: list[str],
+        metadatas: list[dict],
+        embeddings,
+        embedding_function: Callable | None = None,
+        hnsw_min_docs: int = HNSW_MIN_DOCS,
+    ):
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = list(metadatas)
+        self.matrix = _normalize_rows(embeddings)
+        self._embedding_function = embedding_function
+        self._fields: dict[str, object] = {}
+        self._hnsw = None
+        self._hnsw_lock = threading.Lock()
+        if _HNSW_OK and len(self.ids) >= hnsw_min_docs:
+            index = hnswlib.Index(space="ip", dim=self.matrix.shape[1])
+            index.init_index(max_elements=len(self.ids), ef_construction=200, M=HNSW_M)
+            index.add_items(self.matrix, np.arange(len(self.ids)))
+            index.set_ef(HNSW_EF)
+            self._hnsw = index
+
+    @property
+    def backend(self) -> str:
+        return "hnsw" if self._hnsw is not None else "brute-force"
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def _field(self, name: str):
+        values = self._fields.get(name)
+        if values is None:
+            values = self._fields[name] = np.array([meta.get(name) for meta in self.metadatas], dtype=object)
+        return values
+
+    def _mask(self, where: dict | None):
+        if not where:
+            return None
+        masks = []
+        for key, condition in where.items():
+            if key in ("$and", "$or"):
+                parts = [self._mask(part) for part in condition]
+                parts = [part if part is not None else np.ones(len(self.ids), dtype=bool) for part in parts]
+                masks.append(np.logical_and.reduce(parts) if key == "$and" else np.logical_or.reduce(parts))
+                continue
+            if isinstance(condition, dict):
+                if set(condition) != {"$eq"}:
+                    raise ValueError(f"unsupported where operator: {condition}")
+                condition = condition["$eq"]
+            masks.append(self._field(key) == condition)
+        return np.logical_and.reduce(masks)
+
+    def _payload(self, indices: Sequence[int], include: Sequence[str] | None) -> dict:
+        include = include or ["documents", "metadatas"]
+        payload = {"ids": [self.ids[idx] for idx in indices]}
+        if "documents" in include:
+            payload["documents"] = [self.documents[idx] for idx in indices]
+        if "metadatas" in include:
+            payload["metadatas"] = [self.metadatas[idx] for idx in indices]
+        return payload
+
+    def get(self, where: dict | None = None, limit: int | None = None, offset: int = 0, include=None, **_) -> dict:
+        mask = self._mask(where)
+        indices = np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+        end = None if limit is None else offset + limit
+        return self._payload(indices[offset:end].tolist(), include)
+
+    def query(
+        self,
+        query_texts: Sequence[str] | None = None,
+        query_embeddings: Sequence | None = None,
+        n_results: int = 10,
+        where: dict | None = None,
+        include=None,
+        **_,
+    ) -> dict:
+        if query_embeddings is None:
+            if self._embedding_function is None:
+                raise ValueError("query_texts requires an embedding function")
+            query_embeddings = self._embedding_function(list(query_texts or []))
+        queries = _normalize_rows(query_embeddings)
+        mask = self._mask(where)
+        candidates = np.arange(len(self.ids)) if mask is None else np.flatnonzero(mask)
+        k = min(n_results, len(candidates))
+        include = include or ["documents", "metadatas"]
+        result: dict[str, list] = {"ids": [], "distances": []}
+        for field in ("documents", "metadatas"):
+            if field in include:
+                result[field] = []
+        if k <= 0 or not len(queries):
+            for field in result:
+                result[field] = [[] for _ in range(len(queries))]
+            return result
+
+        if mask is None and self._hnsw is not None:
+            with self._hnsw_lock:
+                self._hnsw.set_ef(max(HNSW_EF, k))
+                labels, distances = self._hnsw.knn_query(queries, k=k)
+            rows = [(label.tolist(), distance.tolist()) for label, distance in zip(labels, distances)]
+        else:
+            # 모든 query를 한 번의 행렬곱으로 채점한 뒤 행마다 상위 k개만 부분 정렬한다.
+            scores = queries @ (self.matrix if mask is None else self.matrix[candidates]).T
+            if k < len(candidates):
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(len(candidates)), (len(queries), 1))
+            rows = []
+            for row_scores, row_top in zip(scores, top):
+                ordered = row_top[np.lexsort((row_top, -row_scores[row_top]))]
+                rows.append((candidates[ordered].tolist(), (1.0 - row_scores[ordered]).tolist()))
+
+        for indices, distances in rows:
+            payload = self._payload(indices, include)
+            result["ids"].append(payload["ids"])
+            result["distances"].append(distances)
+            for field in ("documents", "metadatas"):
+                if field in result:
+                    result[field].append(payload[field])
+        return result
+
+
+class LocalVectorRetriever(ChromaRetriever):
+    """
+    chromadb 없이 seed corpus를 NumPy 행렬로 검색하는 ChromaRetriever 대체 backend.
+
+    `NumpyVectorCollection`을 collection으로 쓰므로 query_related / query_related_many / query_by_source,
+    결과 cache, static index, query embedding cache를 ChromaRetriever와 그대로 공유한다.
+    문서 embedding도 같은 embedding cache에 저장되어 다음 실행부터는 다시 계산하지 않는다.
+    scan 도중 Chroma 대신 쓰이는 backend이므로 embedding model을 내려받지 않는다. (ONNX model이 cache에 없으면 hashing)
+    """
+
+    BACKEND = "local"
+
+    def __init__(
+        self,
+        seed_dir: Optional[Path] = None,
+        embedding_function: Callable | None = None,
+        cache_dir: Optional[Path] = None,
+        lazy: bool = True,
+        hnsw_min_docs: int = HNSW_MIN_DOCS,
+    ):
+        self._db_dir = Path(seed_dir or SEED_DB_DIR)
+        self._cache_dir = Path(cache_dir or CHROMA_CACHE_DIR)
+        self._collection_name = "local-vector"
+        self._client = None
+        self._collection = None
+        self._embedding_function = embedding_function
+        self._hnsw_min_docs = hnsw_min_docs
+        self._last_error: str | None = None
+        self._ready = _NUMPY_OK and self._db_dir.exists()
+
+        if self._ready and not lazy:
+            self._ensure_init()
+
+    @property
+    def status(self) -> str:
+        if self._ready and self._collection is not None:
+            return "READY"
+        if not _NUMPY_OK:
+            return "MISSING_DEPENDENCY"
+        if not self._db_dir.exists():
+            return "DB_NOT_FOUND"
+        if self._last_error:
+            return "INIT_FAILED"
+        if self._ready:
+            return "STANDBY"
+        return "DISABLED"
+
+    @property
+    def status_summary(self) -> str:
+        status = self.status
+        if status == "READY":
+            model_id = getattr(self._embedding_function, "MODEL_NAME", None) or type(self._embedding_function).__name__
+            return (
+                f"local vector index 연결이 활성화되었습니다 "
+                f"({self._collection.count()}개 문서, {self._collection.backend}, {model_id})."
+            )
+        if status == "MISSING_DEPENDENCY":
+            return "numpy 패키지가 설치되지 않아 local vector RAG가 비활성화되었습니다."
+        if status == "DB_NOT_FOUND":
+            return f"seed corpus 경로를 찾지 못했습니다: {self._db_dir}"
+        if status == "INIT_FAILED":
+            return f"local vector index 초기화에 실패했습니다: {self._last_error}"
+        if status == "STANDBY":
+            return "local vector index는 첫 조회 시 로드됩니다."
+        return "local vector RAG가 비활성 상태입니다."
+
+    def _init(self) -> None:
+        try:
+            self._configure_embedding_cache()
+            ids, docs, metadatas = build_seed_corpus(self._db_dir)
+            if self._embedding_function is None:
+                self._embedding_function = default_embedding_function(allow_download=False)
+            try:
+                embeddings = self._embed_documents(docs)
+            except Exception as exc:
+                if isinstance(self._embedding_function, HashingEmbeddingFunction):
+                    raise
+                print(f"[WARN] embedding model unavailable, using hashing embedding: {exc}")
+                self._embedding_function = HashingEmbeddingFunction()
+                self.__dict__.pop("_embeddings", None)
+                embeddings = self._embed_documents(docs)
+            self._collection = NumpyVectorCollection(
+                ids,
+                docs,
+                metadatas,
+                embeddings,
+                embedding_function=self._embedding_function,
+                hnsw_min_docs=self._hnsw_min_docs,
+            )
+        except Exception as exc:
+            self._last_error = str(exc)
+            self._ready = False
+            self._collection = None
+
+    def _embed_documents(self, docs: list[str]):
+        """문서 embedding을 embedding cache에서 찾고 없는 것만 계산합니다."""
+        if not docs:
+            return np.zeros((0, getattr(self._embedding_function, "dim", HASHING_DIM)), dtype=np.float32)
+        cache = self._embedding_cache
+        vectors = cache.get_many(docs) if cache.enabled else [None] * len(docs)
+        missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+        if missing:
+            texts = [docs[idx] for idx in missing]
+            computed = self._embedding_function(texts)
+            if cache.enabled:
+                cache.put_many(texts, computed)
+            for idx, vector in zip(missing, computed):
+                vectors[idx] = vector
+        return np.vstack([np.asarray(vector, dtype=np.float32) for vector in vectors])
+
+
+_SHARED_LOCAL: LocalVectorRetriever | None = None
+_SHARED_LOCAL_LOCK = threading.Lock()
+
+
+def get_shared_local_retriever() -> LocalVectorRetriever:
+    """seed corpus 기반 process 공유 LocalVectorRetriever."""
+    global _SHARED_LOCAL
+    with _SHARED_LOCAL_LOCK:
+        if _SHARED_LOCAL is None:
+            _SHARED_LOCAL = LocalVectorRetriever()
+        return _SHARED_LOCAL
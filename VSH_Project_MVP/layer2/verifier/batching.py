@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from layer2.common.requirement_parser import parse_requirement_line
+from models.vulnerability import Vulnerability
+
+# online provider 조회 시 동시에 실행할 최대 요청 수
+VERIFY_MAX_WORKERS = 8
+
+PackageKey = Tuple[str, str | None, str | None]
+
+
+def package_key(finding: Vulnerability) -> PackageKey | None:
+    """공급망 finding의 (ecosystem, package, version). 공급망 finding이 아니면 None."""
+    if finding.cwe_id != "CWE-829":
+        return None
+    package_name, package_version = parse_requirement_line(finding.code_snippet)
+    return finding.metadata.get("ecosystem", "PyPI"), package_name, package_version
+
+
+def verify_grouped(
+    findings: List[Vulnerability],
+    resolve: Callable[[PackageKey], Dict[str, str | None]],
+    prefix: str,
+    concurrent: bool = False,
+    keys: Iterable[PackageKey | None] | None = None,
+) -> List[Dict[str, str | None]]:
+    """
+    finding을 (ecosystem, package, version)으로 묶어 key마다 한 번만 resolve하고 결과를 finding 순서로 펼칩니다.
+
+    concurrent이면 서로 다른 key를 thread pool에서 동시에 조회한다. key 단위 예외는
+    `{prefix}_status: ERROR`로 바꿔 같은 key의 finding에만 적용한다.
+    """
+    keys = list(keys) if keys is not None else [package_key(finding) for finding in findings]
+    unique = list(dict.fromkeys(key for key in keys if key is not None))
+
+    def _resolve(key: PackageKey) -> Dict[str, str | None]:
+        try:
+            return resolve(key)
+        except Exception as exc:
+            return {f"{prefix}_status": "ERROR", f"{prefix}_summary": str(exc)}
+
+    if concurrent and len(unique) > 1:
+        with ThreadPoolExecutor(max_workers=min(VERIFY_MAX_WORKERS, len(unique))) as executor:
+            resolved = dict(zip(unique, executor.map(_resolve, unique)))
+    else:
+        resolved = {key: _resolve(key) for key in unique}
+    # finding별 context는 이후 독립적으로 수정될 수 있으므로 얕은 copy로 나눠 준다.
+    return [dict(resolved[key]) if key is not None else {} for key in keys]
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List
 
-from layer2.common.requirement_parser import parse_requirement_line
+from layer2.verifier.batching import PackageKey, package_key, verify_grouped
 from layer2.verifier.providers import MockOsvProvider, OsvProvider
 from models.vulnerability import Vulnerability
 
@@ -12,11 +12,23 @@ class OsvVerifier:
         self.provider = provider or MockOsvProvider()
 
     def verify(self, finding: Vulnerability) -> Dict[str, str | None]:
-        if finding.cwe_id != "CWE-829":
-            return {}
-        package_name, package_version = parse_requirement_line(finding.code_snippet)
+        key = package_key(finding)
+        return {} if key is None else self._verify_key(key)
+
+    def verify_many(self, findings: List[Vulnerability], keys: List[PackageKey | None] | None = None) -> List[Dict[str, str | None]]:
+        """finding 목록을 (ecosystem, package, version)별로 한 번씩만 조회하고 finding 순서대로 결과를 반환합니다."""
+        return verify_grouped(
+            findings,
+            self._verify_key,
+            "osv",
+            concurrent=getattr(self.provider, "concurrent", False),
+            keys=keys,
+        )
+
+    def _verify_key(self, key: PackageKey) -> Dict[str, str | None]:
+        ecosystem, package_name, package_version = key
         if not package_name:
             return {"osv_status": "UNKNOWN", "osv_summary": "OSV 검증을 위한 패키지명을 파싱하지 못했습니다."}
-        res = self.provider.query_package(package_name, package_version)
+        res = self.provider.query(ecosystem, package_name, package_version)
         res["osv_mode"] = getattr(self.provider, "mode", "unknown")
         return res
@@ -1,7 +1,9 @@
 from .registry_provider import RegistryProvider, OfflineRegistryProvider, OnlineRegistryProvider
-from .osv_provider import OsvProvider, MockOsvProvider, OnlineOsvProvider
+from .osv_provider import OsvProvider, MockOsvProvider, LocalOsvProvider, OnlineOsvProvider, default_osv_provider
+from .osv_mirror import OsvMirror, get_osv_mirror
 
 __all__ = [
     "RegistryProvider", "OfflineRegistryProvider", "OnlineRegistryProvider",
-    "OsvProvider", "MockOsvProvider", "OnlineOsvProvider",
+    "OsvProvider", "MockOsvProvider", "LocalOsvProvider", "OnlineOsvProvider", "default_osv_provider",
+    "OsvMirror", "get_osv_mirror",
 ]
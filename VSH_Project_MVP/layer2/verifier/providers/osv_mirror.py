@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from packaging.version import InvalidVersion, Version
+
+try:
+    from config import DATA_DIR
+    OSV_MIRROR_DB_PATH = Path(DATA_DIR) / "osv" / "osv_mirror.db"
+except ImportError:
+    OSV_MIRROR_DB_PATH = Path.home() / ".vsh" / "runtime_data" / "osv" / "osv_mirror.db"
+
+# package별로 메모리에 올려 둘 compile된 affected range 개수
+PACKAGE_CACHE_SIZE = 4096
+INGEST_BATCH_SIZE = 500
+SEMVER_RE = re.compile(r"^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.\-]+))?(?:\+[0-9A-Za-z.\-]+)?$")
+PYPI_NAME_RE = re.compile(r"[-_.]+")
+
+# (advisory_id, 명시 affected versions, [(lower key, upper key, upper 포함 여부)])
+CompiledAffected = tuple[str, frozenset, tuple[tuple[Any, Any, bool], ...]]
+
+
+def mirror_db_path() -> Path:
+    """`VSH_OSV_MIRROR_DB` 환경변수가 있으면 그 경로를, 없으면 runtime data 디렉터리를 사용합니다."""
+    override = os.getenv("VSH_OSV_MIRROR_DB")
+    return Path(override) if override else OSV_MIRROR_DB_PATH
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    """ecosystem 규칙에 맞춰 패키지 이름을 정규화합니다. (PyPI: PEP 503, npm: 소문자)"""
+    name = name.strip()
+    if ecosystem == "PyPI":
+        return PYPI_NAME_RE.sub("-", name).lower()
+    if ecosystem == "npm":
+        return name.lower()
+    return name
+
+
+def _semver_key(version: str) -> tuple | None:
+    match = SEMVER_RE.match(version.strip())
+    if not match:
+        return None
+    major, minor, patch, pre = match.groups()
+    core = (int(major), int(minor or 0), int(patch or 0))
+    if not pre:
+        return (*core, 1, ())
+    # prerelease는 정식 release보다 낮고, 숫자 식별자는 문자열 식별자보다 낮다.
+    parts = tuple((0, int(part), "") if part.isdigit() else (1, 0, part) for part in pre.split("."))
+    return (*core, 0, parts)
+
+
+def version_key(ecosystem: str, version: str) -> Any:
+    """ecosystem의 버전 비교 key. 해석할 수 없으면 None (명시 version 목록으로만 판단한다)."""
+    if ecosystem == "PyPI":
+        try:
+            return Version(version)
+        except InvalidVersion:
+            return None
+    return _semver_key(version)
+
+
+def _intervals(events: list[dict]) -> list[list]:
+    """OSV range events를 [introduced, fixed|last_affected, upper 포함 여부] 구간 목록으로 바꿉니다."""
+    intervals: list[list] = []
+    lower: str | None = None
+    opened = False
+    for event in events:
+        if "introduced" in event:
+            lower = None if event["introduced"] == "0" else event["introduced"]
+            opened = True
+        elif opened and "fixed" in event:
+            intervals.append([lower, event["fixed"], False])
+            opened = False
+        elif opened and "last_affected" in event:
+            intervals.append([lower, event["last_affected"], True])
+            opened = False
+    if opened:
+        intervals.append([lower, None, False])
+    return intervals
+
+
+def _affected_rows(advisory: dict) -> Iterator[tuple[str, str, str, str]]:
+    """advisory의 affected 항목별 (ecosystem, 정규화 이름, versions JSON, ranges JSON)."""
+    for affected in advisory.get("affected") or []:
+        package = affected.get("package") or {}
+        ecosystem, name = package.get("ecosystem"), package.get("name")
+        if not ecosystem or not name:
+            continue
+        ranges = []
+        for affected_range in affected.get("ranges") or []:
+            # GIT range는 commit hash 기준이라 패키지 버전과 비교할 수 없다.
+            if affected_range.get("type") in ("ECOSYSTEM", "SEMVER"):
+                ranges.extend(_intervals(affected_range.get("events") or []))
+        versions = sorted(set(affected.get("versions") or []))
+        if ranges or versions:
+            yield ecosystem, normalize_package(ecosystem, name), json.dumps(versions), json.dumps(ranges)
+
+
+def _severity(advisory: dict) -> str | None:
+    severity = str((advisory.get("database_specific") or {}).get("severity") or "").upper()
+    return severity if severity in {"CRITICAL", "HIGH", "MEDIUM", "LOW"} else None
+
+
+def iter_zip_advisories(path: str | Path) -> Iterator[dict]:
+    """OSV `<Ecosystem>/all.zip` dump의 advisory JSON을 member 단위로 하나씩 읽습니다."""
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith(".json"):
+                continue
+            with archive.open(info) as handle:
+                try:
+                    advisory = json.load(handle)
+                except ValueError:
+                    print(f"[WARN] OSV advisory not parsed ({info.filename})")
+                    continue
+            if isinstance(advisory, dict) and advisory.get("id"):
+                yield advisory
+
+
+class OsvMirror:
+    """
+    OSV advisory dump를 ingest한 local SQLite mirror.
+
+    affected 패키지는 (ecosystem, 정규화 이름)으로 index하고, range events는 ingest 시점에
+    [lower, upper, upper 포함 여부] 구간으로 미리 풀어 저장한다. 조회 시에는 패키지별 구간을
+    버전 key로 한 번만 compile해 LRU에 올려 두므로 같은 패키지의 반복 조회는 DB를 거치지 않는다.
+    DB 파일의 (mtime_ns, size)가 바뀌면(다른 process의 ingest 포함) compile 결과를 버린다.
+    """
+
+    def __init__(self, db_path: str | Path | None = None, cache_size: int = PACKAGE_CACHE_SIZE):
+        self.db_path = Path(db_path) if db_path else mirror_db_path()
+        self.cache_size = cache_size
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._packages: "OrderedDict[tuple[str, str], tuple[CompiledAffected, ...]]" = OrderedDict()
+        self._ecosystems: frozenset[str] | None = None
+        self._stamp: tuple[int, int] | None = None
+
+    def _connect(self, create: bool = False) -> sqlite3.Connection | None:
+        if self._conn is None:
+            if not create and not self.db_path.exists():
+                return None
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            # ingest는 `with conn:` transaction 하나로 커밋되므로 rollback journal(기본값)을 유지해 중단돼도
+            # 이전 mirror가 남게 한다. WAL은 commit이 본 DB 파일 stat을 바꾸지 않아 _validate가 놓치므로 쓰지 않는다.
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS advisories (
+                    id TEXT PRIMARY KEY,
+                    summary TEXT,
+                    aliases TEXT NOT NULL,
+                    severity TEXT,
+                    modified TEXT
+                );
+                CREATE TABLE IF NOT EXISTS affected (
+                    ecosystem TEXT NOT NULL,
+                    package TEXT NOT NULL,
+                    advisory_id TEXT NOT NULL,
+                    versions TEXT NOT NULL,
+                    ranges TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_affected_package ON affected(ecosystem, package);
+                CREATE INDEX IF NOT EXISTS idx_affected_advisory ON affected(advisory_id);
+                CREATE TABLE IF NOT EXISTS sources (
+                    source TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    advisories INTEGER NOT NULL,
+                    ingested_at REAL NOT NULL
+                );
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def _validate(self) -> None:
+        """DB 파일이 바뀌었으면 메모리 cache를 비웁니다. (lock 안에서 호출)"""
+        try:
+            stat = self.db_path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp != self._stamp:
+            self._stamp = stamp
+            self._packages.clear()
+            self._ecosystems = None
+
+    def ecosystems(self) -> frozenset[str]:
+        """mirror에 advisory가 있는 ecosystem 집합. mirror가 없으면 빈 집합."""
+        with self._lock:
+            self._validate()
+            if self._ecosystems is None:
+                conn = self._connect()
+                rows = conn.execute("SELECT DISTINCT ecosystem FROM affected").fetchall() if conn else []
+                self._ecosystems = frozenset(row[0] for row in rows)
+            return self._ecosystems
+
+    def available(self, ecosystem: str | None = None) -> bool:
+        ecosystems = self.ecosystems()
+        return bool(ecosystems) if ecosystem is None else ecosystem in ecosystems
+
+    def ingest(self, advisories: Iterable[dict], source: str | None = None, digest: str | None = None) -> int:
+        """
+        advisory를 upsert합니다. 같은 id의 affected 행은 새 내용으로 교체하고, withdrawn advisory는 삭제한다.
+
+        Returns:
+            int: 저장(또는 삭제)한 advisory 수
+        """
+        count = 0
+        with self._lock:
+            conn = self._connect(create=True)
+            batch: list[dict] = []
+
+            def _flush() -> None:
+                ids = [(advisory["id"],) for advisory in batch]
+                conn.executemany("DELETE FROM affected WHERE advisory_id = ?", ids)
+                conn.executemany("DELETE FROM advisories WHERE id = ?", ids)
+                live = [advisory for advisory in batch if not advisory.get("withdrawn")]
+                conn.executemany(
+                    "INSERT INTO advisories(id, summary, aliases, severity, modified) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            advisory["id"],
+                            advisory.get("summary") or (advisory.get("details") or "")[:200],
+                            json.dumps(advisory.get("aliases") or []),
+                            _severity(advisory),
+                            advisory.get("modified"),
+                        )
+                        for advisory in live
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO affected(ecosystem, package, advisory_id, versions, ranges) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (ecosystem, package, advisory["id"], versions, ranges)
+                        for advisory in live
+                        for ecosystem, package, versions, ranges in _affected_rows(advisory)
+                    ],
+                )
+                batch.clear()
+
+            with conn:
+                for advisory in advisories:
+                    batch.append(advisory)
+                    count += 1
+                    if len(batch) >= INGEST_BATCH_SIZE:
+                        _flush()
+                if batch:
+                    _flush()
+                if source:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO sources(source, digest, advisories, ingested_at) VALUES (?, ?, ?, ?)",
+                        (source, digest or "", count, time.time()),
+                    )
+            self._stamp = None
+            self._validate()
+        return count
+
+    def ingest_zip(self, path: str | Path, force: bool = False) -> int:
+        """
+        OSV zip dump 하나를 ingest합니다. 같은 파일(sha256)을 이미 ingest했다면 건너뛰고 0을 반환한다.
+        """
+        path = Path(path)
+        digest = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        source = str(path.resolve())
+        if not force:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute("SELECT digest FROM sources WHERE source = ?", (source,)).fetchone() if conn else None
+            if row and row[0] == digest.hexdigest():
+                return 0
+        return self.ingest(iter_zip_advisories(path), source=source, digest=digest.hexdigest())
+
+    def _compiled(self, ecosystem: str, package: str) -> tuple[CompiledAffected, ...]:
+        """(ecosystem, 정규화 이름)의 affected 구간을 버전 key로 compile해 반환합니다. (lock 안에서 호출)"""
+        key = (ecosystem, package)
+        cached = self._packages.get(key)
+        if cached is not None:
+            self._packages.move_to_end(key)
+            return cached
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT advisory_id, versions, ranges FROM affected WHERE ecosystem = ? AND package = ?",
+            (ecosystem, package),
+        ).fetchall() if conn else []
+        compiled = []
+        for advisory_id, versions, ranges in rows:
+            intervals = []
+            for lower, upper, inclusive in json.loads(ranges):
+                lower_key = version_key(ecosystem, lower) if lower is not None else None
+                upper_key = version_key(ecosystem, upper) if upper is not None else None
+                if (lower is not None and lower_key is None) or (upper is not None and upper_key is None):
+                    # 비교할 수 없는 구간은 명시 versions 목록으로만 판단한다.
+                    continue
+                intervals.append((lower_key, upper_key, bool(inclusive)))
+            compiled.append((advisory_id, frozenset(json.loads(versions)), tuple(intervals)))
+        result = tuple(compiled)
+        self._packages[key] = result
+        while len(self._packages) > self.cache_size:
+            self._packages.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _matches(entry: CompiledAffected, version: str, key: Any) -> bool:
+        if version in entry[1]:
+            return True
+        if key is None:
+            return False
+        for lower, upper, inclusive in entry[2]:
+            if lower is not None and key < lower:
+                continue
+            if upper is None or key < upper or (inclusive and key == upper):
+                return True
+        return False
+
+    def advisory_ids(self, ecosystem: str, package_name: str, version: str | None = None) -> list[str]:
+        """
+        패키지(와 버전)에 해당하는 advisory id 목록. version이 없으면 패키지의 모든 advisory를 반환한다.
+        """
+        package = normalize_package(ecosystem, package_name)
+        with self._lock:
+            self._validate()
+            entries = self._compiled(ecosystem, package)
+        if version is None:
+            return list(dict.fromkeys(entry[0] for entry in entries))
+        key = version_key(ecosystem, version)
+        return list(dict.fromkeys(entry[0] for entry in entries if self._matches(entry, version, key)))
+
+    def advisories(self, advisory_ids: list[str]) -> list[dict]:
+        """advisory id 목록의 {id, summary, aliases, severity}를 입력 순서대로 반환합니다."""
+        if not advisory_ids:
+            return []
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return []
+            placeholders = ",".join("?" * len(advisory_ids))
+            rows = conn.execute(
+                f"SELECT id, summary, aliases, severity FROM advisories WHERE id IN ({placeholders})",
+                advisory_ids,
+            ).fetchall()
+        by_id = {
+            row[0]: {"id": row[0], "summary": row[1], "aliases": json.loads(row[2]), "severity": row[3]}
+            for row in rows
+        }
+        return [by_id[advisory_id] for advisory_id in advisory_ids if advisory_id in by_id]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._packages.clear()
+            self._ecosystems = None
+
+
+_MIRRORS: dict[str, OsvMirror] = {}
+_MIRRORS_LOCK = threading.Lock()
+
+
+def get_osv_mirror(db_path: str | Path | None = None) -> OsvMirror:
+    """DB 경로별 process 공유 OsvMirror를 반환합니다."""
+    path = str(Path(db_path) if db_path else mirror_db_path())
+    with _MIRRORS_LOCK:
+        mirror = _MIRRORS.get(path)
+        if mirror is None:
+            mirror = _MIRRORS[path] = OsvMirror(path)
+        return mirror
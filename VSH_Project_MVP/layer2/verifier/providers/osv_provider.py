@@ -5,6 +5,8 @@ from abc import ABC, abstractmethod
 from packaging.version import InvalidVersion
 from packaging.version import parse as parse_version
 
+from .osv_mirror import OsvMirror, get_osv_mirror
+
 try:
     from config import VULNERABLE_PACKAGES
 except ImportError:
@@ -13,11 +15,17 @@ except ImportError:
 
 class OsvProvider(ABC):
     mode: str = "unknown"
+    # True이면 verifier가 서로 다른 패키지 조회를 동시에 실행한다. (network 기반 provider)
+    concurrent: bool = False
 
     @abstractmethod
     def query_package(self, package_name: str, package_version: str | None) -> dict[str, str | None]:
         raise NotImplementedError
 
+    def query(self, ecosystem: str, package_name: str, package_version: str | None) -> dict[str, str | None]:
+        """ecosystem을 구분하는 provider는 override한다. 기본 구현은 ecosystem을 무시한다."""
+        return self.query_package(package_name, package_version)
+
 
 class MockOsvProvider(OsvProvider):
     mode = "mock-offline"
@@ -41,8 +49,44 @@ class MockOsvProvider(OsvProvider):
         return {"osv_status": "NOT_FOUND", "osv_summary": f"{package_name}=={package_version} >= {safe_floor}."}
 
 
+class LocalOsvProvider(OsvProvider):
+    """ingest된 OSV dump(local SQLite mirror)만으로 조회하는 offline provider."""
+
+    mode = "offline-mirror"
+
+    def __init__(self, mirror: OsvMirror | None = None, default_ecosystem: str = "PyPI"):
+        self.mirror = mirror or get_osv_mirror()
+        self.default_ecosystem = default_ecosystem
+
+    def query_package(self, package_name: str, package_version: str | None) -> dict[str, str | None]:
+        return self.query(self.default_ecosystem, package_name, package_version)
+
+    def query(self, ecosystem: str, package_name: str, package_version: str | None) -> dict[str, str | None]:
+        if not self.mirror.available(ecosystem):
+            return {"osv_status": "UNKNOWN", "osv_summary": f"offline OSV mirror에 {ecosystem} advisory 없음."}
+        if not package_version:
+            if self.mirror.advisory_ids(ecosystem, package_name):
+                return {"osv_status": "UNKNOWN", "osv_summary": f"`{package_name}` advisory 존재, 버전 미기재."}
+            return {"osv_status": "NOT_FOUND", "osv_summary": f"`{package_name}` advisory 없음(offline mirror)."}
+        advisories = self.mirror.advisories(self.mirror.advisory_ids(ecosystem, package_name, package_version))
+        if not advisories:
+            return {"osv_status": "NOT_FOUND", "osv_summary": f"{package_name}=={package_version} 해당 advisory 없음(offline mirror)."}
+        labels = []
+        for advisory in advisories:
+            cve = next((alias for alias in advisory["aliases"] if alias.startswith("CVE-")), None)
+            labels.append(f"{advisory['id']} ({cve})" if cve else advisory["id"])
+        return {"osv_status": "FOUND", "osv_summary": f"{package_name}=={package_version}: {', '.join(labels)}"}
+
+
+def default_osv_provider() -> OsvProvider:
+    """offline OSV mirror가 ingest돼 있으면 LocalOsvProvider, 아니면 MockOsvProvider."""
+    mirror = get_osv_mirror()
+    return LocalOsvProvider(mirror) if mirror.available() else MockOsvProvider()
+
+
 class OnlineOsvProvider(OsvProvider):
     mode = "online-opt-in"
+    concurrent = True
 
     def query_package(self, package_name: str, package_version: str | None) -> dict[str, str | None]:
         return {"osv_status": "UNIMPLEMENTED", "osv_summary": "online OSV API provider 확장 포인트(기본 비활성)."}
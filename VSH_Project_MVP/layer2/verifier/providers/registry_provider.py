@@ -4,6 +4,9 @@ from abc import ABC, abstractmethod
 import re
 
 class RegistryProvider(ABC):
+    # True이면 verifier가 서로 다른 패키지 조회를 동시에 실행한다. (network 기반 provider)
+    concurrent: bool = False
+
     @abstractmethod
     def verify_package(self, ecosystem: str, package_name: str, version: str | None) -> dict[str, str | None]:
         raise NotImplementedError
@@ -20,6 +23,8 @@ class OfflineRegistryProvider(RegistryProvider):
 
 
 class OnlineRegistryProvider(RegistryProvider):
+    concurrent = True
+
     def verify_package(self, ecosystem: str, package_name: str, version: str | None) -> dict[str, str | None]:
         return {
             "registry_status": "UNIMPLEMENTED",
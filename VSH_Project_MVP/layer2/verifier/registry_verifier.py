@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Dict, List
 
-from layer2.common.requirement_parser import parse_requirement_line
+from layer2.verifier.batching import PackageKey, package_key, verify_grouped
 from layer2.verifier.providers import OfflineRegistryProvider, RegistryProvider
 from models.vulnerability import Vulnerability
 
@@ -12,10 +12,21 @@ class RegistryVerifier:
         self.provider = provider or OfflineRegistryProvider()
 
     def verify(self, finding: Vulnerability) -> Dict[str, str | None]:
-        if finding.cwe_id != "CWE-829":
-            return {}
-        package_name, package_version = parse_requirement_line(finding.code_snippet)
+        key = package_key(finding)
+        return {} if key is None else self._verify_key(key)
+
+    def verify_many(self, findings: List[Vulnerability], keys: List[PackageKey | None] | None = None) -> List[Dict[str, str | None]]:
+        """finding 목록을 (ecosystem, package, version)별로 한 번씩만 검증하고 finding 순서대로 결과를 반환합니다."""
+        return verify_grouped(
+            findings,
+            self._verify_key,
+            "registry",
+            concurrent=getattr(self.provider, "concurrent", False),
+            keys=keys,
+        )
+
+    def _verify_key(self, key: PackageKey) -> Dict[str, str | None]:
+        ecosystem, package_name, package_version = key
         if not package_name:
             return {"registry_status": "UNKNOWN", "registry_summary": "의존성 라인에서 패키지명을 파싱하지 못했습니다."}
-        ecosystem = finding.metadata.get("ecosystem", "PyPI")
         return self.provider.verify_package(ecosystem, package_name, package_version)
@@ -1,6 +1,7 @@
 from .vulnerability import Vulnerability
+from .scan_finding import ScanFinding
 from .scan_result import ScanResult
 from .fix_suggestion import FixSuggestion
 from .common_schema import VulnRecord, PackageRecord
 
-__all__ = ["Vulnerability", "ScanResult", "FixSuggestion", "VulnRecord", "PackageRecord"]
+__all__ = ["Vulnerability", "ScanFinding", "ScanResult", "FixSuggestion", "VulnRecord", "PackageRecord"]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from .vulnerability import Vulnerability
+
+
+@dataclass(slots=True)
+class ScanFinding:
+    """
+    L1 scan 단계 내부에서만 쓰는 경량 finding.
+
+    pydantic 검증과 finding별 dict/list 할당 없이 만들 수 있도록 references/metadata는
+    rule 단위로 공유되는 불변 값(tuple, read-only mapping)을 그대로 참조한다.
+    외부로 나갈 때 `to_vulnerability()`로 한 번만 Vulnerability로 변환한다.
+    """
+
+    file_path: str | None
+    rule_id: str | None
+    cwe_id: str
+    severity: str
+    line_number: int
+    code_snippet: str
+    reachability_status: str | None = None
+    references: tuple[str, ...] = ()
+    metadata: Mapping[str, Any] | None = None
+
+    def __reduce__(self):
+        # 공유 metadata(MappingProxyType)는 pickle되지 않으므로 worker process 경계를 넘을 때만 dict로 복사한다.
+        return (
+            ScanFinding,
+            (
+                self.file_path, self.rule_id, self.cwe_id, self.severity, self.line_number, self.code_snippet,
+                self.reachability_status, self.references, dict(self.metadata) if self.metadata is not None else None,
+            ),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """`Vulnerability.model_dump()`와 같은 모양의 dict를 반환합니다. (findings cache 직렬화용)"""
+        return {
+            "file_path": self.file_path,
+            "rule_id": self.rule_id,
+            "cwe_id": self.cwe_id,
+            "severity": self.severity,
+            "line_number": self.line_number,
+            "code_snippet": self.code_snippet,
+            "reachability_status": self.reachability_status,
+            "references": list(self.references),
+            "metadata": dict(self.metadata or {}),
+        }
+
+    def to_vulnerability(self, update: Mapping[str, Any] | None = None) -> Vulnerability:
+        fields = self.to_dict()
+        if update:
+            fields.update(update)
+        return Vulnerability(**fields)
@@ -12,6 +12,8 @@ class ScanResult(BaseModel):
         file_path (str): 스캔 대상 파일 경로
         language (str): 파일의 언어 (예: python)
         findings (list[Vulnerability]): 발견된 취약점 리스트
+        call_graphs (dict[str, dict]): 파일 경로별 call graph evidence. finding의
+            `reachability_evidence.call_graph_id`가 가리키는 함수 목록/call graph를 파일당 한 번만 담는다.
     """
     file_path: str
     language: str
@@ -20,6 +22,7 @@ class ScanResult(BaseModel):
     package_records: List[PackageRecord] = Field(default_factory=list)
     annotated_files: Dict[str, str] = Field(default_factory=dict)
     notes: List[str] = Field(default_factory=list)
+    call_graphs: Dict[str, dict] = Field(default_factory=dict)
 
     def is_clean(self) -> bool:
         """
@@ -4,11 +4,12 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from .base_pipeline import BasePipeline
 from shared.contracts import BaseScanner, BaseAnalyzer
-from shared.finding_dedup import deduplicate_findings
+from shared.finding_dedup import FindingDeduplicator
 from layer2.common.schema_mapper import build_l2_vuln_records
 from layer2.patch_builder import PatchBuilder
 from layer2.retriever.evidence_retriever import EvidenceRetriever
 from layer2.verifier.registry_verifier import RegistryVerifier
+from layer2.verifier.batching import package_key
 from layer2.verifier.osv_verifier import OsvVerifier
 from layer2.analyzer.confidence_support import build_decision_metadata
 from repository.base_repository import BaseReadRepository, BaseWriteRepository
@@ -17,6 +18,7 @@ from models.scan_result import ScanResult
 from models.fix_suggestion import FixSuggestion
 from models.common_schema import PackageRecord, VulnRecord
 from shared.logging_utils import get_logger
+from shared.source_unit import source_unit_scope
 
 LOGGER = get_logger(__name__)
 
@@ -45,6 +47,7 @@ class AnalysisPipeline(BasePipeline):
         self.fix_repo = fix_repo
         self.log_repo = log_repo
 
+    @source_unit_scope()
     def run(self, file_path: str) -> dict:
         """
         파일에 대해 L1 스캔, 중복 제거, L2 분석, 결과 저장을 수행합니다.
@@ -111,6 +114,7 @@ class AnalysisPipeline(BasePipeline):
             retriever_status=retriever_status,
         )
 
+    @source_unit_scope()
     def run_scan_only(self, file_path: str) -> dict:
         """
         hyeonexcel 수정: MCP `scan_only` 계약을 지키기 위해
@@ -123,17 +127,20 @@ class AnalysisPipeline(BasePipeline):
                 "vuln_records": [],
                 "package_records": [],
                 "annotated_files": {},
+                "call_graphs": {},
                 "notes": [],
                 "is_clean": True,
             }
 
         integrated_scan_result = self._build_integrated_scan_result(file_path)
+        integrated_scan_result.annotated_files = self._build_annotation_preview(integrated_scan_result)
         return {
             "file_path": file_path,
             "scan_results": [v.model_dump() for v in integrated_scan_result.findings],
             "vuln_records": [record.model_dump() for record in integrated_scan_result.vuln_records],
             "package_records": [record.model_dump() for record in integrated_scan_result.package_records],
             "annotated_files": integrated_scan_result.annotated_files,
+            "call_graphs": integrated_scan_result.call_graphs,
             "notes": integrated_scan_result.notes,
             "is_clean": integrated_scan_result.is_clean(),
         }
@@ -155,22 +162,19 @@ class AnalysisPipeline(BasePipeline):
         # hyeonexcel 수정: run()에 몰려 있던 스캔/중복 제거/통합 ScanResult 생성을 분리해
         # 이후 L3 handoff나 멀티 언어 확장 시 입력 단계만 독립적으로 다룰 수 있게 한다.
         scan_results = self._scan_all_results(file_path)
-        unique_findings = deduplicate_findings(
-            [
-                finding
-                for result in scan_results
-                for finding in result.findings
-            ]
-        )
+        unique_findings = FindingDeduplicator()
+        for result in scan_results:
+            unique_findings.extend(result.findings)
         integrated_result = ScanResult(
             file_path=file_path,
             language=self._infer_language(file_path),
-            findings=unique_findings,
+            findings=unique_findings.results(),
+            call_graphs={path: graph for result in scan_results for path, graph in result.call_graphs.items()},
         )
         integrated_result.vuln_records = self._merge_vuln_records(scan_results)
         integrated_result.package_records = self._merge_package_records(scan_results)
         integrated_result.notes = self._merge_notes(scan_results)
-        integrated_result.annotated_files = self._build_annotation_preview(integrated_result)
+        # annotation preview는 L2 분석 동안 들고 있지 않도록 결과 payload를 만들 때 렌더링한다.
         return integrated_result
 
     @staticmethod
@@ -432,6 +436,7 @@ class AnalysisPipeline(BasePipeline):
         serialized_l2_vuln_records = [
             record.model_dump() for record in (l2_vuln_records or [])
         ]
+        integrated_scan_result.annotated_files = self._build_annotation_preview(integrated_scan_result)
         return {
             "file_path": integrated_scan_result.file_path,
             "scan_results": [v.model_dump() for v in integrated_scan_result.findings],
@@ -439,6 +444,7 @@ class AnalysisPipeline(BasePipeline):
             "package_records": [record.model_dump() for record in integrated_scan_result.package_records],
             "l2_vuln_records": serialized_l2_vuln_records,
             "annotated_files": integrated_scan_result.annotated_files,
+            "call_graphs": integrated_scan_result.call_graphs,
             "notes": integrated_scan_result.notes,
             "fix_suggestions": [f.model_dump() for f in fix_suggestions],
             "is_clean": is_clean,
@@ -451,13 +457,26 @@ class AnalysisPipeline(BasePipeline):
         }
 
     def _build_annotation_preview(self, integrated_scan_result: ScanResult) -> Dict[str, str]:
+        """
+        finding이 있는 파일별 annotation preview를 만듭니다.
+
+        `annotations()`를 제공하는 scanner는 LazyAnnotations로 파일을 하나씩 렌더링하고,
+        그렇지 않은 scanner만 `annotate()`로 전체 결과를 만든다. 반환 payload(MCP/API)는 JSON
+        `{경로: 소스}`이므로 여기서 dict로 만든다.
+        """
+        if not integrated_scan_result.findings:
+            return {}
         for scanner in self.scanners:
-            if not hasattr(scanner, "annotate"):
-                continue
             try:
-                annotated_result = scanner.annotate(integrated_scan_result.model_copy(deep=True))
-                if annotated_result.annotated_files:
-                    return annotated_result.annotated_files
+                if hasattr(scanner, "annotations"):
+                    previews = dict(scanner.annotations(integrated_scan_result))
+                elif hasattr(scanner, "annotate"):
+                    # annotate는 finding을 읽기만 하므로 얕은 copy로 충분하다.
+                    previews = scanner.annotate(integrated_scan_result.model_copy()).annotated_files
+                else:
+                    continue
+                if previews:
+                    return previews
             except Exception as exc:
                 print(f"[WARN] Annotation preview failed: {exc}")
         return {}
@@ -720,16 +739,18 @@ class AnalysisPipeline(BasePipeline):
         findings: List[Vulnerability],
     ) -> Dict[str, Dict]:
         verification_map: Dict[str, Dict] = {}
+        # 의존성 라인 파싱은 finding당 한 번만 하고, 두 verifier 모두 같은 (ecosystem, package, version) key로 묶어 검증한다.
+        keys = [package_key(finding) for finding in findings]
+        registry_contexts = self._safe_verify_many(self.registry_verifier, findings, keys, "registry")
+        osv_contexts = self._safe_verify_many(self.osv_verifier, findings, keys, "osv")
 
-        for finding in findings:
+        for finding, registry_context, osv_context in zip(findings, registry_contexts, osv_contexts):
             issue_id = self._build_issue_id(
                 self._resolve_finding_file_path(finding, default_file_path),
                 finding.cwe_id,
                 finding.line_number,
             )
 
-            registry_context = self._safe_verify(self.registry_verifier, finding, "registry")
-            osv_context = self._safe_verify(self.osv_verifier, finding, "osv")
             verification_context = {
                 **registry_context,
                 **osv_context,
@@ -744,6 +765,16 @@ class AnalysisPipeline(BasePipeline):
 
         return verification_map
 
+    @classmethod
+    def _safe_verify_many(cls, verifier, findings: List[Vulnerability], keys: List, prefix: str) -> List[Dict[str, str | None]]:
+        verify_many = getattr(verifier, "verify_many", None)
+        if verify_many is None:
+            return [cls._safe_verify(verifier, finding, prefix) for finding in findings]
+        try:
+            return verify_many(findings, keys=keys)
+        except Exception as exc:
+            return [{f"{prefix}_status": "ERROR", f"{prefix}_summary": str(exc)} for _ in findings]
+
     @staticmethod
     def _safe_verify(verifier, finding: Vulnerability, prefix: str) -> Dict[str, str | None]:
         try:
@@ -877,6 +908,7 @@ class AnalysisPipeline(BasePipeline):
         if retriever_status:
             summary["chroma_status"] = retriever_status.get("status", "UNKNOWN")
             summary["chroma_summary"] = retriever_status.get("summary", "")
+            summary["retriever_backend"] = retriever_status.get("backend", "chroma")
         return summary
 
     @staticmethod
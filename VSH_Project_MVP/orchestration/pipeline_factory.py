@@ -9,6 +9,7 @@ from layer2.patch_builder import PatchBuilder
 from layer2.retriever.evidence_retriever import EvidenceRetriever
 from layer2.verifier.registry_verifier import RegistryVerifier
 from layer2.verifier.osv_verifier import OsvVerifier
+from layer2.verifier.providers import default_osv_provider
 from repository.knowledge_repo import MockKnowledgeRepo
 from repository.fix_repo import MockFixRepo
 from repository.log_repo import MockLogRepo
@@ -85,7 +86,7 @@ class PipelineFactory:
             analyzer=analyzer,
             evidence_retriever=EvidenceRetriever(),
             registry_verifier=RegistryVerifier(),
-            osv_verifier=OsvVerifier(),
+            osv_verifier=OsvVerifier(provider=default_osv_provider()),
             patch_builder=PatchBuilder(),
             knowledge_repo=knowledge_repo,
             fix_repo=fix_repo,
@@ -42,6 +42,18 @@ class MockKnowledgeRepo(BaseReadRepository):
 
         return None
 
+    def source_stamp(self) -> Optional[tuple]:
+        """
+        knowledge.json의 (경로, mtime_ns, size)를 반환합니다. 파일이 없으면 None.
+
+        compiled rule index 같은 파생 캐시가 find_all()을 다시 읽지 않고 변경 여부를 판단할 때 사용한다.
+        """
+        try:
+            stat = KNOWLEDGE_PATH_OBJ.stat()
+        except OSError:
+            return None
+        return (str(KNOWLEDGE_PATH_OBJ), stat.st_mtime_ns, stat.st_size)
+
     def find_all(self) -> List[Dict]:
         if not KNOWLEDGE_PATH_OBJ.exists():
             return []
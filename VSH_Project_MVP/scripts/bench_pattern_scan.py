@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from layer1.common.import_risk import guess_language
+from layer1.common.pattern_scan import JAVASCRIPT_RULES, PYTHON_RULES, scan_file_with_patterns
+from models.vulnerability import Vulnerability
+
+PY_LINES = [
+    "def handler(request):",
+    "    user_id = request.args.get('id')",
+    "    total = sum(item.price for item in cart)",
+    "    logger.info('processing %s', user_id)",
+    "    return render_template('index.html', user=user)",
+    "    cursor.execute(f\"SELECT * FROM users WHERE id={user_id}\")",
+    "    result = eval(expression)",
+    "    subprocess.run(cmd, shell=True)",
+    "    data = pickle.loads(payload)",
+    "    os.system('ls ' + path)",
+]
+JS_LINES = [
+    "function render(node, value) {",
+    "  const items = data.map((item) => item.name);",
+    "  console.log('rendering', items.length);",
+    "  return items.filter(Boolean);",
+    "  node.innerHTML = value;",
+    "  document.write(value);",
+    "  eval(code);",
+]
+
+
+def _legacy_scan(file_path: str) -> list[Vulnerability]:
+    """rule x line 단위로 re.search를 실행하던 기존 구현."""
+    language = guess_language(file_path)
+    rules = JAVASCRIPT_RULES if language in {"javascript", "typescript"} else PYTHON_RULES
+    content = Path(file_path).read_text(encoding="utf-8")
+    findings: list[Vulnerability] = []
+    for line_number, line in enumerate(content.splitlines(), start=1):
+        for rule in rules:
+            if not re.search(rule.pattern, line):
+                continue
+            findings.append(
+                Vulnerability(
+                    file_path=file_path,
+                    rule_id=rule.rule_id,
+                    cwe_id=rule.cwe_id,
+                    severity=rule.severity,
+                    line_number=line_number,
+                    code_snippet=line.strip(),
+                    references=list(rule.references),
+                    metadata={"engine": "vsh_pattern", "title": rule.title},
+                )
+            )
+    return findings
+
+
+def _build_corpus(root: Path, files: int, lines_per_file: int, hit_ratio: float, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    paths: list[str] = []
+    for idx in range(files):
+        is_js = idx % 4 == 0
+        pool = JS_LINES if is_js else PY_LINES
+        benign = pool[:4] if is_js else pool[:5]
+        body = [rng.choice(pool) if rng.random() < hit_ratio else rng.choice(benign) for _ in range(lines_per_file)]
+        path = root / f"mod_{idx:05d}.{'js' if is_js else 'py'}"
+        path.write_text("\n".join(body) + "\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def _time_scan(scan, paths: list[str]) -> tuple[float, list[list[Vulnerability]]]:
+    started = time.perf_counter()
+    results = [scan(path) for path in paths]
+    return time.perf_counter() - started, results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs compiled pattern_scan on a synthetic corpus.")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--hit-ratio", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="vsh-bench-") as tmp:
+        paths = _build_corpus(Path(tmp), args.files, args.lines, args.hit_ratio, args.seed)
+        legacy_sec, legacy = _time_scan(_legacy_scan, paths)
+        compiled_sec, compiled = _time_scan(scan_file_with_patterns, paths)
+
+    identical = [[v.model_dump() for v in a] for a in legacy] == [[v.model_dump() for v in b] for b in compiled]
+    findings = sum(len(r) for r in compiled)
+    print(f"corpus: {args.files} files x {args.lines} lines, findings={findings}")
+    print(f"legacy   : {legacy_sec:8.3f}s")
+    print(f"compiled : {compiled_sec:8.3f}s")
+    print(f"speedup  : {legacy_sec / compiled_sec if compiled_sec else float('inf'):8.2f}x")
+    print(f"identical: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
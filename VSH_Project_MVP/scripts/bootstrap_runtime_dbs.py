@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import json
-import uuid
 from pathlib import Path
 
 from chromadb import PersistentClient
@@ -14,6 +13,7 @@ from config import (
     KNOWLEDGE_PATH,
     SEED_DB_DIR,
 )
+from layer2.retriever.seed_corpus import build_seed_corpus
 from shared.vulnerability_db import VulnerabilityDatabase
 
 
@@ -45,37 +45,7 @@ def _build_chroma() -> None:
         if ids:
             collection.delete(ids=ids)
 
-    docs = []
-    metadatas = []
-    ids = []
-
-    for item in _load_seed_json("knowledge.json"):
-        docs.append(item.get("description", ""))
-        metadatas.append(
-            {
-                "cwe": item.get("id", ""),
-                "source": "KISA",
-                "source_id": item.get("reference", ""),
-                "title": item.get("name", ""),
-                "kisa_article": item.get("reference", ""),
-                "text": item.get("description", ""),
-            }
-        )
-        ids.append(f"knowledge-{item.get('id', uuid.uuid4().hex)}")
-
-    for item in _load_seed_json("kisa_fix.json"):
-        docs.append(item.get("description", ""))
-        metadatas.append(
-            {
-                "cwe": item.get("id", ""),
-                "source": "KISA_FIX",
-                "source_id": item.get("id", ""),
-                "title": f"Fix guide for {item.get('id', '')}",
-                "kisa_article": item.get("id", ""),
-                "text": item.get("description", ""),
-            }
-        )
-        ids.append(f"fix-{item.get('id', uuid.uuid4().hex)}")
+    ids, docs, metadatas = build_seed_corpus(SEED_DB_DIR)
 
     if docs:
         collection.add(ids=ids, documents=docs, metadatas=metadatas)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from layer2.verifier.providers.osv_mirror import OsvMirror, mirror_db_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OSV ecosystem dump(`<Ecosystem>/all.zip`)를 offline mirror로 ingest합니다.")
+    parser.add_argument("zips", nargs="+", help="https://osv-vulnerabilities.storage.googleapis.com/<Ecosystem>/all.zip")
+    parser.add_argument("--db", default=None, help=f"mirror DB 경로 (기본값: {mirror_db_path()})")
+    parser.add_argument("--force", action="store_true", help="같은 파일이어도 다시 ingest")
+    args = parser.parse_args()
+
+    mirror = OsvMirror(args.db)
+    for path in args.zips:
+        started = time.perf_counter()
+        count = mirror.ingest_zip(path, force=args.force)
+        status = f"{count} advisories" if count else "unchanged, skipped"
+        print(f"{path}: {status} ({time.perf_counter() - started:.1f}s)")
+    print(f"ecosystems: {', '.join(sorted(mirror.ecosystems())) or '-'}")
+    mirror.close()
+
+
+if __name__ == "__main__":
+    main()
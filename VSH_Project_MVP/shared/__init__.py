@@ -1,8 +1,9 @@
 from .contracts import BaseAnalyzer, BaseScanner
-from .finding_dedup import deduplicate_findings
+from .finding_dedup import FindingDeduplicator, deduplicate_findings
 
 __all__ = [
     "BaseAnalyzer",
     "BaseScanner",
+    "FindingDeduplicator",
     "deduplicate_findings",
 ]
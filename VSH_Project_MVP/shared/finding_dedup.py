@@ -1,19 +1,24 @@
 from __future__ import annotations
 
-from typing import Iterable
+from dataclasses import replace
+from typing import Any, Iterable
 
+from models.scan_finding import ScanFinding
 from models.vulnerability import Vulnerability
 
+# scan 단계 내부 finding(ScanFinding)과 Vulnerability를 모두 받는다.
+Finding = Vulnerability | ScanFinding
+
 _SEVERITY_RANK = {"CRITICAL": 4, "HIGH": 3, "MEDIUM": 2, "LOW": 1}
 _REACHABILITY_RANK = {"reachable": 3, "unreachable": 2, "unknown": 1, None: 0}
 
 
-def _dedup_key(finding: Vulnerability) -> tuple:
+def _dedup_key(finding: Finding) -> tuple:
     evidence = (finding.code_snippet or "").strip()
     span_start = finding.line_number
-    span_end = finding.metadata.get("end_line_number", finding.line_number)
+    span_end = (finding.metadata or {}).get("end_line_number", finding.line_number)
     # core dedup grouping: same file, CWE, line-span => merge duplicates
-    # metadata and evidence는 병합 시력으로 유지하며 false-merge는 _merge_findings에서 조정
+    # metadata and evidence는 병합 시력으로 유지하며 false-merge는 _MergeRecord.merge에서 조정
     return (
         finding.file_path,
         finding.cwe_id,
@@ -22,25 +27,105 @@ def _dedup_key(finding: Vulnerability) -> tuple:
     )
 
 
-def deduplicate_findings(findings: Iterable[Vulnerability]) -> list[Vulnerability]:
-    unique: dict[tuple, Vulnerability] = {}
-    for finding in findings:
+class _MergeRecord:
+    """dedup key 하나에 모인 finding들의 병합 상태. 병합이 일어나기 전까지는 첫 finding을 그대로 가리킨다."""
+
+    __slots__ = ("source", "merged", "rule_id", "severity", "code_snippet", "reachability_status", "references", "reference_set", "metadata")
+
+    def __init__(self, source: Finding):
+        self.source = source
+        self.merged = False
+
+    def merge(self, incoming: Finding) -> None:
+        if not self.merged:
+            base = self.source
+            self.merged = True
+            self.rule_id = base.rule_id
+            self.severity = base.severity
+            self.code_snippet = base.code_snippet
+            self.reachability_status = base.reachability_status
+            self.references = list(dict.fromkeys(base.references))
+            self.reference_set = set(self.references)
+            self.metadata = dict(base.metadata or {})
+        self.rule_id = self.rule_id or incoming.rule_id
+        if _SEVERITY_RANK.get(self.severity, 0) < _SEVERITY_RANK.get(incoming.severity, 0):
+            self.severity = incoming.severity
+        if len(self.code_snippet or "") < len(incoming.code_snippet or ""):
+            self.code_snippet = incoming.code_snippet
+        if _REACHABILITY_RANK.get(self.reachability_status, 0) < _REACHABILITY_RANK.get(incoming.reachability_status, 0):
+            self.reachability_status = incoming.reachability_status
+        for ref in incoming.references:
+            if ref not in self.reference_set:
+                self.reference_set.add(ref)
+                self.references.append(ref)
+        for k, v in (incoming.metadata or {}).items():
+            self.metadata.setdefault(k, v)
+
+    def _update(self) -> dict[str, Any]:
+        return {
+            "rule_id": self.rule_id,
+            "severity": self.severity,
+            "code_snippet": self.code_snippet,
+            "reachability_status": self.reachability_status,
+            "references": self.references,
+            "metadata": self.metadata,
+        }
+
+    def to_finding(self) -> Finding:
+        """병합 결과를 입력과 같은 타입으로 반환합니다. ScanFinding은 ScanFinding으로 남는다."""
+        source = self.source
+        if not self.merged:
+            return source
+        if isinstance(source, Vulnerability):
+            return source.model_copy(update=self._update())
+        return replace(source, **{**self._update(), "references": tuple(self.references)})
+
+    def to_vulnerability(self) -> Vulnerability:
+        source = self.source
+        if not self.merged:
+            return source if isinstance(source, Vulnerability) else source.to_vulnerability()
+        if isinstance(source, Vulnerability):
+            return source.model_copy(update=self._update())
+        return source.to_vulnerability(self._update())
+
+
+class FindingDeduplicator:
+    """
+    scanner가 finding을 내보내는 대로 추가할 수 있는 incremental dedup 구조.
+
+    dedup key별 병합은 가벼운 내부 record에서 in-place로 수행하고, `results()`에서 병합된 key만
+    한 번 Vulnerability로 변환한다. 병합되지 않은 Vulnerability는 원래 객체를 그대로 반환하고,
+    ScanFinding은 이때 처음 Vulnerability로 만들어진다. scan 단계 안에서는 `findings()`로
+    ScanFinding을 그대로 유지한 채 병합 결과만 받을 수 있다.
+    """
+
+    def __init__(self, findings: Iterable[Finding] = ()):
+        self._records: dict[tuple, _MergeRecord] = {}
+        self.extend(findings)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, finding: Finding) -> None:
         key = _dedup_key(finding)
-        existing = unique.get(key)
-        unique[key] = finding if existing is None else _merge_findings(existing, finding)
-    return list(unique.values())
-
-
-def _merge_findings(base: Vulnerability, incoming: Vulnerability) -> Vulnerability:
-    refs = list(dict.fromkeys([*base.references, *incoming.references]))
-    meta = dict(base.metadata)
-    for k, v in incoming.metadata.items():
-        meta.setdefault(k, v)
-    return base.model_copy(update={
-        "rule_id": base.rule_id or incoming.rule_id,
-        "severity": base.severity if _SEVERITY_RANK.get(base.severity, 0) >= _SEVERITY_RANK.get(incoming.severity, 0) else incoming.severity,
-        "code_snippet": base.code_snippet if len(base.code_snippet or "") >= len(incoming.code_snippet or "") else incoming.code_snippet,
-        "reachability_status": base.reachability_status if _REACHABILITY_RANK.get(base.reachability_status, 0) >= _REACHABILITY_RANK.get(incoming.reachability_status, 0) else incoming.reachability_status,
-        "references": refs,
-        "metadata": meta,
-    })
+        record = self._records.get(key)
+        if record is None:
+            self._records[key] = _MergeRecord(finding)
+        else:
+            record.merge(finding)
+
+    def extend(self, findings: Iterable[Finding]) -> "FindingDeduplicator":
+        for finding in findings:
+            self.add(finding)
+        return self
+
+    def findings(self) -> list[Finding]:
+        return [record.to_finding() for record in self._records.values()]
+
+    def results(self) -> list[Vulnerability]:
+        return [record.to_vulnerability() for record in self._records.values()]
+
+
+def deduplicate_findings(findings: Iterable[Finding]) -> list[Vulnerability]:
+    return FindingDeduplicator(findings).results()
+
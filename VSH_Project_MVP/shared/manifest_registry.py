@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+# project root를 판단하는 dependency manifest (SBOMScanner 수집 대상)
+MANIFEST_FILES = [
+    "requirements.txt",
+    "pyproject.toml",
+    "Pipfile",
+    "poetry.lock",
+    "package.json",
+    "package-lock.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+]
+# 언어 감지에만 쓰는 추가 marker 파일
+MARKER_FILES = ["pom.xml", "go.mod"]
+TRACKED_FILES = [*MANIFEST_FILES, *MARKER_FILES]
+
+
+def _dir_stamp(directory: Path) -> int | None:
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ManifestRegistry:
+    """
+    directory별 manifest 존재 여부와 directory -> project root 결과를 process 단위로 캐시하는 registry.
+
+    파일이 생성/삭제/이름 변경되면 상위 directory의 mtime이 바뀌므로, directory mtime이 같으면
+    manifest 이름별 exists() 확인을 다시 하지 않는다. project root 결과는 탐색한 directory 체인의 mtime으로 검증한다.
+    """
+
+    def __init__(self):
+        self._present: dict[str, tuple[int, frozenset[str]]] = {}
+        self._roots: dict[str, tuple[Path, tuple[tuple[str, int | None], ...]]] = {}
+        self._lock = threading.Lock()
+        self.probes = 0
+
+    def present(self, directory: str | Path) -> frozenset[str]:
+        """directory에 실제로 있는 manifest/marker 파일 이름 집합."""
+        directory = Path(directory)
+        stamp = _dir_stamp(directory)
+        if stamp is None:
+            return frozenset()
+        key = str(directory)
+        with self._lock:
+            cached = self._present.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        names = frozenset(name for name in TRACKED_FILES if (directory / name).is_file())
+        with self._lock:
+            self.probes += 1
+            self._present[key] = (stamp, names)
+        return names
+
+    def project_root(self, target: str | Path) -> Path:
+        """target(파일 또는 directory)에서 위로 올라가며 manifest가 있는 첫 directory. 없으면 시작 directory."""
+        target = Path(target)
+        start = target if target.is_dir() else target.parent
+        key = str(start)
+        with self._lock:
+            cached = self._roots.get(key)
+        if cached is not None and all(_dir_stamp(Path(d)) == stamp for d, stamp in cached[1]):
+            return cached[0]
+
+        root = start
+        chain: list[tuple[str, int | None]] = []
+        for current in [start, *start.parents]:
+            chain.append((str(current), _dir_stamp(current)))
+            if self.present(current).intersection(MANIFEST_FILES):
+                root = current
+                break
+        with self._lock:
+            self._roots[key] = (root, tuple(chain))
+        return root
+
+    def manifests(self, root: str | Path) -> list[Path]:
+        """root의 dependency manifest 경로를 MANIFEST_FILES 순서로 반환합니다."""
+        root = Path(root)
+        present = self.present(root)
+        return [root / name for name in MANIFEST_FILES if name in present]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._present.clear()
+            self._roots.clear()
+
+
+MANIFEST_REGISTRY = ManifestRegistry()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+def split_source_lines(text: str, keepends: bool = False) -> list[str]:
+    """
+    "\n"에서만 라인을 나눕니다. (tree-sitter row/readlines와 같은 라인 번호)
+
+    `str.splitlines()`는 form feed, \x1c-\x1e, \x85, \u2028/\u2029에서도 나눠 라인 번호가 밀린다.
+    keepends가 아니면 라인 끝의 "\r"을 떼어 낸다.
+    """
+    lines = text.split("\n")
+    last = lines.pop()
+    if keepends:
+        lines = [line + "\n" for line in lines]
+        return lines + [last] if last else lines
+    lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+    if last:
+        lines.append(last[:-1] if last.endswith("\r") else last)
+    return lines
+
+
+class SourceUnit:
+    """
+    한 번의 분석 동안 파일 하나를 L1 탐지기/annotator/L2 context 추출이 공유하는 parse-once 단위.
+
+    파일은 한 번만 읽고 decode하며, 라인 분할/라인 offset/import 목록/tree-sitter tree는
+    처음 요청될 때 한 번만 계산해 보관한다. import 목록처럼 탐지기별로 파생되는 값은 `memo()`에 보관한다.
+    """
+
+    def __init__(self, path: str, raw: bytes):
+        self.path = path
+        self.raw = raw
+        try:
+            self.text = raw.decode("utf-8")
+            self.lossy = False
+        except UnicodeDecodeError:
+            self.text = raw.decode("utf-8", errors="ignore")
+            self.lossy = True
+        self._lines: list[str] | None = None
+        self._joined: str | None = None
+        self._offsets: list[int] | None = None
+        self._content_hash: str | None = None
+        self._memo: dict[str, Any] = {}
+        self._trees: dict[int, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def lines(self) -> list[str]:
+        if self._lines is None:
+            self._lines = split_source_lines(self.text)
+        return self._lines
+
+    @property
+    def joined_text(self) -> str:
+        """`lines`를 "\\n"으로 이어 붙인 텍스트. `line_offsets`는 이 텍스트 기준이다."""
+        if self._joined is None:
+            self._joined = "\n".join(self.lines)
+        return self._joined
+
+    @property
+    def line_offsets(self) -> list[int]:
+        """0-based 라인 index -> `joined_text` 안의 시작 offset."""
+        if self._offsets is None:
+            text = self.joined_text
+            offsets = [0]
+            position = text.find("\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = text.find("\n", position + 1)
+            self._offsets = offsets
+        return self._offsets
+
+    @property
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(self.raw).hexdigest()
+        return self._content_hash
+
+    @property
+    def code_bytes(self) -> bytes:
+        return self.raw if not self.lossy else self.text.encode("utf-8")
+
+    def memo(self, key: str, factory: Callable[["SourceUnit"], T]) -> T:
+        """key별로 factory(unit) 결과를 한 번만 계산해 보관합니다. (예: import 목록)"""
+        if key not in self._memo:
+            self._memo[key] = factory(self)
+        return self._memo[key]
+
+    def tree(self, parser: Any, parse: Callable[[bytes], Any] | None = None) -> Any:
+        """
+        parser 언어 기준 tree-sitter tree를 한 번만 parse해 반환합니다.
+
+        parse를 주면 parser.parse 대신 사용한다. (예: 이전 tree를 이용한 incremental reparse)
+        """
+        key = id(parser.language)
+        with self._lock:
+            if key not in self._trees:
+                self._trees[key] = parse(self.code_bytes) if parse else parser.parse(self.code_bytes)
+            return self._trees[key]
+
+
+# 진행 중인 분석(scan) 하나가 공유하는 {경로: SourceUnit}. scope 밖에서는 호출마다 파일을 새로 읽는다.
+_SCOPE: ContextVar["dict[str, SourceUnit] | None"] = ContextVar("vsh_source_units", default=None)
+
+
+@contextmanager
+def source_unit_scope() -> Iterator[dict[str, SourceUnit]]:
+    """
+    분석 한 번 동안 파일별 SourceUnit을 한 번만 읽어 공유하는 scope를 엽니다.
+
+    scope가 끝나면 unit을 모두 버리므로 다음 분석은 파일을 새로 읽는다. 이미 scope 안이면 바깥 scope를 그대로 쓴다.
+    """
+    units = _SCOPE.get()
+    if units is not None:
+        yield units
+        return
+    units = {}
+    token = _SCOPE.set(units)
+    try:
+        yield units
+    finally:
+        _SCOPE.reset(token)
+
+
+def load_source_unit(file_path: str | Path) -> SourceUnit:
+    """
+    파일의 SourceUnit을 반환합니다. `source_unit_scope()` 안에서는 같은 경로를 한 번만 읽는다.
+
+    Raises:
+        OSError: 파일을 읽을 수 없는 경우
+    """
+    key = os.fspath(file_path)
+    units = _SCOPE.get()
+    if units is not None:
+        unit = units.get(key)
+        if unit is not None:
+            return unit
+    with open(key, "rb") as handle:
+        unit = SourceUnit(key, handle.read())
+    if units is not None:
+        units[key] = unit
+    return unit
@@ -1,3 +1,5 @@
+import json
+
 from models.vulnerability import Vulnerability
 from orchestration.pipeline_factory import PipelineFactory
 from layer1.scanner import VSHL1Scanner
@@ -260,3 +262,715 @@ def test_l3_status_requires_sonar_token(monkeypatch):
 
     assert status["enabled"] is False
     assert "SONAR_TOKEN" in status["reason"]
+
+
+def test_compiled_pattern_scan_matches_rule_by_rule_search(tmp_path):
+    import re
+
+    from layer1.common.pattern_scan import PYTHON_RULES, scan_file_with_patterns
+
+    sample = tmp_path / "multi.py"
+    # form feed는 라인 구분자가 아니다. (tree-sitter/readlines와 같은 라인 번호)
+    lines = [
+        "import os, pickle",
+        "os.system(eval(cmd))",
+        "data = pickle.loads(blob)\x0cos.system('ls')",
+        "value = evaluate(x)",
+        'cursor.execute(f"SELECT {user}")',
+    ]
+    sample.write_bytes("\r\n".join(lines).encode("utf-8"))
+
+    expected = [
+        (line_number, rule.rule_id)
+        for line_number, line in enumerate(lines, start=1)
+        for rule in PYTHON_RULES
+        if re.search(rule.pattern, line)
+    ]
+
+    findings = scan_file_with_patterns(str(sample))
+
+    assert [(f.line_number, f.rule_id) for f in findings] == expected
+    assert "VSH-PY-EVAL-001" in {f.rule_id for f in findings if f.line_number == 2}
+    assert all(f.metadata["engine"] == "vsh_pattern" for f in findings)
+
+
+def test_project_scan_with_worker_pool_matches_serial_scan(tmp_path):
+    project = tmp_path / "pool"
+    (project / "pkg").mkdir(parents=True)
+    (project / "app.py").write_text("user_input = input()\neval(user_input)\n", encoding="utf-8")
+    (project / "pkg" / "db.py").write_text(
+        'import os\nos.system(input())\ncursor.execute(f"SELECT {x}")\n', encoding="utf-8"
+    )
+    (project / "web.js").write_text("el.innerHTML = location.hash;\n", encoding="utf-8")
+
+    serial = VSHL1Scanner(workers=1).scan(str(project))
+    pooled = VSHL1Scanner(workers=4, max_workers=2).scan(str(project))
+
+    key = lambda f: (f.file_path, f.line_number, f.cwe_id, f.rule_id)
+    assert [key(f) for f in pooled.findings] == [key(f) for f in serial.findings]
+    assert "l1_workers=1" in serial.notes
+    assert "l1_workers=2" in pooled.notes
+
+
+def test_semgrep_cli_scanner_batches_targets_and_caches_rule_config(tmp_path, monkeypatch):
+    import json
+    import sys
+
+    import layer1.scanner.semgrep_cli_scanner as semgrep_module
+
+    calls = tmp_path / "calls.log"
+    fake = tmp_path / "fake_semgrep.py"
+    fake.write_text(
+        "\n".join(
+            [
+                f"#!{sys.executable}",
+                "import json, sys",
+                f"open({str(calls)!r}, 'a').write(json.dumps(sys.argv[1:]) + '\\n')",
+                "targets = [a for a in sys.argv[1:] if a.endswith(('.py', '.js'))]",
+                "results = [{'path': t, 'check_id': 'vsh.python.eval', 'start': {'line': 1},",
+                "            'extra': {'lines': 'eval(x)', 'metadata': {'cwe_id': 'CWE-95', 'severity': 'CRITICAL'}}}",
+                "           for t in targets]",
+                "print(json.dumps({'results': results}))",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    fake.chmod(0o755)
+    monkeypatch.setattr(semgrep_module, "SEMGREP_CACHE_DIR", tmp_path / "cache")
+
+    first = tmp_path / "a.py"
+    second = tmp_path / "b.js"
+    first.write_text("eval(x)\n", encoding="utf-8")
+    second.write_text("eval(x)\n", encoding="utf-8")
+
+    class StaticKnowledgeRepo:
+        def find_all(self):
+            return [{"id": "CWE-95", "pattern": "eval\\(", "severity": "HIGH"}]
+
+    scanner = SemgrepCLIScanner(
+        knowledge_repo=StaticKnowledgeRepo(),
+        config={"tools": {"semgrep_path": str(fake), "semgrep_auto_detect": False}},
+    )
+    by_file, failed = scanner.scan_many([str(first), str(second)])
+    scanner.scan_many([str(first)])
+
+    # 언어별로 config를 나눠 실행하고, 같은 언어는 batch 구성과 무관하게 같은 config를 재사용한다.
+    invocations = [json.loads(line) for line in calls.read_text(encoding="utf-8").splitlines()]
+    assert len(invocations) == 3
+    assert str(second) in invocations[0] and str(first) not in invocations[0]
+    assert str(first) in invocations[1] and str(second) not in invocations[1]
+    assert invocations[1][2] == invocations[2][2]
+    assert set(by_file) == {str(first), str(second)}
+    assert [f.file_path for f in by_file[str(first)]] == [str(first)]
+    assert len(by_file[str(second)]) == 1
+    assert failed == set()
+    configs = [json.loads(path.read_text(encoding="utf-8")) for path in (tmp_path / "cache").glob("rules-*.json")]
+    knowledge_languages = sorted(
+        rule["languages"] for config in configs for rule in config["rules"] if rule["id"].startswith("vsh.knowledge.")
+    )
+    assert knowledge_languages == [["javascript"], ["python"]]
+
+
+def test_findings_cache_reuses_unchanged_files_and_invalidates_on_change(tmp_path):
+    from layer1.common import L1FindingsCache
+
+    project = tmp_path / "cached"
+    project.mkdir()
+    stable = project / "stable.py"
+    edited = project / "edited.py"
+    stable.write_text("user_input = input()\neval(user_input)\n", encoding="utf-8")
+    edited.write_text("import os\nos.system(input())\n", encoding="utf-8")
+
+    cache = L1FindingsCache(tmp_path / "cache", ttl_hours=1)
+    scanner = VSHL1Scanner(workers=1, findings_cache=cache)
+    first = scanner.scan(str(project))
+
+    scanned: list[str] = []
+    original = scanner._scan_project_files
+
+    def tracking(files, workers, semgrep_by_file):
+        scanned.extend(str(src) for src in files)
+        return original(files, workers, semgrep_by_file)
+
+    scanner._scan_project_files = tracking
+    second = scanner.scan(str(project))
+
+    assert scanned == []
+    assert "l1_cache_hits=2" in second.notes
+    assert [f.model_dump() for f in second.findings] == [f.model_dump() for f in first.findings]
+
+    edited.write_text("import os\nos.system(input())\neval(input())\n", encoding="utf-8")
+    third = scanner.scan(str(project))
+
+    assert scanned == [str(edited)]
+    assert any(f.file_path == str(edited) and f.line_number == 3 for f in third.findings)
+
+
+def test_findings_cache_skips_files_from_failed_semgrep_batches(tmp_path, monkeypatch):
+    import sys
+
+    import layer1.scanner.semgrep_cli_scanner as semgrep_module
+    from layer1.common import L1FindingsCache
+
+    fake = tmp_path / "broken_semgrep.py"
+    fake.write_text(f"#!{sys.executable}\nimport sys\nsys.stderr.write('boom')\nsys.exit(2)\n", encoding="utf-8")
+    fake.chmod(0o755)
+    monkeypatch.setattr(semgrep_module, "SEMGREP_CACHE_DIR", tmp_path / "rules")
+    project = tmp_path / "proj"
+    project.mkdir()
+    (project / "app.py").write_text("eval(input())\n", encoding="utf-8")
+
+    scanner = VSHL1Scanner(workers=1, findings_cache=L1FindingsCache(tmp_path / "cache", ttl_hours=1))
+    scanner.semgrep_scanner.config = {"tools": {"semgrep_path": str(fake), "semgrep_auto_detect": False}}
+    by_file, failed = scanner.semgrep_scanner.scan_many([str(project / "app.py")])
+    assert by_file == {str(project / "app.py"): []} and failed == {str(project / "app.py")}
+
+    assert "l1_cache_hits=0" in scanner.scan(str(project)).notes
+    assert "l1_cache_hits=0" in scanner.scan(str(project)).notes
+
+
+def test_findings_cache_evicts_least_recently_used_entries(tmp_path):
+    from layer1.common import L1FindingsCache
+
+    cache = L1FindingsCache(tmp_path / "cache", max_entries=2)
+    finding = Vulnerability(file_path="a.py", cwe_id="CWE-95", severity="HIGH", line_number=1, code_snippet="eval(x)")
+
+    cache.put_many({"k1": ("a.py", [finding], None)})
+    cache.put_many({"k2": ("a.py", [finding], None)})
+    assert set(cache.get_many(["k1"], {"k1": "b.py"})) == {"k1"}
+    cache.put_many({"k3": ("a.py", [finding], None)})
+
+    hits = cache.get_many(["k1", "k2", "k3"], {"k1": "b.py", "k3": "c.py"})
+    assert set(hits) == {"k1", "k3"}
+    assert hits["k1"][0][0].file_path == "b.py"
+
+
+def test_reachability_classifies_call_chain_and_scales_to_large_modules(tmp_path):
+    import time
+
+    from layer1.common.reachability import annotate_reachability
+
+    header = [
+        "handler()",
+        "def handler():",
+        "    data = input('x')",
+        "    return run(data)",
+        "def run(value):",
+        "    return eval(value)",
+        "def orphan(value):",
+        "    return eval(value)",
+    ]
+    filler = [line for idx in range(5000) for line in (f"def gen_{idx}(a):", f"    return gen_{idx + 1}(a) + {idx}")]
+    target = tmp_path / "generated.py"
+    target.write_text("\n".join(header + filler) + "\n", encoding="utf-8")
+
+    findings = [
+        Vulnerability(file_path=str(target), cwe_id="CWE-95", severity="CRITICAL", line_number=line, code_snippet="eval(value)")
+        for line in (6, 8)
+    ] + [
+        Vulnerability(file_path=str(target), cwe_id="CWE-95", severity="LOW", line_number=line, code_snippet="x")
+        for line in range(9, 10009, 5)
+    ]
+    call_graphs: dict[str, dict] = {}
+    started = time.perf_counter()
+    annotate_reachability(str(target), findings, call_graphs)
+    elapsed = time.perf_counter() - started
+
+    assert findings[0].reachability_status == "reachable"
+    assert findings[0].metadata["reachability_evidence"]["current_function"] == "run"
+    assert findings[1].reachability_status == "unknown"
+    graph_id = findings[0].metadata["reachability_evidence"]["call_graph_id"]
+    assert all(f.metadata["reachability_evidence"]["call_graph_id"] == graph_id for f in findings)
+    assert call_graphs[str(target)]["call_graph_id"] == graph_id
+    assert set(call_graphs[str(target)]["call_graph"]["<global>"]) == {"handler"}
+    assert elapsed < 5.0
+
+
+def test_project_scan_resolves_reachability_across_modules(tmp_path):
+    from layer1.common import ProjectReachabilityIndex
+
+    pkg = tmp_path / "app"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("", encoding="utf-8")
+    (pkg / "db.py").write_text(
+        "def run_query(sql):\n    return eval(sql)\n\ndef unused(sql):\n    return eval(sql)\n",
+        encoding="utf-8",
+    )
+    (pkg / "views.py").write_text(
+        "from .db import run_query\n\ndef handler():\n    data = input('q')\n    return run_query(data)\n",
+        encoding="utf-8",
+    )
+
+    result = VSHL1Scanner().scan(str(tmp_path))
+    statuses = {
+        r.line_number: r.reachability_status
+        for r in result.vuln_records
+        if r.file_path.endswith("db.py") and r.cwe_id == "CWE-95"
+    }
+    assert statuses[2] == "reachable"
+    assert statuses[5] != "reachable"
+
+    index = ProjectReachabilityIndex(tmp_path)
+    files = sorted(tmp_path.rglob("*.py"))
+    assert index.refresh(files) == 3
+    assert index.reachable_path(str(pkg / "db.py"), 2) == ["app.views:handler", "app.db:run_query"]
+    assert index.refresh(files) == 0
+
+    (pkg / "views.py").write_text("import app.db as db\n\ndef handler():\n    return db.unused(input('q'))\n", encoding="utf-8")
+    assert index.refresh(files) == 1
+    assert index.reachable_path(str(pkg / "db.py"), 2) is None
+    assert index.reachable_path(str(pkg / "db.py"), 5) == ["app.views:handler", "app.db:unused"]
+
+    # mtime/size가 그대로인 수정도 내용 hash로 감지한다.
+    import os
+
+    views = pkg / "views.py"
+    stat = os.stat(views)
+    views.write_text(views.read_text(encoding="utf-8").replace("db.unused", "db.nosuch"), encoding="utf-8")
+    os.utime(views, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(views).st_size == stat.st_size
+    assert index.refresh(files) == 1
+    assert index.reachable_path(str(pkg / "db.py"), 5) is None
+
+
+def test_l1_and_l2_context_share_one_source_unit_per_file(tmp_path, monkeypatch):
+    from layer1.common.schema_normalizer import normalize_scan_result
+    from layer2.reasoning.context_extractor import extract_finding_context
+    from shared import source_unit
+    from shared.source_unit import source_unit_scope
+
+    target = tmp_path / "app.py"
+    target.write_text("import reqeusts\nuser = input('x')\nprint(eval(user))\n", encoding="utf-8")
+    loads = []
+    original_init = source_unit.SourceUnit.__init__
+
+    def counting_init(self, *args, **kwargs):
+        loads.append(args[0])
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(source_unit.SourceUnit, "__init__", counting_init)
+    scanner = VSHL1Scanner(workers=1)
+    with source_unit_scope():
+        result = scanner.annotate(scanner.scan(str(target)))
+        record = next(r for r in normalize_scan_result(result).vuln_records if r.cwe_id == "CWE-95")
+        context = extract_finding_context(record)
+
+    assert context["snippet"] == "print(eval(user))"
+    assert loads == [str(target)]
+
+    # scope가 끝나면 unit을 버리므로 다음 scan은 수정된 파일을 새로 읽는다.
+    target.write_text("print('changed')\n", encoding="utf-8")
+    scanner.scan(str(target))
+    assert len(loads) == 2
+    assert source_unit.load_source_unit(target).lines == ["print('changed')"]
+
+
+def test_source_unit_splits_lines_on_newline_only(tmp_path, monkeypatch):
+    import os
+
+    from layer1.common.pattern_scan import scan_file_with_patterns
+    from layer1.scanner.mock_semgrep_scanner import MockSemgrepScanner
+    from repository import knowledge_repo as knowledge_module
+    from shared import source_unit
+
+    knowledge_path = tmp_path / "knowledge.json"
+    knowledge_path.write_text(json.dumps([{"id": "CWE-95", "pattern": "eval\\(", "severity": "HIGH"}]), encoding="utf-8")
+    monkeypatch.setattr(knowledge_module, "KNOWLEDGE_PATH_OBJ", knowledge_path)
+    target = tmp_path / "app.py"
+    target.write_bytes("import os\r\n\x0c\nuser = input()  # \u2028\x85\neval(user)\n".encode("utf-8"))
+    unit = source_unit.load_source_unit(target)
+
+    assert unit.lines == ["import os", "\x0c", "user = input()  # \u2028\x85", "eval(user)"]
+    assert [unit.joined_text[offset:].split("\n", 1)[0] for offset in unit.line_offsets] == unit.lines
+    assert {f.line_number for f in MockSemgrepScanner(knowledge_module.MockKnowledgeRepo()).scan(str(target)).findings if f.cwe_id == "CWE-95"} == {4}
+    assert {f.line_number for f in scan_file_with_patterns(str(target)) if f.cwe_id == "CWE-95"} == {4}
+
+    # mtime 해상도 안의 같은 크기 수정도 새 내용으로 읽는다.
+    stat = os.stat(target)
+    before = unit.content_hash
+    target.write_bytes(target.read_bytes().replace(b"eval(user)", b"exec(user)"))
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    refreshed = source_unit.load_source_unit(target)
+    assert refreshed.lines[-1] == "exec(user)"
+    assert refreshed.content_hash != before
+
+
+def test_treesitter_scanner_uses_queries_and_incremental_reparse(tmp_path):
+    import json
+
+    from layer1.scanner.treesitter_scanner import TreeSitterScanner
+
+    class StaticKnowledgeRepo:
+        def find_all(self):
+            return json.loads(json.dumps([
+                {"id": "CWE-78", "pattern": "subprocess.run.*shell=True", "severity": "HIGH"},
+                {"id": "CWE-22", "pattern": "open.*user_input", "severity": "HIGH"},
+                {"id": "CWE-798", "pattern": "SECRET_KEY\\s*=\\s*['\"][a-zA-Z0-9]+['\"]", "severity": "HIGH"},
+                {"id": "CWE-000", "pattern": "(unclosed|group", "severity": "LOW"},
+            ]))
+
+        def find_by_id(self, id):
+            return None
+
+    target = tmp_path / "app.py"
+    target.write_text(
+        "import subprocess\nsubprocess.run(cmd, shell=True)\nprint(open(user_input))\nset(SECRET_KEY = 'abc123')\n",
+        encoding="utf-8",
+    )
+    scanner = TreeSitterScanner(StaticKnowledgeRepo())
+    first = scanner.scan(str(target)).findings
+    assert [(f.cwe_id, f.line_number, f.code_snippet) for f in first] == [
+        ("CWE-78", 2, "subprocess.run(cmd, shell=True)"),
+        ("CWE-22", 3, "print(open(user_input))"),
+        ("CWE-22", 3, "open(user_input)"),
+        ("CWE-798", 4, "set(SECRET_KEY = 'abc123')"),
+    ]
+
+    target.write_text(
+        "import subprocess\n\n\nsubprocess.run(cmd, shell=True)\nprint(open(other))\nset(SECRET_KEY = 'abc123')\n",
+        encoding="utf-8",
+    )
+    incremental = scanner.scan(str(target)).findings
+    fresh = TreeSitterScanner(StaticKnowledgeRepo()).scan(str(target)).findings
+    assert [f.model_dump() for f in incremental] == [f.model_dump() for f in fresh]
+    assert [(f.cwe_id, f.line_number) for f in incremental] == [("CWE-78", 4), ("CWE-798", 6)]
+
+    deep = tmp_path / "deep.py"
+    deep.write_text("x = " + "f(" * 3000 + "open(user_input)" + ")" * 3000 + "\n", encoding="utf-8")
+    findings = scanner.scan(str(deep)).findings
+    assert len(findings) == 3001
+
+
+def test_knowledge_rule_index_prefilters_and_invalidates_on_change(tmp_path, monkeypatch):
+    import json
+    import os
+    import re
+
+    from layer1.common.rule_index import get_knowledge_rule_index, required_literal
+    from layer1.scanner.mock_semgrep_scanner import MockSemgrepScanner
+    from repository import knowledge_repo as knowledge_module
+
+    assert required_literal("subprocess.run.*shell=True") == "subprocess"
+    assert required_literal(r"SECRET_KEY\s*=") == "SECRET_KEY"
+    assert required_literal("eval|exec") is None
+    assert required_literal("(?i)select") is None
+
+    knowledge_path = tmp_path / "knowledge.json"
+    rules = [
+        {"id": "CWE-78", "pattern": "subprocess.run.*shell=True", "severity": "HIGH"},
+        {"id": "CWE-22", "pattern": "open.*user_input", "severity": "HIGH"},
+    ]
+    knowledge_path.write_text(json.dumps(rules), encoding="utf-8")
+    monkeypatch.setattr(knowledge_module, "KNOWLEDGE_PATH_OBJ", knowledge_path)
+    repo = knowledge_module.MockKnowledgeRepo()
+
+    target = tmp_path / "app.py"
+    source_lines = ["import subprocess", "subprocess.run(cmd, shell=True)", "x = 1", "data = open(user_input).read()"] * 50
+    target.write_text("\n".join(source_lines) + "\n", encoding="utf-8")
+
+    index = get_knowledge_rule_index(repo)
+    assert list(index.candidate_lines(source_lines)) == [i for i, line in enumerate(source_lines) if i % 4 != 2]
+    expected = [
+        (rule["id"], idx + 1) for idx, line in enumerate(source_lines) for rule in rules if re.search(rule["pattern"], line)
+    ]
+    found = MockSemgrepScanner(repo).scan(str(target)).findings
+    assert [(f.cwe_id, f.line_number) for f in found] == expected
+
+    calls = []
+    original_find_all = repo.find_all
+    monkeypatch.setattr(repo, "find_all", lambda: calls.append(1) or original_find_all())
+    assert get_knowledge_rule_index(repo) is index
+    assert calls == []
+
+    knowledge_path.write_text(json.dumps(rules[:1]), encoding="utf-8")
+    os.utime(knowledge_path, ns=(1, 1))
+    refreshed = get_knowledge_rule_index(repo)
+    assert refreshed is not index
+    assert [rule.knowledge["id"] for rule in refreshed.rules] == ["CWE-78"]
+
+
+def test_typosquatting_index_matches_brute_force_and_loads_corpus(tmp_path, monkeypatch):
+    import random
+    import string
+
+    from layer1.common import import_risk
+    from layer1.common.top_packages import TopPackageIndex
+
+    rng = random.Random(11)
+    corpus = {"".join(rng.choice(string.ascii_lowercase + "-_") for _ in range(rng.randint(3, 12))) for _ in range(400)}
+    corpus |= {"requests", "django", "numpy"}
+    index = TopPackageIndex(
+        corpus,
+        import_risk._normalize_name,
+        import_risk._score_typosquatting,
+        import_risk._candidate_bonus,
+        import_risk.TYPOSQUATTING_THRESHOLD,
+        import_risk.AFFIX_BONUS,
+    )
+    normalized = {import_risk._normalize_name(name) for name in corpus}
+
+    def brute_force(candidate):
+        if import_risk._normalize_name(candidate) in normalized:
+            return None
+        scores = [import_risk._score_typosquatting(candidate, name)[0] for name in corpus]
+        best = max(scores)
+        return round(best, 9) if best >= import_risk.TYPOSQUATTING_THRESHOLD else None
+
+    queries = ["reqeusts", "djang0", "numpyy", "securerequests", "zzzzzz"]
+    for name in sorted(corpus)[:60]:
+        position = rng.randrange(len(name))
+        queries.append(name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1:])
+    for query in queries:
+        verdict = index.best_match(query)
+        assert (round(verdict[1], 9) if verdict else None) == brute_force(query), query
+    hits = index.best_match.cache_info().hits
+    assert index.best_match("reqeusts")[0] == "requests"
+    assert index.best_match.cache_info().hits == hits + 1
+
+    corpus_dir = tmp_path / "top_packages"
+    corpus_dir.mkdir()
+    (corpus_dir / "pypi.txt").write_text("# name,downloads\nfastjsonschema,100\n", encoding="utf-8")
+    monkeypatch.setenv("VSH_TOP_PACKAGES_DIR", str(corpus_dir))
+    sample = tmp_path / "app.py"
+    sample.write_text("import fastjsonschemas\nimport requests\n", encoding="utf-8")
+    findings = import_risk.detect_typosquatting_findings(str(sample))
+    assert [(f.line_number, f.metadata["similar_to"]) for f in findings] == [(1, "fastjsonschema")]
+
+
+def test_sbom_scanner_parses_lockfiles_and_caches_by_content(tmp_path):
+    project = tmp_path / "lockproj"
+    project.mkdir()
+    (project / "package-lock.json").write_text(json.dumps({
+        "name": "lockproj",
+        "lockfileVersion": 3,
+        "packages": {
+            "": {"name": "lockproj", "version": "1.0.0", "dependencies": {"lodash": "^4.17.0"}},
+            "node_modules/lodash": {"version": "4.17.15", "resolved": "https://registry/lodash"},
+            "node_modules/@scope/pkg": {"version": "2.0.0"},
+            "node_modules/a/node_modules/lodash": {"version": "3.10.1"},
+        },
+    }, indent=2), encoding="utf-8")
+    (project / "yarn.lock").write_text(
+        '# yarn lockfile v1\n\n"@babel/core@^7.0.0", "@babel/core@^7.1.0":\n  version "7.1.0"\n  resolved "x"\n\n'
+        'minimist@^1.2.0:\n  version "1.2.5"\n',
+        encoding="utf-8",
+    )
+    (project / "pnpm-lock.yaml").write_text(
+        "lockfileVersion: '6.0'\n\npackages:\n\n  /axios@0.21.0:\n    resolution: {integrity: sha512}\n"
+        "  /@types/node@18.0.0(peer@1.0.0):\n    dev: true\n",
+        encoding="utf-8",
+    )
+
+    from layer1.common.manifest_parsers import PARSED_MANIFESTS
+    from layer1.scanner.sbom_scanner import SBOMScanner
+
+    PARSED_MANIFESTS.clear()
+    scanner = SBOMScanner()
+    packages = {
+        name: {(pkg, ver) for _, pkg, ver, _ in scanner._extract_packages(project / name)}
+        for name in ["package-lock.json", "yarn.lock", "pnpm-lock.yaml"]
+    }
+    assert packages["package-lock.json"] == {("lodash", "4.17.15"), ("@scope/pkg", "2.0.0"), ("lodash", "3.10.1")}
+    assert packages["yarn.lock"] == {("@babel/core", "7.1.0"), ("minimist", "1.2.5")}
+    assert packages["pnpm-lock.yaml"] == {("axios", "0.21.0"), ("@types/node", "18.0.0")}
+
+    lodash_line = next(line for line, pkg, ver, _ in scanner._extract_packages(project / "package-lock.json") if ver == "4.17.15")
+    assert '"4.17.15"' in (project / "package-lock.json").read_text(encoding="utf-8").splitlines()[lodash_line - 1]
+
+    parses = PARSED_MANIFESTS.parses
+    scanner.scan(str(project))
+    scanner.scan(str(project))
+    # lockfile 세 개는 이미 parse 되었으므로 반복 scan에서 다시 parse하지 않는다.
+    assert PARSED_MANIFESTS.parses == parses
+
+
+def test_package_lock_v2_reports_each_package_once(tmp_path):
+    from layer1.common.manifest_parsers import parse_package_lock
+
+    packages = {
+        "": {"name": "app", "version": "1.0.0"},
+        "node_modules/lodash": {"version": "4.17.15"},
+        "node_modules/a": {"version": "1.0.0"},
+        "node_modules/a/node_modules/lodash": {"version": "3.10.1"},
+    }
+    dependencies = {
+        "lodash": {"version": "4.17.15"},
+        "a": {"version": "1.0.0", "dependencies": {"lodash": {"version": "3.10.1"}}},
+    }
+    expected = [("lodash", "4.17.15"), ("a", "1.0.0"), ("lodash", "3.10.1")]
+
+    v2 = tmp_path / "v2" / "package-lock.json"
+    v2.parent.mkdir()
+    v2.write_text(json.dumps({"lockfileVersion": 2, "packages": packages, "dependencies": dependencies}, indent=2), encoding="utf-8")
+    assert [(name, version) for _, name, version, _ in parse_package_lock(v2)] == expected
+
+    reordered = tmp_path / "reordered" / "package-lock.json"
+    reordered.parent.mkdir()
+    reordered.write_text(json.dumps({"lockfileVersion": 2, "dependencies": dependencies, "packages": packages}, indent=2), encoding="utf-8")
+    assert sorted((name, version) for _, name, version, _ in parse_package_lock(reordered)) == sorted(expected)
+
+    v1 = tmp_path / "v1" / "package-lock.json"
+    v1.parent.mkdir()
+    v1.write_text(json.dumps({"lockfileVersion": 1, "dependencies": dependencies}, indent=2), encoding="utf-8")
+    assert [(name, version) for _, name, version, _ in parse_package_lock(v1)] == expected
+
+
+def test_finding_deduplicator_incremental_matches_pairwise_merge():
+    from shared.finding_dedup import FindingDeduplicator
+
+    severities = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+    statuses = [None, "unknown", "unreachable", "reachable"]
+    findings = [
+        Vulnerability(
+            file_path=f"f{idx % 3}.py",
+            rule_id=None if idx % 4 else f"R{idx}",
+            cwe_id="CWE-78",
+            severity=severities[idx * 7 % 4],
+            line_number=idx % 5,
+            code_snippet="x" * (idx * 13 % 17),
+            reachability_status=statuses[idx * 3 % 4],
+            references=[f"REF-{idx % 6}"],
+            metadata={f"k{idx % 4}": idx},
+        )
+        for idx in range(200)
+    ]
+    originals = [finding.model_dump() for finding in findings]
+
+    # 기존 구현과 같은 pairwise 병합 기준 결과
+    expected: dict[tuple, dict] = {}
+    for finding in findings:
+        key = (finding.file_path, finding.cwe_id, finding.line_number)
+        base = expected.get(key)
+        if base is None:
+            expected[key] = finding.model_dump()
+            continue
+        rank = {s: i for i, s in enumerate(severities)}
+        reach = {s: i for i, s in enumerate(statuses)}
+        base["rule_id"] = base["rule_id"] or finding.rule_id
+        if rank[base["severity"]] < rank[finding.severity]:
+            base["severity"] = finding.severity
+        if len(base["code_snippet"]) < len(finding.code_snippet):
+            base["code_snippet"] = finding.code_snippet
+        if reach[base["reachability_status"]] < reach[finding.reachability_status]:
+            base["reachability_status"] = finding.reachability_status
+        base["references"] = list(dict.fromkeys([*base["references"], *finding.references]))
+        for k, v in finding.metadata.items():
+            base["metadata"].setdefault(k, v)
+
+    dedup = FindingDeduplicator()
+    for start in range(0, len(findings), 37):
+        dedup.extend(findings[start:start + 37])
+    assert [f.model_dump() for f in dedup.results()] == list(expected.values())
+    assert [f.model_dump() for f in deduplicate_findings(findings)] == list(expected.values())
+    # 입력 finding은 병합 중에 변경되지 않는다.
+    assert [finding.model_dump() for finding in findings] == originals
+
+
+def test_scan_findings_share_rule_metadata_and_call_graph_by_id(tmp_path):
+    from layer1.common import L1FindingsCache, annotate_reachability
+    from layer1.common.pattern_scan import scan_file_with_patterns, scan_pattern_findings
+    from models.scan_finding import ScanFinding
+    from shared.finding_dedup import FindingDeduplicator
+
+    sample = tmp_path / "app.py"
+    sample.write_text(
+        "import os\n\ndef handler():\n    cmd = input('cmd')\n" + "    os.system(cmd)\n" * 50,
+        encoding="utf-8",
+    )
+    compact = scan_pattern_findings(str(sample))
+    assert len(compact) == 50
+    # rule 단위 metadata/references는 finding마다 복사하지 않는다.
+    assert len({id(f.metadata) for f in compact}) == 1
+    assert len({id(f.references) for f in compact}) == 1
+
+    promoted = FindingDeduplicator(compact).results()
+    assert [f.model_dump() for f in promoted] == [f.model_dump() for f in scan_file_with_patterns(str(sample))]
+
+    # reachability는 ScanFinding 그대로 채우고, rule 단위 공유 metadata는 건드리지 않는다.
+    shared_metadata = compact[0].metadata
+    call_graphs: dict[str, dict] = {}
+    annotate_reachability(str(sample), compact, call_graphs)
+    assert all(isinstance(f, ScanFinding) for f in compact)
+    assert "reachability_evidence" not in shared_metadata
+    graph_ids = {f.metadata["reachability_evidence"]["call_graph_id"] for f in compact}
+    assert len(graph_ids) == 1
+    assert all("call_graph" not in f.metadata["reachability_evidence"] for f in compact)
+    assert call_graphs[str(sample)]["call_graph_id"] in graph_ids
+
+    # worker process와 findings cache hit에서도 call graph evidence가 ScanResult에 파일당 한 번 실린다.
+    (tmp_path / "other.py").write_text("def run(value):\n    return eval(value)\n", encoding="utf-8")
+    cache = L1FindingsCache(tmp_path / "cache", ttl_hours=1)
+    for _ in range(2):
+        result = VSHL1Scanner(workers=2, findings_cache=cache).scan(str(tmp_path))
+        assert set(result.call_graphs) == {str(sample), str(tmp_path / "other.py")}
+        assert result.call_graphs[str(sample)]["source_functions"] == ["handler"]
+        for finding in result.findings:
+            evidence = finding.metadata.get("reachability_evidence")
+            if evidence:
+                assert evidence["call_graph_id"] == result.call_graphs[finding.file_path]["call_graph_id"]
+    assert "l1_cache_hits=2" in result.notes
+
+
+def test_streaming_annotations_match_insert_order_and_render_lazily(tmp_path, monkeypatch):
+    import layer1.common.code_annotator as code_annotator
+
+    first = tmp_path / "pkg" / "a.py"
+    first.parent.mkdir()
+    first.write_text("def f():\n    eval(x)\n    os.system(y)\n", encoding="utf-8")
+    second = tmp_path / "b.py"
+    second.write_text("print(1)\n", encoding="utf-8")
+    findings = [
+        Vulnerability(file_path=str(first), rule_id="R2", cwe_id="CWE-95", severity="HIGH", line_number=2, code_snippet="eval(x)"),
+        Vulnerability(file_path=str(first), rule_id="R1", cwe_id="CWE-78", severity="HIGH", line_number=2, code_snippet="eval(x)"),
+        Vulnerability(file_path=str(first), rule_id="R1", cwe_id="CWE-78", severity="LOW", line_number=2, code_snippet="dup"),
+        Vulnerability(file_path=str(first), rule_id="R3", cwe_id="CWE-78", severity="LOW", line_number=3, code_snippet="os.system(y)"),
+        Vulnerability(file_path=str(first), rule_id="R4", cwe_id="CWE-78", severity="LOW", line_number=99, code_snippet="out of range"),
+        Vulnerability(file_path=str(second), rule_id="R5", cwe_id="CWE-95", severity="LOW", line_number=1, code_snippet="print(1)"),
+    ]
+
+    # 기존 구현(역순 정렬 + list.insert)과 같은 결과
+    lines = first.read_text(encoding="utf-8").splitlines(keepends=True)
+    seen = set()
+    for f in sorted(findings[:5], key=lambda x: (x.line_number, x.cwe_id, x.rule_id or ""), reverse=True):
+        key = (f.line_number, f.cwe_id, f.rule_id)
+        if key in seen or not 1 <= f.line_number <= len(lines):
+            continue
+        seen.add(key)
+        indent = lines[f.line_number - 1][: len(lines[f.line_number - 1]) - len(lines[f.line_number - 1].lstrip())]
+        lines.insert(f.line_number - 1, "\n".join(indent + l for l in code_annotator._build_annotation(f, "#").split("\n")) + "\n")
+    expected = "".join(lines)
+
+    rendered = []
+    original = code_annotator.iter_annotated_lines
+    monkeypatch.setattr(code_annotator, "iter_annotated_lines", lambda path, group: rendered.append(path) or original(path, group))
+    annotations = code_annotator.LazyAnnotations(findings)
+    assert sorted(annotations) == sorted([str(first), str(second)])
+    assert rendered == []
+    assert annotations.preview(str(first)) == expected
+    assert rendered == [str(first)]
+
+    outputs = annotations.write(tmp_path / "out", base_dir=tmp_path)
+    assert outputs[str(first)] == str(tmp_path / "out" / "pkg" / "a.py")
+    assert (tmp_path / "out" / "pkg" / "a.py").read_text(encoding="utf-8") == expected
+    assert code_annotator.annotate_files(findings)[str(first)] == expected
+
+
+def test_in_place_annotation_keeps_permissions_and_symlinks(tmp_path):
+    import os
+    import stat
+
+    from layer1.common.code_annotator import LazyAnnotations
+
+    script = tmp_path / "tool.py"
+    script.write_text("#!/usr/bin/env python\neval(x)\n", encoding="utf-8")
+    script.chmod(0o755)
+    link = tmp_path / "link.py"
+    link.symlink_to(script)
+    finding = dict(rule_id="R1", cwe_id="CWE-95", severity="HIGH", line_number=2, code_snippet="eval(x)")
+
+    LazyAnnotations([Vulnerability(file_path=str(link), **finding)]).write()
+
+    assert link.is_symlink() and os.readlink(link) == str(script)
+    assert "[VSH-L1]" in script.read_text(encoding="utf-8")
+    assert stat.S_IMODE(script.stat().st_mode) == 0o755
+    assert not list(tmp_path.glob("*.vsh-tmp"))
@@ -318,3 +318,285 @@ def test_chroma_retriever_uses_exact_metadata_before_query_embeddings():
     assert len(docs) == 2
     assert docs[0]["source"] == "KISA"
     assert docs[1]["source"] == "OWASP"
+
+
+def test_chroma_retriever_batches_unique_queries_and_caches_results():
+    class CountingCollection:
+        def __init__(self):
+            self.gets = []
+            self.queries = []
+
+        def count(self):
+            return 3
+
+        def get(self, where=None, limit=10, include=None):
+            self.gets.append(where)
+            if where == {"cwe": {"$eq": "CWE-89"}}:
+                return {"documents": ["SQL 바인딩 가이드"], "metadatas": [{"source": "KISA", "cwe": "CWE-89", "kisa_article": "SQL 삽입"}]}
+            return {"documents": [], "metadatas": []}
+
+        def query(self, query_texts, n_results, where=None, include=None):
+            self.queries.append(list(query_texts))
+            return {
+                "documents": [["Injection 가이드"] for _ in query_texts],
+                "metadatas": [[{"source": "OWASP", "cwe": "", "owasp_id": "A03:2021"}] for _ in query_texts],
+            }
+
+    collection = CountingCollection()
+    retriever = ChromaRetriever.__new__(ChromaRetriever)
+    retriever._ready = True
+    retriever._collection = collection
+
+    queries = [
+        ("CWE-89", "cursor.execute(query % user_input)"),
+        ("CWE-89", "cursor.execute(query  %   user_input)\n"),
+        ("CWE-79", "element.innerHTML = value"),
+    ]
+    first = retriever.query_related_many(queries, n_results=2)
+
+    assert len(collection.gets) == 2
+    assert len(collection.queries) == 1 and len(collection.queries[0]) == 2
+    assert first[0] == first[1]
+    assert [doc["source"] for doc in first[0]] == ["KISA", "OWASP"]
+    assert [doc["source"] for doc in first[2]] == ["OWASP"]
+
+    first[0][0]["source"] = "MUTATED"
+    assert retriever.query_related("CWE-89", "cursor.execute(query % user_input)", n_results=2)[0]["source"] == "KISA"
+    assert retriever.query_related_many(queries, n_results=2) == retriever.query_related_many(queries, n_results=2)
+    assert len(collection.gets) == 2 and len(collection.queries) == 1
+
+
+def test_chroma_static_index_matches_full_collection_ranking():
+    import random
+
+    rng = random.Random(3)
+    words = ["sql", "injection", "binding", "query", "path", "traversal", "xss", "escape", "eval", "pickle", "cursor.execute"]
+    metas = []
+    for idx in range(80):
+        meta = {"source": rng.choice(["KISA", "FSI", "OWASP", "NVD", "ETC"])}
+        cwe = rng.choice(["CWE-89", "CWE-79", "CWE-22", "", None])
+        if cwe is not None:
+            meta["cwe"] = cwe
+        if rng.random() < 0.7:
+            meta[rng.choice(["title", "source_id", "cve_id"])] = f"doc-{idx}"
+        metas.append(meta)
+    documents = [" ".join(rng.sample(words, 3)) + f" chunk{idx}" for idx in range(80)]
+
+    class StaticCollection:
+        def __init__(self):
+            self.full_gets = 0
+
+        def count(self):
+            return len(documents)
+
+        def get(self, where=None, limit=10, offset=0, include=None):
+            if where is None:
+                self.full_gets += 1
+                return {"documents": documents[offset:offset + limit], "metadatas": metas[offset:offset + limit]}
+            cwe = where["cwe"]["$eq"]
+            picked = [i for i, meta in enumerate(metas) if meta.get("cwe") == cwe][:limit]
+            return {"documents": [documents[i] for i in picked], "metadatas": [metas[i] for i in picked]}
+
+        def query(self, *args, **kwargs):
+            raise RuntimeError("embedding unavailable")
+
+    collection = StaticCollection()
+    retriever = ChromaRetriever.__new__(ChromaRetriever)
+    retriever._ready = True
+    retriever._collection = collection
+
+    for cwe_id, snippet in [("CWE-89", "cursor.execute(sql)"), ("CWE-22", "open(path)"), ("CWE-502", "pickle.loads(x)")]:
+        query_text = ChromaRetriever._build_query_text(cwe_id, snippet)
+        exact = ChromaRetriever._rank_static_results(
+            retriever._get_collection({"cwe": {"$eq": cwe_id}}, 50, cwe_id), query_text, cwe_id
+        )
+        full = ChromaRetriever._rank_static_results(ChromaRetriever._parse_raw(documents, metas, cwe_id), query_text, cwe_id)
+        expected = ChromaRetriever._merge_ranked_results(exact, full, cwe_id, 25)
+
+        assert len(exact) < 25
+        assert retriever.query_related(cwe_id, snippet, n_results=25) == expected
+
+    assert collection.full_gets == 1
+    assert len(retriever._static_index()) == 80
+
+
+def test_chroma_retriever_defers_client_until_first_query(monkeypatch, tmp_path):
+    import layer2.retriever.chroma_retriever as chroma_module
+    from layer2.retriever.chroma_retriever import get_shared_chroma_retriever
+
+    inits = []
+
+    def fake_init(self):
+        inits.append(self)
+        self._collection = object()
+
+    monkeypatch.setattr(chroma_module, "_CHROMA_OK", True)
+    monkeypatch.setattr(ChromaRetriever, "_init", fake_init)
+
+    retriever = ChromaRetriever(db_dir=tmp_path)
+    evidence = EvidenceRetriever(chroma_retriever=retriever)
+    clean = ScanResult(file_path="clean.py", language="python", findings=[])
+
+    assert evidence.retrieve(clean, knowledge=[], fix_hints=[]) == {}
+    assert evidence.runtime_status()["status"] == "STANDBY"
+    assert inits == []
+
+    assert retriever.ready
+    assert retriever.status == "READY"
+    assert inits == [retriever]
+    assert retriever.ready and inits == [retriever]
+
+    shared = get_shared_chroma_retriever(db_dir=tmp_path)
+    assert get_shared_chroma_retriever(db_dir=tmp_path) is shared
+    shared.warm_up(background=True).join()
+    assert shared.status == "READY"
+
+
+def test_chroma_retriever_reuses_persisted_query_embeddings(tmp_path):
+    class CountingEmbedding:
+        MODEL_NAME = "fake-mini"
+
+        def __init__(self):
+            self.calls = []
+
+        def __call__(self, texts):
+            self.calls.append(list(texts))
+            return [[float(len(text)), float(idx), 0.5] for idx, text in enumerate(texts)]
+
+    class EmbeddingCollection:
+        def __init__(self):
+            self.kwargs = []
+
+        def count(self):
+            return 1
+
+        def get(self, where=None, limit=10, include=None):
+            return {"documents": [], "metadatas": []}
+
+        def query(self, **kwargs):
+            self.kwargs.append(kwargs)
+            rows = len(kwargs.get("query_embeddings") or kwargs.get("query_texts"))
+            return {"documents": [["가이드"]] * rows, "metadatas": [[{"source": "KISA", "cwe": "CWE-89"}]] * rows}
+
+    def build(ef):
+        retriever = ChromaRetriever.__new__(ChromaRetriever)
+        retriever._ready = True
+        retriever._collection = EmbeddingCollection()
+        retriever._cache_dir = tmp_path
+        retriever._embedding_function = ef
+        return retriever
+
+    queries = [("CWE-89", "cursor.execute(q)"), ("CWE-79", "el.innerHTML = v")]
+    first_ef = CountingEmbedding()
+    first = build(first_ef)
+    first.query_related_many(queries, n_results=1)
+
+    assert len(first_ef.calls) == 1 and len(first_ef.calls[0]) == 2
+    sent = first._collection.kwargs[0]
+    assert "query_texts" not in sent and len(sent["query_embeddings"]) == 2
+
+    second_ef = CountingEmbedding()
+    second = build(second_ef)
+    second.query_related_many(queries + [("CWE-22", "open(p)")], n_results=1)
+
+    assert second_ef.calls == [[ChromaRetriever._build_query_text("CWE-22", "open(p)")]]
+    resent = second._collection.kwargs[0]["query_embeddings"]
+    assert resent[:2] == sent["query_embeddings"]
+    assert len(second._embedding_cache) == 3
+
+
+def test_embedding_cache_cold_writer_never_discards_other_writers_rows(tmp_path):
+    from layer2.retriever.embedding_cache import EmbeddingCache
+
+    first = EmbeddingCache("fake-mini", cache_dir=tmp_path)
+    cold = EmbeddingCache("fake-mini", cache_dir=tmp_path)
+    with cold._lock:
+        cold._refresh()
+
+    first.put_many(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    # 다른 process가 쓰기 전에 읽어 둔 빈 view로 추가하는 경우
+    with cold._lock:
+        cold._index_size = first._index_path.stat().st_size
+    cold.put_many(["c"], [[0.5, 0.5]])
+
+    found = EmbeddingCache("fake-mini", cache_dir=tmp_path).get_many(["a", "b", "c"])
+    assert [vector.tolist() for vector in found] == [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]]
+
+
+def test_local_vector_retriever_is_a_drop_in_backend(tmp_path):
+    from layer2.retriever.vector_retriever import HashingEmbeddingFunction, LocalVectorRetriever, NumpyVectorCollection
+
+    retriever = LocalVectorRetriever(embedding_function=HashingEmbeddingFunction(), cache_dir=tmp_path)
+    assert retriever.status == "STANDBY"
+
+    docs = retriever.query_related("CWE-89", "cursor.execute(query % user_input)", n_results=2)
+    assert retriever.status == "READY"
+    assert docs and all(doc["cwe"] == "CWE-89" for doc in docs)
+    assert retriever.query_by_source("CWE-89", "cursor.execute(q)", source="KISA", n_results=1)[0]["source"] == "KISA"
+
+    batched = retriever.query_related_many([("CWE-999", "eval(user_input)"), ("CWE-998", "os.system(cmd)")], n_results=3)
+    assert [len(result) for result in batched] == [3, 3]
+
+    collection = retriever._collection
+    texts = ["sql injection cursor execute", "command injection os system", "hardcoded password secret"]
+    embeddings = HashingEmbeddingFunction()(texts)
+    batch = collection.query(query_embeddings=embeddings, n_results=4)
+    assert batch["ids"] == [collection.query(query_embeddings=[vector], n_results=4)["ids"][0] for vector in embeddings]
+
+    hnsw = NumpyVectorCollection(collection.ids, collection.documents, collection.metadatas, collection.matrix, hnsw_min_docs=1)
+    assert hnsw.backend in {"hnsw", "brute-force"}
+    approx = hnsw.query(query_embeddings=embeddings, n_results=4)
+    # 한국어 문서와 영어 query는 동점이 많아 id 순서 대신 거리로 비교한다.
+    assert [[round(d, 4) for d in row] for row in approx["distances"]] == [[round(d, 4) for d in row] for row in batch["distances"]]
+
+    warm = LocalVectorRetriever(embedding_function=HashingEmbeddingFunction(), cache_dir=tmp_path)
+    assert warm.ready and len(warm._embedding_cache) >= len(collection.ids)
+
+
+def test_auto_backend_falls_back_to_local_when_chroma_init_fails(monkeypatch, tmp_path):
+    import layer2.retriever.chroma_retriever as chroma_module
+    import layer2.retriever.evidence_retriever as evidence_module
+    from layer2.retriever.vector_retriever import HashingEmbeddingFunction, LocalVectorRetriever
+
+    def failing_init(self):
+        self._last_error = "Collection vsh_kisa_guide does not exist."
+        self._ready = False
+
+    monkeypatch.setenv("VSH_RETRIEVER_BACKEND", "auto")
+    monkeypatch.setattr(chroma_module, "_CHROMA_OK", True)
+    monkeypatch.setattr(ChromaRetriever, "_init", failing_init)
+    monkeypatch.setattr(evidence_module, "get_shared_chroma_retriever", lambda: ChromaRetriever(db_dir=tmp_path))
+    local = LocalVectorRetriever(embedding_function=HashingEmbeddingFunction(), cache_dir=tmp_path)
+    monkeypatch.setattr(evidence_module, "local_retriever", lambda: local)
+
+    finding = Vulnerability(
+        file_path="app.py", cwe_id="CWE-89", severity="HIGH", line_number=1, code_snippet="cursor.execute(query % user_input)"
+    )
+    scan = ScanResult(file_path="app.py", language="python", findings=[finding])
+
+    evidence = EvidenceRetriever()
+    assert isinstance(evidence.chroma_retriever, ChromaRetriever)
+    evidence_map = evidence.retrieve(scan, knowledge=[], fix_hints=[])
+    assert evidence.chroma_retriever is local
+    assert evidence.runtime_status()["status"] == "READY"
+    assert evidence.runtime_status()["backend"] == "local"
+    assert evidence._query_chroma_many([("CWE-89", finding.code_snippet)])[0]
+    # local backend가 답한 근거를 Chroma 결과로 표시하지 않는다.
+    context = next(iter(evidence_map.values()))
+    assert context["vector_backend"] == "local"
+    assert context["retrieval_backend"] == "local_only"
+    assert context["chroma_status"] == "INIT_FAILED"
+
+    # fallback은 embedding model을 내려받지 않는다. cache에 ONNX model이 없으면 hashing embedding을 쓴다.
+    from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+    monkeypatch.setattr(ONNXMiniLM_L6_V2, "DOWNLOAD_PATH", tmp_path / "onnx_models" / ONNXMiniLM_L6_V2.MODEL_NAME)
+    monkeypatch.setattr(ChromaRetriever, "_configure_embedding_cache", lambda self: None)
+    fallback = LocalVectorRetriever(cache_dir=tmp_path)
+    assert fallback.ready
+    assert isinstance(fallback._embedding_function, HashingEmbeddingFunction)
+    assert not (tmp_path / "onnx_models").exists()
+
+    pinned = EvidenceRetriever(chroma_retriever=ChromaRetriever(db_dir=tmp_path))
+    pinned.retrieve(scan, knowledge=[], fix_hints=[])
+    assert pinned.runtime_status()["status"] == "INIT_FAILED"
@@ -58,3 +58,161 @@ def test_osv_verifier_marks_safe_dependency_as_not_found():
 
     assert result["osv_status"] == "NOT_FOUND"
     assert "2.31.0" in (result["osv_summary"] or "")
+
+
+def test_verify_many_resolves_each_package_once_and_fans_out():
+    import threading
+
+    from layer2.verifier.providers import OnlineOsvProvider, OnlineRegistryProvider
+
+    class CountingRegistry(OnlineRegistryProvider):
+        def __init__(self):
+            self.calls = []
+            self.threads = set()
+
+        def verify_package(self, ecosystem, package_name, version):
+            self.calls.append((ecosystem, package_name, version))
+            self.threads.add(threading.get_ident())
+            if package_name == "broken":
+                raise RuntimeError("registry down")
+            return {"registry_status": "FOUND", "registry_summary": f"{package_name}=={version}"}
+
+    class CountingOsv(OnlineOsvProvider):
+        def __init__(self):
+            self.calls = []
+
+        def query_package(self, package_name, package_version):
+            self.calls.append((package_name, package_version))
+            return {"osv_status": "NOT_FOUND", "osv_summary": package_name}
+
+    def dep(path, line, snippet):
+        return Vulnerability(file_path=path, cwe_id="CWE-829", severity="HIGH", line_number=line, code_snippet=snippet)
+
+    findings = [
+        dep("a/requirements.txt", 1, "requests==2.9.0"),
+        dep("b/requirements.txt", 3, "requests==2.9.0"),
+        dep("a/requirements.txt", 2, "broken==1.0"),
+        Vulnerability(file_path="app.py", cwe_id="CWE-95", severity="HIGH", line_number=1, code_snippet="eval(x)"),
+        dep("c/requirements.txt", 1, "flask==1.0"),
+    ]
+    registry = CountingRegistry()
+    osv = CountingOsv()
+
+    registry_results = RegistryVerifier(provider=registry).verify_many(findings)
+    osv_results = OsvVerifier(provider=osv).verify_many(findings)
+
+    assert sorted(registry.calls) == [("PyPI", "broken", "1.0"), ("PyPI", "flask", "1.0"), ("PyPI", "requests", "2.9.0")]
+    assert len(osv.calls) == 3
+    assert registry_results[0] == registry_results[1] == {"registry_status": "FOUND", "registry_summary": "requests==2.9.0"}
+    assert registry_results[0] is not registry_results[1]
+    assert registry_results[2] == {"registry_status": "ERROR", "registry_summary": "registry down"}
+    assert registry_results[3] == {} and osv_results[3] == {}
+    assert osv_results[4]["osv_mode"] == "online-opt-in"
+    assert [RegistryVerifier().verify(f) for f in findings[:2]] == RegistryVerifier().verify_many(findings[:2])
+
+
+def test_local_osv_provider_answers_from_ingested_zip_dump(tmp_path):
+    import json
+    import zipfile
+
+    from layer2.verifier.providers import LocalOsvProvider, OsvMirror
+
+    advisories = [
+        {
+            "id": "GHSA-aaaa",
+            "aliases": ["CVE-2018-18074"],
+            "database_specific": {"severity": "HIGH"},
+            "affected": [
+                {
+                    "package": {"ecosystem": "PyPI", "name": "Requests"},
+                    "ranges": [{"type": "ECOSYSTEM", "events": [{"introduced": "0"}, {"fixed": "2.20.0"}]}],
+                },
+            ],
+        },
+        {
+            "id": "PYSEC-bbbb",
+            "affected": [
+                {
+                    "package": {"ecosystem": "PyPI", "name": "requests"},
+                    "ranges": [
+                        {"type": "GIT", "events": [{"introduced": "abc"}]},
+                        {"type": "ECOSYSTEM", "events": [{"introduced": "2.30.0"}, {"last_affected": "2.31.0"}]},
+                    ],
+                    "versions": ["1.0.0-legacy"],
+                },
+            ],
+        },
+        {"id": "GHSA-gone", "withdrawn": "2024-01-01T00:00:00Z", "affected": [{"package": {"ecosystem": "PyPI", "name": "flask"}, "versions": ["1.0"]}]},
+    ]
+    dump = tmp_path / "all.zip"
+    with zipfile.ZipFile(dump, "w") as archive:
+        for advisory in advisories:
+            archive.writestr(f"{advisory['id']}.json", json.dumps(advisory))
+
+    mirror = OsvMirror(tmp_path / "osv.db")
+    assert mirror.ingest_zip(dump) == 3
+    assert mirror.ingest_zip(dump) == 0
+    assert mirror.ecosystems() == frozenset({"PyPI"})
+
+    provider = LocalOsvProvider(mirror)
+    found = provider.query("PyPI", "requests", "2.9.0")
+    assert found["osv_status"] == "FOUND"
+    assert "GHSA-aaaa (CVE-2018-18074)" in found["osv_summary"]
+    assert mirror.advisory_ids("PyPI", "requests", "2.31.0") == ["PYSEC-bbbb"]
+    assert mirror.advisory_ids("PyPI", "requests", "1.0.0-legacy") == ["PYSEC-bbbb"]
+    assert provider.query("PyPI", "requests", "2.31.1")["osv_status"] == "NOT_FOUND"
+    assert provider.query("PyPI", "flask", "1.0")["osv_status"] == "NOT_FOUND"
+    assert provider.query("PyPI", "requests", None)["osv_status"] == "UNKNOWN"
+    assert provider.query("npm", "lodash", "4.17.0")["osv_status"] == "UNKNOWN"
+
+    finding = Vulnerability(file_path="requirements.txt", cwe_id="CWE-829", severity="HIGH", line_number=1, code_snippet="requests==2.9.0")
+    result = OsvVerifier(provider=provider).verify(finding)
+    assert result["osv_status"] == "FOUND" and result["osv_mode"] == "offline-mirror"
+
+    # ingest 도중 실패하면 transaction 전체가 rollback되어 기존 mirror가 그대로 남는다.
+    def broken_feed():
+        yield {"id": "GHSA-half", "affected": [{"package": {"ecosystem": "npm", "name": "lodash"}, "versions": ["4.17.0"]}]}
+        raise OSError("truncated dump")
+
+    try:
+        mirror.ingest(broken_feed(), source="broken")
+    except OSError:
+        pass
+    assert mirror.ecosystems() == frozenset({"PyPI"})
+    assert mirror.advisory_ids("npm", "lodash", "4.17.0") == []
+    assert mirror.advisory_ids("PyPI", "requests", "2.31.0") == ["PYSEC-bbbb"]
+    mirror.close()
+
+
+def test_real_sbom_provider_uses_mirror_only_for_ingested_ecosystems(tmp_path, monkeypatch):
+    import asyncio
+
+    from l3.providers.sbom import real
+    from layer2.verifier.providers import OsvMirror
+
+    mirror = OsvMirror(tmp_path / "osv.db")
+    mirror.ingest([
+        {
+            "id": "GHSA-aaaa",
+            "aliases": ["CVE-2018-18074"],
+            "database_specific": {"severity": "HIGH"},
+            "affected": [{"package": {"ecosystem": "PyPI", "name": "requests"}, "versions": ["2.9.0"]}],
+        }
+    ])
+    monkeypatch.setattr(real, "get_osv_mirror", lambda: mirror)
+
+    provider = real.RealSBOMProvider()
+    monkeypatch.setattr(provider, "_detect_languages", lambda path: ["python", "js"])
+    monkeypatch.setattr(provider, "_run_syft", lambda path: [{"name": "requests", "version": "2.9.0", "ecosystem": "PyPI"}])
+    monkeypatch.setattr(provider, "_run_cdxgen", lambda path, lang: [{"name": "lodash", "version": "4.17.15", "ecosystem": "npm"}])
+    online_queries = []
+    monkeypatch.setattr(provider, "_query_osv_batch", lambda pkgs: online_queries.extend(pkgs) or {"lodash": ["GHSA-npm"]})
+    monkeypatch.setattr(
+        provider, "_get_vuln_details", lambda pkg, ids: [{"cve_id": "CVE-2021-23337", "severity": "HIGH", "cvss_score": None}]
+    )
+
+    records = asyncio.run(provider.scan(str(tmp_path)))
+
+    assert [pkg["name"] for pkg in online_queries] == ["lodash"]
+    assert sorted((r.name, r.cve_id) for r in records) == [("lodash", "CVE-2021-23337"), ("requests", "CVE-2018-18074")]
+    mirror.close()
@@ -4,6 +4,8 @@ import json
 import time
 from pathlib import Path
 
+import pytest
+
 from layer2.reasoning import L2ReasoningPipeline
 from layer2.reasoning.models import validate_reasoning_result
 from vsh_runtime.diagnostics import build_markdown_preview, vuln_to_diagnostic
@@ -24,6 +26,39 @@ def test_watcher_save_event(tmp_path: Path):
     assert isinstance(events, list)
 
 
+def test_watcher_polling_skips_excluded_dirs(tmp_path: Path):
+    (tmp_path / "node_modules").mkdir()
+    vendored = tmp_path / "node_modules" / "lib.js"
+    vendored.write_text("var a = 1;\n", encoding="utf-8")
+    notes = tmp_path / "notes.txt"
+    notes.write_text("x\n", encoding="utf-8")
+    watcher = ProjectWatcher(str(tmp_path), debounce_sec=0.0, interval=0.1, backend="polling")
+    assert [f.name for f in watcher._iter_files()] == []
+    assert watcher.backend == "polling"
+
+
+def test_watcher_event_backend_coalesces_bursts(tmp_path: Path):
+    pytest.importorskip("watchdog")
+    (tmp_path / "node_modules").mkdir()
+    file = tmp_path / "app.py"
+    file.write_text("print('x')\n", encoding="utf-8")
+    watcher = ProjectWatcher(str(tmp_path), debounce_sec=0.3, backend="events")
+    assert watcher.start()
+    try:
+        assert watcher.backend == "events"
+        time.sleep(0.2)
+        for idx in range(5):
+            file.write_text(f"print(eval(input()))  # {idx}\n", encoding="utf-8")
+            (tmp_path / "node_modules" / "lib.js").write_text(f"eval(x{idx});\n", encoding="utf-8")
+        deadline = time.time() + 5.0
+        while not watcher.get_last_results() and time.time() < deadline:
+            time.sleep(0.05)
+        results = watcher.get_last_results()
+    finally:
+        assert watcher.stop()
+    assert [(r["path"], r["type"]) for r in results] == [(str(file), "modified")]
+
+
 def test_diagnostics_json_schema(tmp_path: Path):
     engine = VshRuntimeEngine()
     file = tmp_path / "a.py"
@@ -93,3 +128,128 @@ def test_cli_snapshot_shape(tmp_path: Path):
     payload = VshRuntimeEngine().analyze_file(str(file))
     dumped = json.dumps(payload, ensure_ascii=False)
     assert "diagnostics" in dumped and "aggregate_summary" in dumped
+
+
+def test_analyze_changes_patches_previous_project_payload(tmp_path: Path):
+    (tmp_path / "stable.py").write_text("user_input = input()\neval(user_input)\n", encoding="utf-8")
+    edited = tmp_path / "edited.py"
+    edited.write_text("import os\nos.system(input())\n", encoding="utf-8")
+    engine = VshRuntimeEngine()
+    payload = engine.analyze_project(str(tmp_path))
+    stable_records = [v for v in payload["vuln_records"] if v["file_path"].endswith("stable.py")]
+
+    edited.write_text("x = 1\nprint(eval(input()))\n", encoding="utf-8")
+    patched = engine.analyze_changes(str(tmp_path), [str(edited)])
+
+    assert patched is payload
+    assert patched["incremental_summary"]["rescanned_files"] == 1
+    assert patched["incremental_summary"]["sbom_rescanned"] is False
+    assert all(any(v is kept for v in patched["vuln_records"]) for kept in stable_records)
+    assert len(patched["diagnostics"]) == len(patched["vuln_records"])
+    assert len({v["vuln_id"] for v in patched["vuln_records"]}) == len(patched["vuln_records"])
+    assert {(v["file_path"], v["line_number"], v["cwe_id"]) for v in patched["vuln_records"]} == {
+        (v["file_path"], v["line_number"], v["cwe_id"])
+        for v in VshRuntimeEngine().analyze_project(str(tmp_path))["vuln_records"]
+    }
+
+
+def test_analyze_changes_promotes_cross_file_reachability(tmp_path: Path):
+    db = tmp_path / "db.py"
+    db.write_text("def run_query(sql):\n    return eval(sql)\n", encoding="utf-8")
+    views = tmp_path / "views.py"
+    views.write_text("def handler():\n    return input('q')\n", encoding="utf-8")
+    engine = VshRuntimeEngine()
+    payload = engine.analyze_project(str(tmp_path))
+    sink = next(v for v in payload["vuln_records"] if v["file_path"].endswith("db.py") and v["cwe_id"] == "CWE-95")
+    assert sink["reachability_status"] != "reachable"
+
+    views.write_text("from db import run_query\n\ndef handler():\n    return run_query(input('q'))\n", encoding="utf-8")
+    patched = engine.analyze_changes(str(tmp_path), [str(views)])
+
+    assert sink["reachability_status"] == "reachable"
+    assert patched["incremental_summary"]["reachability_promoted"] >= 1
+    assert patched["diagnostics"][patched["vuln_records"].index(sink)]["line"] == sink["line_number"]
+
+
+def test_analyze_changes_demotes_cross_file_reachability_when_call_removed(tmp_path: Path):
+    db = tmp_path / "db.py"
+    db.write_text("def run_query(sql):\n    return eval(sql)\n", encoding="utf-8")
+    views = tmp_path / "views.py"
+    views.write_text("from db import run_query\n\ndef handler():\n    return run_query(input('q'))\n", encoding="utf-8")
+
+    def sink_status(payload: dict) -> str:
+        return next(
+            v["reachability_status"] for v in payload["vuln_records"]
+            if v["file_path"].endswith("db.py") and v["cwe_id"] == "CWE-95"
+        )
+
+    engine = VshRuntimeEngine()
+    payload = engine.analyze_project(str(tmp_path))
+    assert sink_status(payload) == "reachable"
+
+    views.write_text("def handler():\n    return input('q')\n", encoding="utf-8")
+    patched = engine.analyze_changes(str(tmp_path), [str(views)])
+    expected = sink_status(VshRuntimeEngine().analyze_project(str(tmp_path)))
+
+    assert expected != "reachable"
+    assert sink_status(patched) == expected
+    assert patched["incremental_summary"]["reachability_demoted"] == 1
+
+    views.write_text("from db import run_query\n\ndef handler():\n    return run_query(input('q'))\n", encoding="utf-8")
+    assert sink_status(engine.analyze_changes(str(tmp_path), [str(views)])) == "reachable"
+    views.write_text("def handler():\n    return input('q')\n", encoding="utf-8")
+    assert sink_status(engine.analyze_changes(str(tmp_path), [str(views)])) == expected
+
+
+def test_manifest_registry_memoizes_root_discovery(tmp_path: Path):
+    from shared.manifest_registry import MANIFEST_REGISTRY
+
+    nested = tmp_path / "src" / "pkg"
+    nested.mkdir(parents=True)
+    files = []
+    for idx in range(5):
+        file = nested / f"m{idx}.py"
+        file.write_text("import requests\n", encoding="utf-8")
+        files.append(file)
+    MANIFEST_REGISTRY.clear()
+    assert MANIFEST_REGISTRY.project_root(files[0]) == nested
+
+    probes = MANIFEST_REGISTRY.probes
+    for file in files:
+        assert MANIFEST_REGISTRY.project_root(file) == nested
+    assert MANIFEST_REGISTRY.probes == probes
+
+    # manifest가 생기면 directory mtime이 바뀌므로 캐시된 root가 무효화된다.
+    time.sleep(0.01)
+    (tmp_path / "requirements.txt").write_text("requests==2.0.0\n", encoding="utf-8")
+    assert MANIFEST_REGISTRY.project_root(files[1]) == tmp_path
+
+
+def test_package_usage_index_single_pass_matches_line_numbers_and_caches(tmp_path: Path, monkeypatch):
+    import vsh_runtime.sca_usage as sca_usage
+
+    monkeypatch.setattr(sca_usage, "VULNERABLE_PACKAGES", {"requests": {"cve": "CVE-1"}, "flask": {"cve": "CVE-2"}})
+    lines = []
+    for idx in range(300):
+        lines.append("import requests" if idx % 50 == 0 else f"requests.get('http://x/{idx}')" if idx % 7 == 0 else f"x = {idx}")
+    lines.append("from flask import Flask")
+    (tmp_path / "app.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    (tmp_path / "copy.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    calls = []
+    original = sca_usage._extract_usage
+    monkeypatch.setattr(sca_usage, "_extract_usage", lambda *args: calls.append(1) or original(*args))
+    sca_usage._USAGE_CACHE.clear()
+    index = sca_usage.build_package_usage_index(str(tmp_path))
+
+    app = str(tmp_path / "app.py")
+    import_lines = [item["line"] for item in index["requests"]["imports"] if item["file"] == app]
+    api_lines = [item["line"] for item in index["requests"]["api_references"] if item["file"] == app]
+    assert import_lines == [idx + 1 for idx in range(300) if idx % 50 == 0]
+    assert api_lines == [idx + 1 for idx in range(300) if idx % 7 == 0 and idx % 50 != 0]
+    assert [item["line"] for item in index["flask"]["imports"] if item["file"] == app] == [301]
+    # 내용이 같은 두 파일은 한 번만 추출한다.
+    assert len(calls) == 1
+
+    sca_usage.build_package_usage_index(str(tmp_path))
+    assert len(calls) == 1
@@ -56,6 +56,11 @@ class ScanRequest(BaseModel):
     path: str
 
 
+class ChangeScanRequest(BaseModel):
+    path: str
+    changed_paths: list[str]
+
+
 class WatchRequest(BaseModel):
     path: str
 
@@ -121,6 +126,21 @@ def scan_project(req: ScanRequest):
     return normalize_response(result, "project", req.path)
 
 
+@app.post("/scan/changes")
+def scan_changes(req: ChangeScanRequest):
+    if not Path(req.path).is_dir():
+        raise HTTPException(status_code=400, detail="Invalid project path")
+
+    result = engine.analyze_changes(req.path, req.changed_paths)
+    save_diagnostics(req.path, result["diagnostics"])
+    save_report(req.path, result)
+
+    if l3_enabled:
+        l3_runner.run_async(req.path)
+
+    return normalize_response(result, "project", req.path)
+
+
 @app.post("/annotate/file")
 def annotate_file(req: AnnotateRequest):
     try:
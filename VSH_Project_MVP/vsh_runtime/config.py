@@ -60,6 +60,7 @@ DEFAULT_CONFIG: dict[str, Any] = {
         "enabled": True,
         "debounce_sec": 1.0,
         "poll_interval_sec": 0.5,
+        "backend": "auto",  # auto | events | polling (events는 watchdog 필요)
         "watch_extensions": [".py", ".js", ".ts", ".jsx", ".tsx"],
         "exclude_dirs": [".git", "node_modules", ".venv", "__pycache__", ".vscode"]
     },
@@ -76,7 +77,9 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "cache": {
         "enabled": True,
         "dir": ".vsh/cache",
-        "ttl_hours": 24
+        "ttl_hours": 24,
+        "max_entries": 50000,
+        "max_size_mb": 256
     },
     
     "logging": {
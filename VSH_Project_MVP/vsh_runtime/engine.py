@@ -2,26 +2,42 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Iterable
 
-from layer1.scanner.vsh_l1_scanner import VSHL1Scanner
-from layer1.common import annotate_files
+from layer1.scanner.sbom_scanner import MANIFEST_FILES
+from layer1.scanner.vsh_l1_scanner import PROJECT_SOURCE_SUFFIXES, VSHL1Scanner
+from layer1.common import L1FindingsCache, LazyAnnotations, normalize_scan_result
 from layer2.reasoning import L2ReasoningPipeline
 from models.common_schema import VulnRecord
+from models.scan_result import ScanResult
 from models.vulnerability import Vulnerability
 from reporting.report_engine import ReportEngine
+from shared.finding_dedup import deduplicate_findings
 from shared.runtime_settings import apply_runtime_env, load_config
+from shared.source_unit import source_unit_scope
+from vsh_runtime.config import get_config
 from vsh_runtime.diagnostics import build_inline_preview, build_markdown_preview, vuln_to_diagnostic
 from vsh_runtime.l3_validator import L3Validator
 from vsh_runtime.risk import compute_package_risk, compute_vuln_risk
-from vsh_runtime.sca_usage import build_package_usage_index
+from vsh_runtime.sca_usage import build_package_usage_index, collect_file_usage, index_usage_for_file
+
+
+def _vuln_index(vuln_id: str | None) -> int:
+    try:
+        return int(str(vuln_id).rsplit("-", 1)[-1])
+    except ValueError:
+        return 0
 
 
 class VshRuntimeEngine:
     def __init__(self):
-        self.l1 = VSHL1Scanner()
+        self.l1 = VSHL1Scanner(findings_cache=L1FindingsCache.from_config(get_config().get("cache")))
         self.l2 = self._build_l2_pipeline()
         self.l3 = L3Validator()
         self.report = ReportEngine()
+        # project root별 마지막 report payload, usage index, cross-file로 올린 record의 파일 단위 reachability
+        # (analyze_changes에서 재사용)
+        self._project_state: dict[str, dict] = {}
 
     def _build_l2_pipeline(self) -> L2ReasoningPipeline:
         runtime_status = apply_runtime_env(load_config())
@@ -37,16 +53,190 @@ class VshRuntimeEngine:
         analyzed = self._analyze_target(target_path)
         return {"diagnostics": analyzed["diagnostics"], "target": target_path}
 
+    @source_unit_scope()
+    def analyze_changes(self, project_path: str, changed_paths: Iterable[str], previous_payload: dict | None = None) -> dict:
+        """Re-analyze only the changed files of a project and patch the previous report payload in place.
+
+        Args:
+            project_path: Project directory that was analyzed with analyze_project
+            changed_paths: Added, modified or deleted file paths
+            previous_payload: Report to patch. Defaults to the last payload produced for this project.
+
+        Returns:
+            The patched payload. Falls back to a full analyze_project when no previous payload exists.
+        """
+        root = Path(project_path)
+        state = self._project_state.get(str(root.resolve()), {})
+        payload = previous_payload if previous_payload is not None else state.get("payload")
+        if payload is None:
+            return self.analyze_project(project_path)
+
+        changed = {str(Path(p).resolve()) for p in changed_paths}
+        manifests_changed = any(
+            Path(p).name in MANIFEST_FILES and root.resolve().is_relative_to(Path(p).parent) for p in changed
+        )
+        code_changed = sorted(p for p in changed if Path(p).suffix.lower() in PROJECT_SOURCE_SUFFIXES)
+        scan_targets = [str(self._to_project_path(root, p)) for p in code_changed if Path(p).is_file()]
+
+        self.l2 = self._build_l2_pipeline()
+        call_graphs: dict[str, dict] = {}
+        findings = self.l1.scan_files(scan_targets, project_root=str(root), call_graphs=call_graphs)
+        if manifests_changed:
+            findings.extend(self.l1.sbom_scanner.scan(str(root)).findings)
+
+        old_vulns = payload.get("vuln_records", [])
+        removed_ids = {
+            v.get("vuln_id") for v in old_vulns
+            if str(Path(v.get("file_path") or "").resolve()) in code_changed
+            or (manifests_changed and v.get("cwe_id") == "CWE-829")
+        }
+        cross_file = {k: v for k, v in state.get("cross_file", {}).items() if k not in removed_ids}
+        promoted, demoted = self._reconcile_cross_file_reachability(
+            root, old_vulns, removed_ids, payload.get("l2_reasoning_results", []), cross_file
+        )
+        scan_result = normalize_scan_result(
+            ScanResult(file_path=str(root), language="multi", findings=deduplicate_findings(findings)),
+            id_offset=max((_vuln_index(v.get("vuln_id")) for v in old_vulns), default=0),
+        )
+        cross_file.update(self._cross_file_baseline(scan_result))
+        reasoning = self.l2.run(scan_result.vuln_records)
+        new_vulns = [v.model_dump() for v in scan_result.vuln_records]
+        self._enrich_vulns(new_vulns, reasoning)
+
+        usage_index = state.get("usage_index")
+        usage_changed = manifests_changed or usage_index is None or any(
+            collect_file_usage(p) != index_usage_for_file(usage_index, p) for p in code_changed
+        )
+        pkgs = payload.get("package_records", [])
+        if manifests_changed:
+            pkgs[:] = [p.model_dump() for p in scan_result.package_records]
+        if usage_changed:
+            usage_index = build_package_usage_index(str(root))
+            self._enrich_packages(pkgs, usage_index)
+
+        old_diagnostics = payload.get("diagnostics", [])
+        kept = [i for i, v in enumerate(old_vulns) if v.get("vuln_id") not in removed_ids]
+        new_diagnostics = [vuln_to_diagnostic(v).to_dict() for v in new_vulns]
+        if len(old_diagnostics) == len(old_vulns):
+            for i in promoted + demoted:
+                old_diagnostics[i] = vuln_to_diagnostic(old_vulns[i]).to_dict()
+            old_diagnostics[:] = [old_diagnostics[i] for i in kept] + new_diagnostics
+        else:
+            old_diagnostics[:] = [vuln_to_diagnostic(old_vulns[i]).to_dict() for i in kept] + new_diagnostics
+        old_vulns[:] = [old_vulns[i] for i in kept] + new_vulns
+        old_reasoning = payload.get("l2_reasoning_results", [])
+        old_reasoning[:] = [r for r in old_reasoning if r.get("linked_vuln_id") not in removed_ids] + reasoning
+
+        payload["vuln_records"] = old_vulns
+        payload["package_records"] = pkgs
+        payload["l2_reasoning_results"] = old_reasoning
+        payload["diagnostics"] = old_diagnostics
+        payload["call_graphs"] = {
+            path: graph for path, graph in payload.get("call_graphs", {}).items()
+            if str(Path(path).resolve()) not in changed
+        } | call_graphs
+        payload["aggregate_summary"] = self._build_aggregate(old_vulns, pkgs)
+        payload["previews"] = self._build_previews(old_diagnostics)
+        payload["incremental_summary"] = {
+            "changed_files": sorted(changed),
+            "rescanned_files": len(scan_targets),
+            "removed_vuln_records": len(removed_ids),
+            "added_vuln_records": len(new_vulns),
+            "reachability_promoted": len(promoted),
+            "reachability_demoted": len(demoted),
+            "sbom_rescanned": manifests_changed,
+            "usage_reindexed": usage_changed,
+        }
+        self._project_state[str(root.resolve())] = {"payload": payload, "usage_index": usage_index, "cross_file": cross_file}
+        return payload
+
+    def _reconcile_cross_file_reachability(
+        self, root: Path, vulns: list[dict], skip_ids: set, reasoning: list[dict], cross_file: dict[str, tuple[str, str]]
+    ) -> tuple[list[int], list[int]]:
+        """
+        변경되지 않은 파일의 기존 record를 바뀐 call graph 기준으로 다시 분류합니다.
+
+        새로 도달 가능해진 record는 reachable로 올리고, cross-file 경로로만 reachable이던 record의 경로가 사라졌으면
+        파일 단위 결과로 되돌린다. cross_file(vuln_id -> 파일 단위 status, confidence)도 함께 갱신하고
+        (올린 index, 되돌린 index)를 반환한다.
+        """
+        index = self.l1.reachability_index(root)
+        reasoning_by_id = {r.get("linked_vuln_id"): r for r in reasoning}
+        promoted: list[int] = []
+        demoted: list[int] = []
+        for i, v in enumerate(vulns):
+            vuln_id = v.get("vuln_id")
+            if vuln_id in skip_ids or v.get("cwe_id") == "CWE-829":
+                continue
+            reachable = bool(index.reachable_path(v.get("file_path") or "", int(v.get("line_number") or 0)))
+            if reachable and v.get("reachability_status") != "reachable":
+                cross_file[vuln_id] = (v.get("reachability_status") or "unknown", v.get("reachability_confidence") or "low")
+                v["reachability_status"] = "reachable"
+                v["reachability_confidence"] = "high"
+                promoted.append(i)
+            elif not reachable and vuln_id in cross_file:
+                v["reachability_status"], v["reachability_confidence"] = cross_file.pop(vuln_id)
+                demoted.append(i)
+            else:
+                continue
+            v["risk_score"], v["final_priority"] = compute_vuln_risk(v, reasoning_by_id.get(vuln_id))
+        return promoted, demoted
+
+    @staticmethod
+    def _cross_file_baseline(scan_result: ScanResult) -> dict[str, tuple[str, str]]:
+        """project call graph로 reachable이 된 record의 vuln_id -> 파일 단위 (status, confidence)."""
+        baseline: dict[str, tuple[str, str]] = {}
+        for finding, record in zip(scan_result.findings, scan_result.vuln_records):
+            if finding.metadata.get("reachability_mode") != "project_call_graph":
+                continue
+            file_level = (finding.metadata.get("reachability_evidence") or {}).get("file_reachability") or {}
+            baseline[record.vuln_id] = (file_level.get("status", "unknown"), file_level.get("confidence", "low"))
+        return baseline
+
+    @staticmethod
+    def _to_project_path(root: Path, resolved: str) -> Path:
+        # full scan과 같은 경로 표기(root 기준)로 맞춰야 기존 record와 file_path가 일치한다.
+        try:
+            return root / Path(resolved).relative_to(root.resolve())
+        except ValueError:
+            return Path(resolved)
+
+    @source_unit_scope()
     def _analyze_target(self, target_path: str) -> dict:
         self.l2 = self._build_l2_pipeline()
         scan_result = self.l1.scan(target_path)
         reasoning = self.l2.run(scan_result.vuln_records)
-        reasoning_by_id = {r["linked_vuln_id"]: r for r in reasoning}
 
         vulns = [v.model_dump() for v in scan_result.vuln_records]
         pkgs = [p.model_dump() for p in scan_result.package_records]
         usage_index = build_package_usage_index(str(Path(target_path) if Path(target_path).is_dir() else Path(target_path).parent))
 
+        self._enrich_vulns(vulns, reasoning)
+        self._enrich_packages(pkgs, usage_index)
+
+        diagnostics = [vuln_to_diagnostic(v).to_dict() for v in vulns]
+        aggregate = self._build_aggregate(vulns, pkgs)
+
+        report_payload = {
+            "vuln_records": vulns,
+            "package_records": pkgs,
+            "l2_reasoning_results": reasoning,
+            "l3_validation_results": [],  # ✅ L3는 백그라운드에서 채워짐
+            "diagnostics": diagnostics,
+            "call_graphs": scan_result.call_graphs,
+            "aggregate_summary": aggregate,
+        }
+        report_payload["previews"] = self._build_previews(diagnostics)
+        if Path(target_path).is_dir():
+            self._project_state[str(Path(target_path).resolve())] = {
+                "payload": report_payload,
+                "usage_index": usage_index,
+                "cross_file": self._cross_file_baseline(scan_result),
+            }
+        return report_payload
+
+    def _enrich_vulns(self, vulns: list[dict], reasoning: list[dict]) -> None:
+        reasoning_by_id = {r["linked_vuln_id"]: r for r in reasoning}
         for v in vulns:
             r = reasoning_by_id.get(v.get("vuln_id"))
             if r:
@@ -55,6 +245,18 @@ class VshRuntimeEngine:
             v["risk_score"] = score
             v["final_priority"] = pri
 
+        # ✅ L3는 분리됨 (비동기 백그라운드 실행)
+        # L1/L2 결과만 즉시 반환하고, L3는 API/CLI에서 백그라운드로 실행됨
+
+        # L3 placeholder (나중에 백그라운드에서 채워짐)
+        for v in vulns:
+            v["l3_validated"] = None
+            v["exploit_possible"] = None
+            v["l3_confidence"] = None
+            v["l3_attack_scenario"] = None
+            v["l3_severity_override"] = None
+
+    def _enrich_packages(self, pkgs: list[dict], usage_index: dict) -> None:
         for p in pkgs:
             usage = usage_index.get(p["name"].lower(), {})
             p.update({
@@ -70,34 +272,13 @@ class VshRuntimeEngine:
             p["risk_score"] = score
             p["final_priority"] = pri
 
-        # ✅ L3는 분리됨 (비동기 백그라운드 실행)
-        # L1/L2 결과만 즉시 반환하고, L3는 API/CLI에서 백그라운드로 실행됨
-        
-        # L3 placeholder (나중에 백그라운드에서 채워짐)
-        for v in vulns:
-            v["l3_validated"] = None
-            v["exploit_possible"] = None
-            v["l3_confidence"] = None
-            v["l3_attack_scenario"] = None
-            v["l3_severity_override"] = None
-
-        diagnostics = [vuln_to_diagnostic(v).to_dict() for v in vulns]
-        aggregate = self._build_aggregate(vulns, pkgs)
-
-        report_payload = {
-            "vuln_records": vulns,
-            "package_records": pkgs,
-            "l2_reasoning_results": reasoning,
-            "l3_validation_results": [],  # ✅ L3는 백그라운드에서 채워짐
-            "diagnostics": diagnostics,
-            "aggregate_summary": aggregate,
-        }
-        report_payload["previews"] = {
+    @staticmethod
+    def _build_previews(diagnostics: list[dict]) -> dict:
+        return {
             "inline": build_inline_preview(diagnostics),
             "markdown": build_markdown_preview(diagnostics),
             "diagnostics_json": json.dumps(diagnostics, ensure_ascii=False, indent=2),
         }
-        return report_payload
 
     def _build_aggregate(self, vulns: list[dict], pkgs: list[dict]) -> dict:
         dist = {k: 0 for k in ["P1", "P2", "P3", "P4", "INFO"]}
@@ -127,6 +308,27 @@ class VshRuntimeEngine:
         diag_path.write_text(json.dumps(payload["diagnostics"], ensure_ascii=False, indent=2), encoding="utf-8")
         return {"json": str(json_path), "markdown": str(md_path), "diagnostics": str(diag_path)}
     
+    @staticmethod
+    def _records_to_vulnerabilities(records: list[dict]) -> list[Vulnerability]:
+        """Convert vuln_records back to Vulnerability objects for annotation."""
+        vulns = []
+        for v in records:
+            try:
+                vulns.append(Vulnerability(
+                    file_path=v.get("file_path"),
+                    line_number=v.get("line_number", 0),
+                    severity=v.get("severity", "UNKNOWN"),
+                    cwe_id=v.get("cwe_id", ""),
+                    rule_id=v.get("rule_id", ""),
+                    code_snippet=v.get("evidence") or "",
+                    reachability_status=v.get("reachability_status"),
+                    references=[],
+                ))
+            except Exception as e:
+                print(f"Warning: Failed to create Vulnerability object: {e}")
+        return vulns
+
+    @source_unit_scope()
     def annotate_file(self, file_path: str, in_place: bool = False) -> dict:
         """Analyze a file and generate annotated source code.
         
@@ -143,48 +345,14 @@ class VshRuntimeEngine:
         # Analyze the file
         analysis = self.analyze_file(file_path)
         
-        # Convert vuln_records to Vulnerability objects for annotation
-        vulns = []
-        for v in analysis.get("vuln_records", []):
-            try:
-                vuln = Vulnerability(
-                    vuln_id=v.get("vuln_id"),
-                    file_path=v.get("file_path"),
-                    line_number=v.get("line_number", 0),
-                    column_number=v.get("column_number", 1),
-                    severity=v.get("severity", "UNKNOWN"),
-                    cwe_id=v.get("cwe_id", ""),
-                    rule_id=v.get("rule_id", ""),
-                    evidence=v.get("evidence", ""),
-                    reachability_status=v.get("reachability_status"),
-                    references=[]
-                )
-                vulns.append(vuln)
-            except Exception as e:
-                print(f"Warning: Failed to create Vulnerability object: {e}")
-        
-        # Generate annotated files
-        annotated = annotate_files(vulns)
-        
-        # Save annotated files
-        output_paths = {}
-        if annotated:
-            if in_place:
-                # Overwrite original file
-                for file_path_key, content in annotated.items():
-                    Path(file_path_key).write_text(content, encoding="utf-8")
-                    output_paths[file_path_key] = file_path_key
-            else:
-                # Save to .vsh/annotated/
-                vsh_dir = Path(file_path).parent / ".vsh" / "annotated"
-                vsh_dir.mkdir(parents=True, exist_ok=True)
-                
-                for file_path_key, content in annotated.items():
-                    rel_path = Path(file_path_key).name
-                    output_file = vsh_dir / rel_path
-                    output_file.write_text(content, encoding="utf-8")
-                    output_paths[file_path_key] = str(output_file)
-        
+        vulns = self._records_to_vulnerabilities(analysis.get("vuln_records", []))
+        # 파일별 annotated 소스는 저장할 때 stream으로 만들어 바로 쓴다.
+        annotated = LazyAnnotations(vulns)
+
+        # Overwrite original file or save to .vsh/annotated/
+        output_dir = None if in_place else Path(file_path).parent / ".vsh" / "annotated"
+        output_paths = annotated.write(output_dir) if annotated else {}
+
         return {
             "success": True,
             "file": file_path,
@@ -194,6 +362,7 @@ class VshRuntimeEngine:
             "total_issues": len(vulns)
         }
     
+    @source_unit_scope()
     def annotate_project(self, project_path: str, in_place: bool = False) -> dict:
         """Analyze a project and generate annotated source files.
         
@@ -210,56 +379,14 @@ class VshRuntimeEngine:
         # Analyze the project
         analysis = self.analyze_project(project_path)
         
-        # Convert vuln_records to Vulnerability objects for annotation
-        vulns = []
-        for v in analysis.get("vuln_records", []):
-            try:
-                vuln = Vulnerability(
-                    vuln_id=v.get("vuln_id"),
-                    file_path=v.get("file_path"),
-                    line_number=v.get("line_number", 0),
-                    column_number=v.get("column_number", 1),
-                    severity=v.get("severity", "UNKNOWN"),
-                    cwe_id=v.get("cwe_id", ""),
-                    rule_id=v.get("rule_id", ""),
-                    evidence=v.get("evidence", ""),
-                    reachability_status=v.get("reachability_status"),
-                    references=[]
-                )
-                vulns.append(vuln)
-            except Exception as e:
-                print(f"Warning: Failed to create Vulnerability object: {e}")
-        
-        # Generate annotated files
-        annotated = annotate_files(vulns)
-        
-        # Save annotated files
-        output_paths = {}
-        if annotated:
-            if in_place:
-                # Overwrite original files
-                for file_path_key, content in annotated.items():
-                    Path(file_path_key).write_text(content, encoding="utf-8")
-                    output_paths[file_path_key] = file_path_key
-            else:
-                # Save to .vsh/annotated/ preserving directory structure
-                vsh_dir = Path(project_path) / ".vsh" / "annotated"
-                vsh_dir.mkdir(parents=True, exist_ok=True)
-                
-                for file_path_key, content in annotated.items():
-                    original = Path(file_path_key)
-                    # Try to preserve relative path structure
-                    try:
-                        rel_path = original.relative_to(Path(project_path))
-                        output_file = vsh_dir / rel_path
-                        output_file.parent.mkdir(parents=True, exist_ok=True)
-                    except ValueError:
-                        # File is outside project path, just use filename
-                        output_file = vsh_dir / original.name
-                    
-                    output_file.write_text(content, encoding="utf-8")
-                    output_paths[file_path_key] = str(output_file)
-        
+        vulns = self._records_to_vulnerabilities(analysis.get("vuln_records", []))
+        # 파일별 annotated 소스는 저장할 때 stream으로 만들어 바로 쓴다.
+        annotated = LazyAnnotations(vulns)
+
+        # Overwrite original files or save to .vsh/annotated/ preserving directory structure
+        output_dir = None if in_place else Path(project_path) / ".vsh" / "annotated"
+        output_paths = annotated.write(output_dir, base_dir=project_path) if annotated else {}
+
         return {
             "success": True,
             "project": project_path,
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
 import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 
+from shared.source_unit import load_source_unit
+
 try:
     from config import VULNERABLE_PACKAGES
 except ImportError:
@@ -17,17 +23,114 @@ ADVISORY_PATTERNS = {
 
 PY_IMPORT = re.compile(r"^\s*(?:import\s+([a-zA-Z0-9_\.]+)|from\s+([a-zA-Z0-9_\.]+)\s+import\s+(.+))", re.MULTILINE)
 JS_IMPORT = re.compile(r"import\s+.*?from\s+['\"]([^'\"]+)['\"]|require\(['\"]([^'\"]+)['\"]\)")
+CODE_SUFFIXES = {".py", ".js", ".ts", ".jsx", ".tsx"}
+# content hash별로 보관할 파일 단위 usage 추출 결과 개수
+USAGE_CACHE_SIZE = 4096
+
+_USAGE_CACHE: "OrderedDict[tuple, dict[str, dict]]" = OrderedDict()
+_USAGE_CACHE_LOCK = threading.Lock()
 
 
 def _iter_code_files(root: Path):
     for f in root.rglob("*"):
-        if f.is_file() and f.suffix.lower() in {".py", ".js", ".ts", ".jsx", ".tsx"}:
+        if f.is_file() and f.suffix.lower() in CODE_SUFFIXES:
             yield f
 
 
+@lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern)
+
+
+def _extract_usage(text: str, offsets: list[int], is_python: bool, packages: tuple[tuple[str, tuple[str, ...]], ...]) -> dict[str, dict]:
+    """
+    파일 하나에서 추적 대상 패키지 전체의 import/API 참조를 한 번에 추출합니다. (file 필드는 호출 측에서 채운다)
+
+    import 정규식은 파일당 한 번, API pattern은 서로 다른 pattern마다 한 번만 실행하고
+    라인 번호는 라인 시작 offset 표에서 이진 탐색으로 구한다.
+    """
+    tracked = {pkg for pkg, _ in packages}
+    imports: dict[str, list[dict]] = {}
+    if is_python:
+        for m in PY_IMPORT.finditer(text):
+            mod = (m.group(1) or m.group(2) or "").split(".")[0]
+            if mod in tracked:
+                imports.setdefault(mod, []).append({"line": bisect_right(offsets, m.start())})
+    else:
+        for m in JS_IMPORT.finditer(text):
+            mod = (m.group(1) or m.group(2) or "").split("/")[0]
+            if mod in tracked:
+                imports.setdefault(mod, []).append({"line": bisect_right(offsets, m.start())})
+
+    references: dict[str, list[dict]] = {}
+    for pattern in {pattern for _, patterns in packages for pattern in patterns}:
+        references[pattern] = [
+            {"line": bisect_right(offsets, match.start()), "pattern": pattern}
+            for match in _compile(pattern).finditer(text)
+        ]
+
+    usage: dict[str, dict] = {}
+    for pkg, patterns in packages:
+        api_references = [ref for pattern in patterns for ref in references[pattern]]
+        if pkg in imports or api_references:
+            usage[pkg] = {"imports": imports.get(pkg, []), "api_references": api_references}
+    return usage
+
+
+def _collect_file_usage(file: Path, packages: dict[str, list[str]]) -> dict[str, dict]:
+    """파일 내용 hash 기준으로 캐시된 usage 추출 결과에 file 경로를 붙여 반환합니다."""
+    unit = load_source_unit(file)
+    is_python = file.suffix.lower() == ".py"
+    signature = tuple((pkg, tuple(patterns)) for pkg, patterns in packages.items())
+    key = (unit.content_hash, is_python, signature)
+    with _USAGE_CACHE_LOCK:
+        usage = _USAGE_CACHE.get(key)
+        if usage is not None:
+            _USAGE_CACHE.move_to_end(key)
+    if usage is None:
+        usage = _extract_usage(unit.joined_text, unit.line_offsets, is_python, signature)
+        with _USAGE_CACHE_LOCK:
+            _USAGE_CACHE[key] = usage
+            while len(_USAGE_CACHE) > USAGE_CACHE_SIZE:
+                _USAGE_CACHE.popitem(last=False)
+    name = str(file)
+    return {
+        pkg: {
+            "imports": [{"file": name, **item} for item in payload["imports"]],
+            "api_references": [{"file": name, **item} for item in payload["api_references"]],
+        }
+        for pkg, payload in usage.items()
+    }
+
+
+def _tracked_packages() -> dict[str, list[str]]:
+    return {pkg: ADVISORY_PATTERNS.get(pkg, []) for pkg in VULNERABLE_PACKAGES}
+
+
+def collect_file_usage(file_path: str) -> dict[str, dict]:
+    """단일 파일의 취약 패키지 import/API 참조를 {package: {"imports", "api_references"}} 형태로 반환합니다."""
+    file = Path(file_path)
+    if not file.is_file():
+        return {}
+    return _collect_file_usage(file, _tracked_packages())
+
+
+def index_usage_for_file(index: dict, file_path: str) -> dict[str, dict]:
+    """build_package_usage_index 결과에서 한 파일의 항목만 collect_file_usage와 같은 형태로 추려냅니다."""
+    target = str(Path(file_path).resolve())
+    usage: dict[str, dict] = {}
+    for pkg, payload in index.items():
+        imports = [item for item in payload.get("imports", []) if str(Path(item["file"]).resolve()) == target]
+        api_references = [item for item in payload.get("api_references", []) if str(Path(item["file"]).resolve()) == target]
+        if imports or api_references:
+            usage[pkg] = {"imports": imports, "api_references": api_references}
+    return usage
+
+
 def build_package_usage_index(project_root: str) -> dict:
     root = Path(project_root)
     index: dict[str, dict] = {}
+    packages = _tracked_packages()
     for pkg, info in VULNERABLE_PACKAGES.items():
         index[pkg] = {
             "package": pkg,
@@ -36,39 +139,24 @@ def build_package_usage_index(project_root: str) -> dict:
             "imports": [],
             "api_references": [],
             "usage_status": "package_present",
-            "affected_api_patterns": ADVISORY_PATTERNS.get(pkg, []),
+            "affected_api_patterns": packages[pkg],
             "exploitability_hint": "heuristic",
         }
 
     for file in _iter_code_files(root):
-        text = file.read_text(encoding="utf-8", errors="ignore")
-        for pkg in index:
-            imported = False
-            if file.suffix.lower() == ".py":
-                for m in PY_IMPORT.finditer(text):
-                    mod = (m.group(1) or m.group(2) or "").split(".")[0]
-                    if mod == pkg:
-                        imported = True
-                        index[pkg]["imports"].append({"file": str(file), "line": text[: m.start()].count("\n") + 1})
-            else:
-                for m in JS_IMPORT.finditer(text):
-                    mod = (m.group(1) or m.group(2) or "").split("/")[0]
-                    if mod == pkg:
-                        imported = True
-                        index[pkg]["imports"].append({"file": str(file), "line": text[: m.start()].count("\n") + 1})
-            if imported:
-                index[pkg]["usage_status"] = "package_imported"
-
-            for pattern in index[pkg]["affected_api_patterns"]:
-                for match in re.finditer(pattern, text):
-                    index[pkg]["api_references"].append({"file": str(file), "line": text[: match.start()].count("\n") + 1, "pattern": pattern})
-
-            if index[pkg]["api_references"]:
-                index[pkg]["usage_status"] = "vulnerable_api_referenced"
-            elif imported and index[pkg]["imports"]:
-                index[pkg]["usage_status"] = "package_imported"
+        try:
+            file_usage = _collect_file_usage(file, packages)
+        except OSError:
+            continue
+        for pkg, usage in file_usage.items():
+            index[pkg]["imports"].extend(usage["imports"])
+            index[pkg]["api_references"].extend(usage["api_references"])
 
     for pkg, payload in index.items():
+        if payload["api_references"]:
+            payload["usage_status"] = "vulnerable_api_referenced"
+        elif payload["imports"]:
+            payload["usage_status"] = "package_imported"
         if payload["usage_status"] == "package_imported" and payload["affected_api_patterns"]:
             payload["usage_status"] = "needs_manual_review"
         if payload["usage_status"] == "vulnerable_api_referenced":
@@ -1,36 +1,119 @@
 from __future__ import annotations
 
+import os
 import threading
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
+from vsh_runtime.config import DEFAULT_CONFIG, get_config
 from vsh_runtime.engine import VshRuntimeEngine
 
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    _WATCHDOG_OK = True
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+    _WATCHDOG_OK = False
+
+
+class _BatchingEventHandler(FileSystemEventHandler):
+    """Forwards watchdog file events to the watcher's debounced batch queue."""
+
+    def __init__(self, watcher: "ProjectWatcher"):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == "deleted":
+            self.watcher._enqueue(event.src_path, "deleted")
+        elif event.event_type in {"created", "modified", "closed"}:
+            self.watcher._enqueue(event.src_path, "modified")
+        elif event.event_type == "moved":
+            self.watcher._enqueue(event.src_path, "deleted")
+            self.watcher._enqueue(getattr(event, "dest_path", ""), "modified")
+
 
 class ProjectWatcher:
-    """Thread-safe file system watcher with debouncing and auto-analysis."""
+    """Thread-safe file system watcher with debouncing and auto-analysis.
     
-    def __init__(self, target_path: str, debounce_sec: float = 1.0, interval: float = 0.5):
+    Uses OS file events (watchdog: inotify/FSEvents/ReadDirectoryChangesW) when available and
+    coalesces bursts of events into one debounced batch. Falls back to mtime polling otherwise.
+    `watch_extensions` and `exclude_dirs` default to the `watch` section of the runtime config.
+    """
+
+    def __init__(
+        self,
+        target_path: str,
+        debounce_sec: float = 1.0,
+        interval: float = 0.5,
+        watch_extensions: Optional[Iterable[str]] = None,
+        exclude_dirs: Optional[Iterable[str]] = None,
+        backend: Optional[str] = None,
+    ):
+        watch_config = {**DEFAULT_CONFIG["watch"], **(get_config().get("watch") or {})}
         self.target = Path(target_path)
         self.debounce = debounce_sec
         self.interval = interval
+        self.watch_extensions = {ext.lower() for ext in (watch_extensions or watch_config.get("watch_extensions") or [])}
+        self.exclude_dirs = set(exclude_dirs if exclude_dirs is not None else watch_config.get("exclude_dirs") or [])
+        requested = (backend or watch_config.get("backend") or "auto").lower()
+        self.backend = "events" if requested in {"auto", "events"} and _WATCHDOG_OK else "polling"
         self.engine = VshRuntimeEngine()
         self._mtimes: dict[str, float] = {}
         self._last_scan: dict[str, float] = {}
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
+        self._observer = None
         self._lock = threading.Lock()
         self._last_results: list[dict] = []
+        self._pending: dict[str, str] = {}
+        self._last_event_at = 0.0
+        self._pending_cond = threading.Condition()
+
+    def _is_tracked(self, path: Path) -> bool:
+        if path.suffix.lower() not in self.watch_extensions:
+            return False
+        try:
+            parts = path.relative_to(self.target).parts[:-1]
+        except ValueError:
+            parts = path.parts[:-1]
+        return not any(part in self.exclude_dirs for part in parts)
 
     def _iter_files(self):
-        """Iterate over tracked source files."""
+        """Iterate over tracked source files, pruning excluded directories."""
         if self.target.is_file():
             yield self.target
             return
-        for f in self.target.rglob("*"):
-            if f.is_file() and f.suffix.lower() in {".py", ".js", ".ts", ".jsx", ".tsx"}:
-                yield f
+        for dirpath, dirnames, filenames in os.walk(self.target):
+            dirnames[:] = [d for d in dirnames if d not in self.exclude_dirs]
+            for name in filenames:
+                f = Path(dirpath) / name
+                if f.suffix.lower() in self.watch_extensions:
+                    yield f
+
+    def _analyze(self, key: str, event_type: str = "modified") -> dict:
+        if event_type == "deleted":
+            return {"path": key, "type": "deleted"}
+        try:
+            result = self.engine.analyze_file(key)
+            return {
+                "path": key,
+                "type": "modified",
+                "analysis": result
+            }
+        except Exception as e:
+            print(f"Error analyzing {key}: {e}")
+            return {
+                "path": key,
+                "type": "error",
+                "error": str(e)
+            }
 
     def poll_once(self) -> list[dict]:
         """Poll for changed files and return analysis results."""
@@ -59,35 +142,61 @@ class ProjectWatcher:
                     continue
                     
                 self._last_scan[key] = now
-                try:
-                    result = self.engine.analyze_file(key)
-                    results.append({
-                        "path": key,
-                        "type": "modified",
-                        "analysis": result
-                    })
-                except Exception as e:
-                    print(f"Error analyzing {key}: {e}")
-                    results.append({
-                        "path": key,
-                        "type": "error",
-                        "error": str(e)
-                    })
+                results.append(self._analyze(key))
         except Exception as e:
             print(f"Error polling files: {e}")
         
         return results
 
+    def _enqueue(self, raw_path: str, event_type: str) -> None:
+        """Record a file event; the batch is flushed once no new event arrives for `debounce` seconds."""
+        if not raw_path:
+            return
+        path = Path(os.fsdecode(raw_path))
+        if self.target.is_file() and path != self.target:
+            return
+        if not self._is_tracked(path):
+            return
+        with self._pending_cond:
+            self._pending[str(path)] = event_type
+            self._last_event_at = time.monotonic()
+            self._pending_cond.notify_all()
+
+    def flush_events(self) -> list[dict]:
+        """Analyze the pending event batch immediately and return its results."""
+        with self._pending_cond:
+            batch, self._pending = self._pending, {}
+        return [self._analyze(path, event_type) for path, event_type in sorted(batch.items())]
+
+    def _store_results(self, results: list[dict]) -> None:
+        if results:
+            with self._lock:
+                self._last_results = results
+            # Optional: log activity
+            print(f"[WATCH] Detected {len(results)} changes")
+
+    def _event_thread_loop(self):
+        """Wait for file events without polling; flush one batch per quiet period."""
+        while not self._stop_event.is_set():
+            with self._pending_cond:
+                while not self._pending and not self._stop_event.is_set():
+                    self._pending_cond.wait()
+                if self._stop_event.is_set():
+                    break
+                remaining = self.debounce - (time.monotonic() - self._last_event_at)
+                if remaining > 0:
+                    self._pending_cond.wait(timeout=remaining)
+                    continue
+            try:
+                self._store_results(self.flush_events())
+            except Exception as e:
+                print(f"[WATCH ERROR] {e}")
+
     def _watch_thread_loop(self):
         """Main watch loop running in background thread."""
         while not self._stop_event.is_set():
             try:
-                results = self.poll_once()
-                if results:
-                    with self._lock:
-                        self._last_results = results
-                    # Optional: log activity
-                    print(f"[WATCH] Detected {len(results)} changes")
+                self._store_results(self.poll_once())
             except Exception as e:
                 print(f"[WATCH ERROR] {e}")
             
@@ -97,6 +206,19 @@ class ProjectWatcher:
                     break
                 time.sleep(0.01)
     
+    def _start_observer(self) -> bool:
+        try:
+            observer = Observer()
+            watch_root = self.target.parent if self.target.is_file() else self.target
+            observer.schedule(_BatchingEventHandler(self), str(watch_root), recursive=self.target.is_dir())
+            observer.daemon = True
+            observer.start()
+        except Exception as e:
+            print(f"[WATCH] Event backend unavailable, falling back to polling: {e}")
+            return False
+        self._observer = observer
+        return True
+
     def start(self) -> bool:
         """Start watching in a background thread. Returns False if already running."""
         with self._lock:
@@ -104,7 +226,12 @@ class ProjectWatcher:
                 return False
             
             self._stop_event.clear()
-            self._thread = threading.Thread(target=self._watch_thread_loop, daemon=False)
+            if self.backend == "events" and self._start_observer():
+                target = self._event_thread_loop
+            else:
+                self.backend = "polling"
+                target = self._watch_thread_loop
+            self._thread = threading.Thread(target=target, daemon=False)
             self._thread.start()
             return True
     
@@ -114,6 +241,12 @@ class ProjectWatcher:
             if self._thread is None or not self._thread.is_alive():
                 return False
             self._stop_event.set()
+        with self._pending_cond:
+            self._pending_cond.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2.0)
+            self._observer = None
         
         # Wait for thread to finish (with timeout)
         if self._thread: